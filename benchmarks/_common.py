@@ -0,0 +1,91 @@
+"""Shared helpers for the offline benchmarks.
+
+The benchmarks drive the integration's hot paths directly, without a running
+Home Assistant instance or websocket. Run them from the repository root, e.g.:
+
+    python -m benchmarks.bench_fleet
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from typing import Any
+
+from custom_components.elecq_ocpp import ocpp_server
+
+
+class StubHass:
+    """Bare minimum of HomeAssistant the manager touches."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.data: dict[str, Any] = {}
+        self.loop = loop or asyncio.new_event_loop()
+
+    def async_create_task(self, target):
+        return self.loop.create_task(target)
+
+    def async_add_executor_job(self, target, *args):
+        return self.loop.run_in_executor(None, target, *args)
+
+    def run_pending(self) -> None:
+        """Run the callbacks scheduled so far, i.e. finish one loop tick."""
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+
+class DispatchCounter:
+    """Replacement for async_dispatcher_send that only counts signals."""
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.by_signal: Counter[str] = Counter()
+
+    def __call__(self, hass, signal, *args) -> None:
+        self.sent += 1
+        self.by_signal[signal] += 1
+
+
+def patch_dispatcher() -> DispatchCounter:
+    counter = DispatchCounter()
+    ocpp_server.async_dispatcher_send = counter
+    return counter
+
+
+def make_manager(
+    hass: StubHass | None = None,
+    publish_interval: float = 0.0,
+    port: int = 0,
+    raw_payloads: int = 0,
+    instrumentation: bool = False,
+) -> ocpp_server.ElecqOcppManager:
+    return ocpp_server.ElecqOcppManager(
+        hass=hass or StubHass(),
+        entry_id="bench",
+        port=port,
+        id_token="ElecqAutoStart",
+        evse_id=1,
+        connector_id=1,
+        publish_interval=publish_interval,
+        raw_payloads=raw_payloads,
+        instrumentation=instrumentation,
+    )
+
+
+def meter_value(power_w: float, energy_wh: float) -> list[dict[str, Any]]:
+    """A meterValue[] as the ocpp library hands it to the handler (snake_case)."""
+    return [
+        {
+            "timestamp": "2025-01-01T12:00:00Z",
+            "sampled_value": [
+                {
+                    "value": power_w,
+                    "measurand": "Power.Active.Import",
+                    "unit_of_measure": {"unit": "W"},
+                },
+                {
+                    "value": energy_wh,
+                    "measurand": "Energy.Active.Import.Register",
+                    "unit_of_measure": {"unit": "Wh"},
+                },
+            ],
+        }
+    ]
@@ -0,0 +1,51 @@
+"""Cost of one load balancer recomputation as the number of chargers grows.
+
+Every grid meter reading triggers a recomputation, so it has to stay far
+below one meter interval. Readings jitter within the deadband, so this
+measures the allocation itself rather than SetChargingProfile traffic.
+
+    python -m benchmarks.bench_balancer
+"""
+from __future__ import annotations
+
+import time
+
+from custom_components.elecq_ocpp.load_balancer import ElecqLoadBalancer
+
+from ._common import make_manager, patch_dispatcher
+
+FLEET_SIZES = (1, 4, 16, 64)
+READINGS = 100_000
+
+
+def run(fleet_size: int, readings: int = READINGS) -> float:
+    patch_dispatcher()
+    manager = make_manager()
+    balancer = ElecqLoadBalancer(manager, "sensor.grid", site_limit_a=63 * fleet_size)
+    manager.balancer = balancer
+    for i in range(fleet_size):
+        station = manager.async_get_or_create_station(f"AU101B2G{i:06d}")
+        station.cp = object()
+        station.state.plugged_in = True
+        station.state.meter.current_import_a = 16.0
+        balancer.async_update_station(station)
+    # Initial profiles
+    balancer.async_set_grid_current(20.0 * fleet_size)
+    manager.hass.run_pending()
+
+    jitter = [20.0 * fleet_size + (i % 7) * 0.1 for i in range(64)]
+    start = time.perf_counter()
+    for i in range(readings):
+        balancer.async_set_grid_current(jitter[i & 63])
+    elapsed = time.perf_counter() - start
+    return elapsed / readings * 1e6
+
+
+def main() -> None:
+    print(f"{'stations':>8}  {'us/reading':>10}")
+    for size in FLEET_SIZES:
+        print(f"{size:>8}  {run(size):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
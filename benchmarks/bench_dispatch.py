@@ -0,0 +1,79 @@
+"""Entity state writes per message: scoped, coalesced dispatch vs broadcast.
+
+Before scoped dispatch every _notify() made every entity of the station write
+its state. Now only the entities subscribed to a group whose fields moved do,
+and bursts of messages within one loop tick are published once.
+"""
+from __future__ import annotations
+
+from custom_components.elecq_ocpp import binary_sensor, sensor, switch
+from custom_components.elecq_ocpp.const import GROUP_CONNECTION
+from custom_components.elecq_ocpp.ocpp_server import STATE_GROUPS
+
+from ._common import make_manager, meter_value, patch_dispatcher
+
+ENTITY_CLASSES = (
+    sensor.ElecqPowerSensor,
+    sensor.ElecqSmoothedPowerSensor,
+    sensor.ElecqEnergySensor,
+    sensor.ElecqSessionEnergySensor,
+    sensor.ElecqStatusSensor,
+    sensor.ElecqChargingStateSensor,
+    binary_sensor.ElecqPluggedInBinarySensor,
+    binary_sensor.ElecqChargingBinarySensor,
+    switch.ElecqChargingSwitch,
+)
+
+SAMPLES = 10_000
+
+
+def run(messages_per_tick: int) -> None:
+    counter = patch_dispatcher()
+    manager = make_manager()
+    station = manager.async_get_or_create_station("AU101B2G00127D")
+    hass = manager.hass
+
+    subscribers = {group: 0 for group in (*STATE_GROUPS.values(), GROUP_CONNECTION)}
+    for cls in ENTITY_CLASSES:
+        for group in cls._groups:
+            subscribers[group] += 1
+
+    transaction_info = {"transaction_id": "tx-1", "charging_state": "Charging"}
+    station.update_transaction_event("Started", "CablePluggedIn", transaction_info, None)
+    hass.run_pending()
+
+    # A realistic session: power wobbles a little, energy creeps up slowly
+    for i in range(SAMPLES):
+        station.update_transaction_event(
+            event_type="Updated",
+            trigger_reason="MeterValuePeriodic",
+            transaction_info=transaction_info,
+            meter_value=meter_value(7200.0 + (i % 4) * 10, 1_000_000.0 + i // 10 * 10),
+        )
+        if i % messages_per_tick == messages_per_tick - 1:
+            hass.run_pending()
+    hass.run_pending()
+
+    stats = manager.dispatch_stats
+    writes = sum(
+        counter.by_signal[station.signal_state_updated(group)] * entities
+        for group, entities in subscribers.items()
+    )
+    broadcast_writes = stats.notifies * len(ENTITY_CLASSES)
+
+    print(f"messages per loop tick: {messages_per_tick:>10}")
+    print(f"notifies:               {stats.notifies:>10,}")
+    print(f"signals sent:           {stats.signals_sent:>10,}")
+    print(f"state writes (scoped):  {writes:>10,}")
+    print(f"state writes (global):  {broadcast_writes:>10,}")
+    print(f"writes per message:     {writes / stats.notifies:>10.2f}")
+    print()
+
+
+def main() -> None:
+    run(messages_per_tick=1)
+    run(messages_per_tick=3)
+
+
+if __name__ == "__main__":
+    main()
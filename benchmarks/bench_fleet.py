@@ -0,0 +1,48 @@
+"""Message throughput of ElecqOcppManager as the fleet grows.
+
+Every message looks up its station by charge point id and runs the
+TransactionEvent(Updated) path, so throughput should stay flat with the
+number of registered stations.
+"""
+from __future__ import annotations
+
+import time
+
+from ._common import make_manager, meter_value, patch_dispatcher
+
+FLEET_SIZES = (1, 10, 100, 500, 1000)
+MESSAGES = 200_000
+
+
+def run(fleet_size: int, messages: int = MESSAGES) -> float:
+    patch_dispatcher()
+    manager = make_manager()
+    cp_ids = [f"AU101B2G{i:06d}" for i in range(fleet_size)]
+    for cp_id in cp_ids:
+        manager.async_get_or_create_station(cp_id)
+
+    transaction_info = {"transaction_id": "tx-1", "charging_state": "Charging"}
+    payloads = [meter_value(7200.0 + i, 1_000_000.0 + i) for i in range(64)]
+
+    start = time.perf_counter()
+    for i in range(messages):
+        station = manager.get_station(cp_ids[i % fleet_size])
+        station.update_transaction_event(
+            event_type="Updated",
+            trigger_reason="MeterValuePeriodic",
+            transaction_info=transaction_info,
+            meter_value=payloads[i & 63],
+        )
+    manager.hass.run_pending()
+    elapsed = time.perf_counter() - start
+    return messages / elapsed
+
+
+def main() -> None:
+    print(f"{'stations':>8}  {'msgs/s':>12}")
+    for size in FLEET_SIZES:
+        print(f"{size:>8}  {run(size):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
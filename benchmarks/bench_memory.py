@@ -0,0 +1,67 @@
+"""Memory held per station, and whether it grows during long sessions.
+
+Registers a fleet, runs a charging session on every station with a fresh
+payload per message (as the websocket delivers them) and measures the
+traced heap after the first and after the last message. With compact state
+the second column must not grow with the session length; raw payload
+retention adds a bounded amount on top. Power rollups are allocated on a
+station's first sample, so they are in the first column already.
+
+    python -m benchmarks.bench_memory
+"""
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+from ._common import make_manager, meter_value, patch_dispatcher
+
+FLEET_SIZES = (10, 100, 500)
+MESSAGES_PER_STATION = (1, 100, 1000)
+
+
+def run(fleet_size: int, messages: int, raw_payloads: int = 0) -> float:
+    """Traced bytes per station after `messages` TransactionEvents each."""
+    patch_dispatcher()
+    manager = make_manager(raw_payloads=raw_payloads)
+    hass = manager.hass
+    cp_ids = [f"AU101B2G{i:06d}" for i in range(fleet_size)]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for cp_id in cp_ids:
+        manager.async_get_or_create_station(cp_id)
+    for i in range(messages):
+        for n, cp_id in enumerate(cp_ids):
+            manager.get_station(cp_id).update_transaction_event(
+                event_type="Updated",
+                trigger_reason="MeterValuePeriodic",
+                transaction_info={
+                    "transaction_id": f"tx-{n}",
+                    "charging_state": "Charging",
+                },
+                meter_value=meter_value(7200.0 + i % 50, 1_000_000.0 + i),
+            )
+        hass.run_pending()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / fleet_size
+
+
+def main() -> None:
+    header = "".join(f"{m:>10} msg" for m in MESSAGES_PER_STATION)
+    for raw in (0, 100):
+        print(f"raw_payloads={raw}: bytes per station after")
+        print(f"{'stations':>8}{header}")
+        for size in FLEET_SIZES:
+            row = "".join(
+                f"{run(size, m, raw):>14,.0f}" for m in MESSAGES_PER_STATION
+            )
+            print(f"{size:>8}{row}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
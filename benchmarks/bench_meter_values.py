@@ -0,0 +1,63 @@
+"""Sampled values decoded per second by the table-driven meter decoder."""
+from __future__ import annotations
+
+import time
+
+from custom_components.elecq_ocpp.meter_values import MeterReading, decode_meter_values
+
+MESSAGES = 100_000
+
+
+def _sv(value, measurand, unit=None, phase=None, location=None, multiplier=None):
+    sv = {"value": value, "measurand": measurand}
+    if unit is not None or multiplier is not None:
+        sv["unit_of_measure"] = {"unit": unit}
+        if multiplier is not None:
+            sv["unit_of_measure"]["multiplier"] = multiplier
+    if phase is not None:
+        sv["phase"] = phase
+    if location is not None:
+        sv["location"] = location
+    return sv
+
+
+# A three phase sample as a full-featured charger reports it (snake_case, as
+# handed over by the ocpp library)
+PAYLOAD = [
+    {
+        "timestamp": "2025-01-01T12:00:00Z",
+        "sampled_value": [
+            _sv(11040.0, "Power.Active.Import", "W", location="Outlet"),
+            _sv(1234567.0, "Energy.Active.Import.Register", "Wh", location="Outlet"),
+            _sv(16.0, "Current.Import", "A", phase="L1"),
+            _sv(16.1, "Current.Import", "A", phase="L2"),
+            _sv(15.9, "Current.Import", "A", phase="L3"),
+            _sv(230.1, "Voltage", "V", phase="L1-N"),
+            _sv(229.8, "Voltage", "V", phase="L2-N"),
+            _sv(231.0, "Voltage", "V", phase="L3-N"),
+            _sv(50.0, "Frequency"),
+            _sv(64.0, "SoC", "Percent", location="EV"),
+            _sv(16.0, "Current.Offered", "A"),
+            _sv(11.0, "Power.Offered", "W", multiplier=3),
+        ],
+    }
+]
+
+
+def main() -> None:
+    reading = MeterReading()
+    per_message = len(PAYLOAD[0]["sampled_value"])
+
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        decode_meter_values(PAYLOAD, reading)
+    elapsed = time.perf_counter() - start
+
+    print(f"sampled values per message: {per_message}")
+    print(f"messages/s:                 {MESSAGES / elapsed:>12,.0f}")
+    print(f"sampled values/s:           {MESSAGES * per_message / elapsed:>12,.0f}")
+    print(f"ns per sampled value:       {elapsed / (MESSAGES * per_message) * 1e9:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Import and setup cost of the integration at Home Assistant startup.
+
+Each measurement runs in a fresh interpreter so nothing is cached:
+
+- platforms: importing the integration and its sensor, binary_sensor and
+  switch platforms, which is what Home Assistant does during startup.
+- ocpp stack: importing charge_point (ocpp, jsonschema, websockets), which
+  the manager defers to the executor until the server starts.
+- setup: creating the manager and kicking off the server start, i.e. the
+  part of async_setup_entry that runs before it returns.
+
+Exits non-zero if importing the platforms loads the OCPP stack, or if the
+platform import or setup is slower than --max-import-ms / --max-setup-ms.
+
+    python -m benchmarks.bench_startup
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+REPEATS = 5
+
+# Modules that must only be imported once a server is started
+DEFERRED_MODULES = ("ocpp", "websockets", "jsonschema")
+
+_PLATFORMS = f"""
+import json, sys, time
+start = time.perf_counter()
+import custom_components.elecq_ocpp
+from custom_components.elecq_ocpp import binary_sensor, sensor, switch
+elapsed = time.perf_counter() - start
+loaded = [m for m in {DEFERRED_MODULES!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded}}))
+"""
+
+_OCPP_STACK = """
+import json, time
+from custom_components.elecq_ocpp import binary_sensor, sensor, switch
+start = time.perf_counter()
+from custom_components.elecq_ocpp import charge_point
+print(json.dumps({"ms": (time.perf_counter() - start) * 1000}))
+"""
+
+_SETUP = """
+import json, time
+from benchmarks._common import make_manager
+manager = make_manager()
+start = time.perf_counter()
+manager.async_start()
+elapsed = time.perf_counter() - start
+manager._start_task.cancel()
+print(json.dumps({"ms": elapsed * 1000}))
+"""
+
+
+def _run(script: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _best(script: str) -> dict:
+    results = [_run(script) for _ in range(REPEATS)]
+    return min(results, key=lambda r: r["ms"])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-setup-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    platforms = _best(_PLATFORMS)
+    ocpp_stack = _best(_OCPP_STACK)
+    setup = _best(_SETUP)
+
+    print(f"{'platforms':<12} {platforms['ms']:>9.1f} ms")
+    print(f"{'ocpp stack':<12} {ocpp_stack['ms']:>9.1f} ms  (deferred)")
+    print(f"{'setup':<12} {setup['ms']:>9.3f} ms")
+
+    failed = False
+    if platforms["loaded"]:
+        print(f"FAIL: platform import loaded {', '.join(platforms['loaded'])}")
+        failed = True
+    if args.max_import_ms is not None and platforms["ms"] > args.max_import_ms:
+        print(f"FAIL: platform import over {args.max_import_ms} ms")
+        failed = True
+    if args.max_setup_ms is not None and setup["ms"] > args.max_setup_ms:
+        print(f"FAIL: setup over {args.max_setup_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
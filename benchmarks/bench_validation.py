@@ -0,0 +1,91 @@
+"""Inbound OCPP messages per second with and without schema validation.
+
+Feeds raw OCPP-J frames through ElecqChargePoint.route_message, i.e. the
+full library path: parse, JSON schema validation of call and response,
+camelCase/snake_case conversion, our handler and the response frame. Each
+action runs once with full validation and once with the trusted LAN fast
+path (skip_schema_validation), which only skips validation for Heartbeat and
+TransactionEvent(Updated).
+
+    python -m benchmarks.bench_validation
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+from ocpp.charge_point import snake_to_camel_case
+
+from custom_components.elecq_ocpp.charge_point import ElecqChargePoint
+
+from ._common import make_manager, patch_dispatcher
+
+PAYLOADS = Path(__file__).parent / "payloads" / "au101_session.json"
+MESSAGES = 20_000
+
+
+class NullConnection:
+    """Websocket stand-in that drops everything sent to it."""
+
+    async def send(self, message: str) -> None:
+        pass
+
+
+def _frames(action: str, payloads: list[dict], count: int) -> list[str]:
+    frames = []
+    for i in range(count):
+        payload = dict(payloads[i % len(payloads)])
+        if action == "TransactionEvent":
+            # Unique seq_nos so no message is dropped as a duplicate
+            payload["seq_no"] = i + 1
+        frames.append(
+            json.dumps([2, str(i), action, snake_to_camel_case(payload)])
+        )
+    return frames
+
+
+def run(action: str, frames: list[str], skip: bool) -> float:
+    manager = make_manager()
+    manager.skip_schema_validation = skip
+    station = manager.async_get_or_create_station("AU101B2G00127D")
+    cp = ElecqChargePoint(station.cp_id, NullConnection(), station)
+
+    async def _feed() -> None:
+        for frame in frames:
+            await cp.route_message(frame)
+
+    loop = manager.hass.loop
+    start = time.perf_counter()
+    loop.run_until_complete(_feed())
+    elapsed = time.perf_counter() - start
+    return len(frames) / elapsed
+
+
+def main() -> None:
+    patch_dispatcher()
+    payloads = json.loads(PAYLOADS.read_text())
+    updates = [
+        e for e in payloads["transaction_event"] if e["event_type"] == "Updated"
+    ]
+    cases = {
+        "TransactionEvent(Updated)": _frames("TransactionEvent", updates, MESSAGES),
+        "Heartbeat": _frames("Heartbeat", [{}], MESSAGES),
+        "StatusNotification": _frames(
+            "StatusNotification", payloads["status_notification"], MESSAGES
+        ),
+    }
+
+    print(f"{'action':<26} {'validated':>12} {'fast path':>12} {'speedup':>8}")
+    for name, frames in cases.items():
+        action = name.split("(")[0]
+        validated = run(action, frames, skip=False)
+        fast = run(action, frames, skip=True)
+        print(
+            f"{name:<26} {validated:>10,.0f}/s {fast:>10,.0f}/s "
+            f"{fast / validated:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Microbenchmarks of the per-message hot paths, checked against a baseline.
+
+Drives update_meter_values, update_transaction_event, the StatusNotification
+handler, the change-aware publish, the time-of-use session cost and entity
+state rendering with the representative payloads in payloads/, on a stub
+hass with a counting dispatcher. Reports ns/op, and from tracemalloc the
+bytes allocated per op and the memory blocks still held after it.
+
+    python -m benchmarks.regression                   # compare with baseline
+    python -m benchmarks.regression --update-baseline # store new baseline
+
+Exits non-zero when a case is slower or allocates more bytes per op than
+the baseline by more than --tolerance (relative), or retains more memory
+blocks per op, and when there is no baseline to compare with. Baselines
+are machine specific: record them on the machine that runs the check.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from custom_components.elecq_ocpp import binary_sensor, sensor, switch
+from custom_components.elecq_ocpp.charge_point import ElecqChargePoint
+from custom_components.elecq_ocpp.tariff import TariffSchedule
+
+from ._common import make_manager, patch_dispatcher
+
+HERE = Path(__file__).parent
+PAYLOADS = HERE / "payloads" / "au101_session.json"
+BASELINE = HERE / "baseline.json"
+
+TARIFF = "0.25; mon-fri 07:00-21:00=0.35; 00:00-06:00=0.12; sat,sun=0.20"
+# A Monday morning, so the samples cross price boundaries
+TARIFF_T0 = datetime(2025, 3, 3, 5, 0, tzinfo=timezone.utc).timestamp()
+
+OPS = 20_000
+REPEATS = 5
+
+
+def _drive(coro) -> None:
+    """Run a coroutine that never suspends, without an event loop round trip."""
+    try:
+        coro.send(None)
+    except StopIteration:
+        return
+    raise RuntimeError("handler suspended")
+
+
+def build_cases() -> dict[str, Callable[[int], None]]:
+    patch_dispatcher()
+    payloads = json.loads(PAYLOADS.read_text())
+    manager = make_manager()
+    station = manager.async_get_or_create_station("AU101B2G00127D")
+    cp = ElecqChargePoint(station.cp_id, None, station)
+
+    events = payloads["transaction_event"]
+    started, updates = events[0], [e for e in events if e["event_type"] == "Updated"]
+    statuses = payloads["status_notification"]
+    station.update_transaction_event(**started)
+
+    costed = make_manager()
+    costed.tariff = TariffSchedule.parse(TARIFF, timezone.utc)
+    costed_station = costed.async_get_or_create_station("AU101B2G00127D")
+    costed_station.update_transaction_event(**started)
+
+    entities = [
+        sensor.ElecqPowerSensor(station),
+        sensor.ElecqSmoothedPowerSensor(station),
+        sensor.ElecqEnergySensor(station),
+        sensor.ElecqSessionEnergySensor(station),
+        sensor.ElecqSessionCostSensor(costed_station),
+        sensor.ElecqSessionAveragePriceSensor(costed_station),
+        sensor.ElecqStatusSensor(station),
+        sensor.ElecqChargingStateSensor(station),
+        *(sensor.ElecqMeterSensor(station, d) for d in sensor.METER_SENSORS),
+        binary_sensor.ElecqPluggedInBinarySensor(station),
+        binary_sensor.ElecqChargingBinarySensor(station),
+        switch.ElecqChargingSwitch(station),
+    ]
+
+    def meter_values(i: int) -> None:
+        station.update_meter_values(updates[i & 1]["meter_value"])
+
+    # Never repeats across warm-up and repeats: a reused seq_no is a
+    # duplicate and would only time the dedupe check
+    seq_nos = itertools.count(1000)
+
+    def transaction_event(i: int) -> None:
+        event = updates[i & 1]
+        station.update_transaction_event(
+            event["event_type"],
+            event["trigger_reason"],
+            event["transaction_info"],
+            event["meter_value"],
+            seq_no=next(seq_nos),
+            timestamp=event["timestamp"],
+        )
+
+    def status_notification(i: int) -> None:
+        _drive(cp.on_status(**statuses[0]))
+
+    def session_cost(i: int) -> None:
+        # One 10 s sample at 7.2 kW
+        costed_station._update_session_energy(1000.0 + i * 0.02, TARIFF_T0 + i * 10.0)
+
+    def publish(i: int) -> None:
+        station.state.power_kw = 7.0 + (i & 1)
+        station._async_publish()
+
+    def entity_render(i: int) -> None:
+        for entity in entities:
+            if hasattr(entity, "native_value"):
+                entity.native_value
+            else:
+                entity.is_on
+            entity.extra_state_attributes
+
+    return {
+        "meter_values": meter_values,
+        "transaction_event": transaction_event,
+        "status_notification": status_notification,
+        "session_cost": session_cost,
+        "publish": publish,
+        "entity_render": entity_render,
+    }
+
+
+# tracemalloc's own bookkeeping shows up in snapshots; leave it out
+_TRACE_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+def _retained_blocks(before: tracemalloc.Snapshot) -> int:
+    after = tracemalloc.take_snapshot().filter_traces(_TRACE_FILTERS)
+    return sum(
+        stat.count_diff
+        for stat in after.compare_to(before.filter_traces(_TRACE_FILTERS), "filename")
+    )
+
+
+def measure(op: Callable[[int], None], ops: int = OPS) -> dict[str, float]:
+    for i in range(1000):
+        op(i)
+
+    best = float("inf")
+    for _ in range(REPEATS):
+        gc.collect()
+        start = time.perf_counter_ns()
+        for i in range(ops):
+            op(i)
+        best = min(best, (time.perf_counter_ns() - start) / ops)
+
+    # Bytes allocated by each op, freed or not: the peak it reaches over the
+    # memory traced when it starts. Timed separately, tracing is slow
+    gc.collect()
+    tracemalloc.start()
+    allocated = 0
+    for i in range(ops):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        op(i)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    for i in range(ops):
+        op(i)
+    gc.collect()
+    retained = max(_retained_blocks(snapshot), 0) / ops
+    tracemalloc.stop()
+
+    return {
+        "ns_per_op": round(best, 1),
+        "alloc_bytes_per_op": round(allocated / ops, 1),
+        "retained_blocks_per_op": round(retained, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="OCPP hot path benchmarks")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    args = parser.parse_args()
+
+    results = {name: measure(op) for name, op in build_cases().items()}
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    failed = False
+    print(
+        f"{'case':<22}{'ns/op':>10}{'base':>10}{'B/op':>8}{'base':>8}"
+        f"{'retained/op':>13}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name) or {}
+        verdict = ""
+        if "ns_per_op" in base:
+            if result["ns_per_op"] > base["ns_per_op"] * (1 + args.tolerance):
+                verdict = "  SLOWER"
+                failed = True
+        # Baselines from before allocation tracking only have ns_per_op
+        if "alloc_bytes_per_op" in base:
+            limit = base["alloc_bytes_per_op"] * (1 + args.tolerance)
+            if result["alloc_bytes_per_op"] > limit:
+                verdict += "  ALLOCATES MORE"
+                failed = True
+        if "retained_blocks_per_op" in base:
+            if result["retained_blocks_per_op"] > base["retained_blocks_per_op"] + 0.5:
+                verdict += "  RETAINS MEMORY"
+                failed = True
+        print(
+            f"{name:<22}{result['ns_per_op']:>10,.0f}"
+            f"{base.get('ns_per_op', float('nan')):>10,.0f}"
+            f"{result['alloc_bytes_per_op']:>8,.0f}"
+            f"{base.get('alloc_bytes_per_op', float('nan')):>8,.0f}"
+            f"{result['retained_blocks_per_op']:>13.3f}{verdict}"
+        )
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
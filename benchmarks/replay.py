@@ -0,0 +1,301 @@
+"""Replay captured OCPP traffic through the handlers, without a socket.
+
+Feeds every inbound call of a capture file (see elecq_ocpp.export_capture)
+to ElecqChargePoint.route_message as fast as possible, so parsing, schema
+validation, the handlers and the station state logic all run as they do
+live. After each message the charging state of the station is compared
+with the previous one and changes form a timeline, which is checked against
+a golden file. The replay is then repeated on fresh managers to report the
+throughput of that real-world message mix.
+
+    python -m benchmarks.replay                          # built-in AU101 trace
+    python -m benchmarks.replay capture.jsonl            # a real capture
+    python -m benchmarks.replay capture.jsonl --update-golden
+
+Without a capture file a trace is built from payloads/au101_session.json
+with a duplicate resend, a suspension and a stale offline event mixed in.
+Responses the charger sent to our own calls are skipped; the calls the
+handlers make (the hydration after BootNotification) are answered by the
+stand-in connection instead. Exits non-zero when the timeline differs from
+the golden file, there is no golden file (record one with --update-golden)
+or a replay leaves tasks or commands behind.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from custom_components.elecq_ocpp.capture import read_capture
+from custom_components.elecq_ocpp.charge_point import ElecqChargePoint
+from custom_components.elecq_ocpp.ocpp_server import (
+    ElecqChargerState,
+    ElecqOcppManager,
+)
+
+from ._common import StubHass, make_manager, patch_dispatcher
+
+HERE = Path(__file__).parent
+PAYLOADS = HERE / "payloads" / "au101_session.json"
+GOLDEN_DIR = HERE / "golden"
+
+# State fields making up the timeline
+TIMELINE_FIELDS = (
+    "last_status",
+    "plugged_in",
+    "charging",
+    "last_charging_state",
+    "transaction_id",
+    "session_energy_kwh",
+)
+
+_CAMEL = re.compile(r"_([a-z])")
+
+
+# Answers of a charger with nothing to add to the replayed traffic
+_ANSWERS: dict[str, dict[str, Any]] = {
+    "TriggerMessage": {"status": "Rejected"},
+    "GetTransactionStatus": {"messagesInQueue": False},
+}
+
+
+class _NullConnection:
+    """Stands in for the websocket.
+
+    Responses to the charger's calls are counted, not sent. Our own calls
+    are answered from _ANSWERS, so the commands they start complete.
+    """
+
+    def __init__(self) -> None:
+        self.sent = 0
+        self.cp: Optional[ElecqChargePoint] = None
+        self._answers: set[asyncio.Task] = set()
+
+    async def send(self, message: str) -> None:
+        self.sent += 1
+        if self.cp is None or message.lstrip()[1:].lstrip()[:1] != "2":
+            return
+        _, unique_id, action, _ = json.loads(message)
+        answer = json.dumps([3, unique_id, _ANSWERS.get(action, {})])
+        # Routed once the caller waits for it, as from the socket
+        task = asyncio.get_running_loop().create_task(self.cp.route_message(answer))
+        self._answers.add(task)
+        task.add_done_callback(self._answers.discard)
+
+
+def _pending_tasks() -> list[asyncio.Task]:
+    current = asyncio.current_task()
+    return [t for t in asyncio.all_tasks() if t is not current and not t.done()]
+
+
+async def _settle(timeout: float = 30.0) -> None:
+    """Wait for the tasks the replayed messages started."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while (pending := _pending_tasks()) and loop.time() < deadline:
+        await asyncio.wait(pending, timeout=deadline - loop.time())
+
+
+def _camel(value: Any) -> Any:
+    """Payload keys as they are on the wire (the payload file is snake_case)."""
+    if isinstance(value, dict):
+        return {
+            _CAMEL.sub(lambda m: m.group(1).upper(), key): _camel(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_camel(item) for item in value]
+    return value
+
+
+def builtin_trace(cp_id: str = "AU101B2G00127D") -> list[dict[str, Any]]:
+    """A capture of one messy AU101 session, from payloads/."""
+    payloads = json.loads(PAYLOADS.read_text())
+    plugged, available = payloads["status_notification"]
+    started, update_a, update_b, ended = payloads["transaction_event"]
+
+    suspended = json.loads(json.dumps(update_b))
+    suspended["seq_no"] = 15
+    suspended["timestamp"] = "2025-03-02T18:12:02Z"
+    suspended["transaction_info"]["charging_state"] = "SuspendedEV"
+    stale = json.loads(json.dumps(update_a))
+    stale["seq_no"] = 12
+    stale["timestamp"] = "2025-03-02T18:09:02Z"
+    stale["offline"] = True
+
+    calls = [
+        (
+            "BootNotification",
+            {
+                "charging_station": {"model": "AU101", "vendor_name": "Elecq"},
+                "reason": "PowerUp",
+            },
+        ),
+        ("StatusNotification", plugged),
+        ("TransactionEvent", started),
+        ("TransactionEvent", update_a),
+        ("TransactionEvent", update_b),
+        # Resent after a lost response
+        ("TransactionEvent", update_b),
+        ("Heartbeat", {}),
+        ("TransactionEvent", suspended),
+        # Queued while offline and older than the live state
+        ("TransactionEvent", stale),
+        ("TransactionEvent", ended),
+        ("StatusNotification", available),
+    ]
+    return [
+        {
+            "ts": float(n),
+            "cp_id": cp_id,
+            "dir": "in",
+            "frame": json.dumps([2, f"msg-{n}", action, _camel(payload)]),
+        }
+        for n, (action, payload) in enumerate(calls)
+    ]
+
+
+def _snapshot(state: ElecqChargerState) -> dict[str, Any]:
+    snap = {name: getattr(state, name) for name in TIMELINE_FIELDS}
+    if snap["session_energy_kwh"] is not None:
+        snap["session_energy_kwh"] = round(snap["session_energy_kwh"], 3)
+    return snap
+
+
+async def replay(
+    frames: list[dict[str, Any]],
+    manager: ElecqOcppManager,
+    timeline: Optional[list[dict[str, Any]]] = None,
+) -> int:
+    """Route the inbound calls of a capture; returns how many were routed.
+
+    With a timeline list, every change of a station's timeline fields is
+    appended to it.
+    """
+    charge_points: dict[str, ElecqChargePoint] = {}
+    last: dict[str, dict[str, Any]] = {}
+    routed = 0
+    for n, record in enumerate(frames):
+        raw = record["frame"]
+        if record["dir"] != "in" or raw.lstrip()[1:].lstrip()[:1] != "2":
+            continue
+        cp_id = record["cp_id"]
+        cp = charge_points.get(cp_id)
+        if cp is None:
+            station = manager.async_get_or_create_station(cp_id)
+            connection = _NullConnection()
+            cp = ElecqChargePoint(cp_id, connection, station)
+            charge_points[cp_id] = station.cp = connection.cp = cp
+        await cp.route_message(raw)
+        routed += 1
+        # Let the coalesced publish and @after handlers run, as live
+        await asyncio.sleep(0)
+        if timeline is not None:
+            snap = _snapshot(cp._station.state)
+            if snap != last.get(cp_id):
+                last[cp_id] = snap
+                timeline.append({"frame": n, "cp_id": cp_id, **snap})
+    await _settle()
+    return routed
+
+
+def _leftovers(manager: ElecqOcppManager) -> Optional[str]:
+    """What a finished replay left running, if anything."""
+    tasks = [t for t in asyncio.all_tasks(manager.hass.loop) if not t.done()]
+    if tasks:
+        return f"{len(tasks)} task(s) still pending"
+    for station in manager.stations:
+        if station._hydrating or station.commands.pending:
+            return (
+                f"{station.cp_id}: hydrating={station._hydrating}, "
+                f"{station.commands.pending} command(s) queued"
+            )
+    return None
+
+
+def _new_manager(
+    loop: asyncio.AbstractEventLoop, fast_path: bool
+) -> ElecqOcppManager:
+    manager = make_manager(StubHass(loop))
+    manager.skip_schema_validation = fast_path
+    return manager
+
+
+def _compare(
+    timeline: list[dict[str, Any]], golden: list[dict[str, Any]]
+) -> Optional[str]:
+    for n, (got, want) in enumerate(zip(timeline, golden)):
+        if got != want:
+            return f"entry {n}: expected {want}, got {got}"
+    if len(timeline) != len(golden):
+        return f"{len(timeline)} timeline entries, golden has {len(golden)}"
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay captured OCPP traffic")
+    parser.add_argument("capture", nargs="?", type=Path)
+    parser.add_argument("--golden", type=Path)
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--skip-schema-validation",
+        action="store_true",
+        help="replay with the trusted LAN fast path",
+    )
+    args = parser.parse_args()
+
+    if args.capture is None:
+        frames = builtin_trace()
+        name = "au101_session"
+    else:
+        frames = read_capture(str(args.capture))
+        name = args.capture.stem
+    golden_path = args.golden or GOLDEN_DIR / f"{name}.json"
+
+    patch_dispatcher()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    timeline: list[dict[str, Any]] = []
+    manager = _new_manager(loop, args.skip_schema_validation)
+    routed = loop.run_until_complete(replay(frames, manager, timeline))
+    leftover = _leftovers(manager)
+    if leftover is not None:
+        print(f"Replay did not settle: {leftover}")
+        return 1
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        manager = _new_manager(loop, args.skip_schema_validation)
+        loop.run_until_complete(replay(frames, manager))
+    elapsed = time.perf_counter() - start
+    if args.repeat:
+        print(
+            f"{routed} calls x {args.repeat}: "
+            f"{routed * args.repeat / elapsed:,.0f} msg/s"
+        )
+
+    if args.update_golden:
+        golden_path.parent.mkdir(exist_ok=True)
+        golden_path.write_text(json.dumps(timeline, indent=1) + "\n")
+        print(f"Golden timeline ({len(timeline)} entries) written to {golden_path}")
+        return 0
+    if not golden_path.exists():
+        print(f"No golden timeline at {golden_path}; run with --update-golden.")
+        return 1
+    mismatch = _compare(timeline, json.loads(golden_path.read_text()))
+    if mismatch is not None:
+        print(f"Timeline differs from {golden_path}: {mismatch}")
+        return 1
+    print(f"Timeline matches {golden_path} ({len(timeline)} entries)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""OCPP 2.0.1 charge point simulator and load generator.
+
+Opens many concurrent ocpp2.0.1 websocket sessions, plays a charging session
+on each (BootNotification, StatusNotification, TransactionEvent Started /
+Updated / Ended, Heartbeat) and answers RequestStartTransaction,
+RequestStopTransaction, TriggerMessage and GetTransactionStatus. Reports
+message throughput, the charger side round trip per action (network, server
+queueing and handling) and memory use. With --serve it also reports the
+time spent in the server's handlers per action, from the integration's
+instrumentation, and the time from connect to the hydrated state.
+
+Against a running integration:
+
+    python -m benchmarks.simulator --url ws://127.0.0.1:9006 --stations 50
+
+Fully offline, with an in-process ElecqOcppManager on a local port:
+
+    python -m benchmarks.simulator --serve --stations 200 --duration 60
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import random
+import resource
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import websockets
+
+from ocpp.routing import on
+from ocpp.v201 import ChargePoint as OcppChargePointBase
+from ocpp.v201 import call, call_result
+
+from custom_components.elecq_ocpp.metrics import Histogram
+
+from ._common import StubHass, make_manager, patch_dispatcher
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class LoadStats:
+    """Round trips of every call as the charger sees them, by action."""
+
+    def __init__(self) -> None:
+        self.round_trips: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.inbound = 0
+
+    def report(self, elapsed: float) -> None:
+        total = sum(len(v) for v in self.round_trips.values())
+        print(f"duration:          {elapsed:>10.1f} s")
+        print(f"calls completed:   {total:>10,}")
+        print(f"throughput:        {total / elapsed:>10,.0f} msgs/s")
+        print(f"commands answered: {self.inbound:>10,}")
+        print()
+        print("round trip (charger side)")
+        print(f"{'action':<22}{'count':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for action, values in sorted(self.round_trips.items()):
+            values.sort()
+            p50 = statistics.median(values) * 1000
+            p99 = values[min(len(values) - 1, int(len(values) * 0.99))] * 1000
+            print(
+                f"{action:<22}{len(values):>9,}{p50:>10.2f}{p99:>10.2f}"
+                f"{self.errors.get(action, 0):>8}"
+            )
+        rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print()
+        print(f"peak RSS:          {rss_kib / 1024:>10.1f} MiB")
+
+
+class SimulatedChargePoint(OcppChargePointBase):
+    """A charger that plugs in, charges and answers remote commands."""
+
+    def __init__(self, cp_id, connection, stats: LoadStats, args) -> None:
+        super().__init__(cp_id, connection)
+        self._stats = stats
+        self._args = args
+        self._seq = itertools.count()
+        self._transaction_id: str | None = None
+        self._energy_wh = random.uniform(0, 1_000_000)
+
+    async def _timed(self, payload):
+        action = type(payload).__name__
+        start = time.perf_counter()
+        try:
+            response = await self.call(payload)
+        except Exception:  # noqa: BLE001
+            self._stats.errors[action] += 1
+            return None
+        self._stats.round_trips[action].append(time.perf_counter() - start)
+        return response
+
+    async def _status(self, status: str) -> None:
+        await self._timed(
+            call.StatusNotification(
+                timestamp=_now(),
+                connector_status=status,
+                evse_id=1,
+                connector_id=1,
+            )
+        )
+
+    async def _transaction_event(
+        self, event_type: str, trigger_reason: str, charging_state: str
+    ) -> None:
+        power_w = random.uniform(6800, 7400) if charging_state == "Charging" else 0.0
+        self._energy_wh += power_w * self._args.meter_interval / 3600
+        await self._timed(
+            call.TransactionEvent(
+                event_type=event_type,
+                timestamp=_now(),
+                trigger_reason=trigger_reason,
+                seq_no=next(self._seq),
+                transaction_info={
+                    "transactionId": self._transaction_id,
+                    "chargingState": charging_state,
+                },
+                meter_value=[
+                    {
+                        "timestamp": _now(),
+                        "sampledValue": [
+                            {
+                                "value": round(power_w, 1),
+                                "measurand": "Power.Active.Import",
+                                "unitOfMeasure": {"unit": "W"},
+                            },
+                            {
+                                "value": round(self._energy_wh, 1),
+                                "measurand": "Energy.Active.Import.Register",
+                                "unitOfMeasure": {"unit": "Wh"},
+                            },
+                        ],
+                    }
+                ],
+            )
+        )
+
+    async def _start_transaction(self) -> None:
+        self._transaction_id = f"{self.id}-{int(time.time() * 1000)}"
+        self._seq = itertools.count()
+        await self._transaction_event("Started", "CablePluggedIn", "EVConnected")
+        await self._transaction_event("Updated", "ChargingStateChanged", "Charging")
+
+    async def _end_transaction(self, reason: str) -> None:
+        if self._transaction_id is None:
+            return
+        await self._transaction_event("Ended", reason, "Idle")
+        self._transaction_id = None
+
+    async def run_session(self) -> None:
+        args = self._args
+        await self._timed(
+            call.BootNotification(
+                charging_station={"model": "AU101", "vendorName": "Elecq"},
+                reason="PowerUp",
+            )
+        )
+        await self._status("Available")
+        await self._status("Occupied")
+        await self._start_transaction()
+
+        next_heartbeat = time.monotonic() + args.heartbeat_interval
+        next_status = time.monotonic() + args.status_interval
+        while True:
+            await asyncio.sleep(args.meter_interval)
+            if self._transaction_id is not None:
+                await self._transaction_event(
+                    "Updated", "MeterValuePeriodic", "Charging"
+                )
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                next_heartbeat = now + args.heartbeat_interval
+                await self._timed(call.Heartbeat())
+            if now >= next_status:
+                next_status = now + args.status_interval
+                await self._status("Occupied")
+
+    @on("RequestStartTransaction")
+    async def on_request_start(self, id_token, remote_start_id, **kwargs):
+        self._stats.inbound += 1
+        asyncio.create_task(self._start_transaction())
+        return call_result.RequestStartTransaction(status="Accepted")
+
+    @on("RequestStopTransaction")
+    async def on_request_stop(self, transaction_id, **kwargs):
+        self._stats.inbound += 1
+        asyncio.create_task(self._end_transaction("RemoteStop"))
+        return call_result.RequestStopTransaction(status="Accepted")
+
+    async def _meter_values(self) -> None:
+        await self._timed(
+            call.MeterValues(
+                evse_id=1,
+                meter_value=[
+                    {
+                        "timestamp": _now(),
+                        "sampledValue": [
+                            {
+                                "value": round(self._energy_wh, 1),
+                                "measurand": "Energy.Active.Import.Register",
+                                "unitOfMeasure": {"unit": "Wh"},
+                            }
+                        ],
+                    }
+                ],
+            )
+        )
+
+    @on("TriggerMessage")
+    async def on_trigger(self, requested_message, **kwargs):
+        self._stats.inbound += 1
+        if requested_message == "StatusNotification":
+            asyncio.create_task(self._status("Occupied"))
+        elif requested_message == "Heartbeat":
+            asyncio.create_task(self._timed(call.Heartbeat()))
+        elif requested_message == "MeterValues":
+            asyncio.create_task(self._meter_values())
+        elif requested_message == "TransactionEvent":
+            if self._transaction_id is None:
+                return call_result.TriggerMessage(status="Rejected")
+            asyncio.create_task(
+                self._transaction_event("Updated", "Trigger", "Charging")
+            )
+        else:
+            return call_result.TriggerMessage(status="NotImplemented")
+        return call_result.TriggerMessage(status="Accepted")
+
+    @on("GetTransactionStatus")
+    async def on_get_transaction_status(self, **kwargs):
+        self._stats.inbound += 1
+        return call_result.GetTransactionStatus(messages_in_queue=False)
+
+
+async def _run_station(url: str, cp_id: str, stats: LoadStats, args) -> None:
+    async with websockets.connect(
+        f"{url.rstrip('/')}/{cp_id}", subprotocols=["ocpp2.0.1"]
+    ) as ws:
+        cp = SimulatedChargePoint(cp_id, ws, stats, args)
+        listener = asyncio.create_task(cp.start())
+        try:
+            await cp.run_session()
+        finally:
+            listener.cancel()
+
+
+async def _main(args) -> None:
+    manager = None
+    url = args.url
+    if args.serve:
+        patch_dispatcher()
+        manager = make_manager(
+            StubHass(asyncio.get_running_loop()),
+            publish_interval=1.0,
+            port=args.port,
+            instrumentation=True,
+        )
+        await manager.async_start_server()
+        url = f"ws://127.0.0.1:{args.port}"
+
+    stats = LoadStats()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(args.stations):
+        cp_id = f"SIM{i:05d}"
+        tasks.append(asyncio.create_task(_run_station(url, cp_id, stats, args)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.stations)
+
+    await asyncio.sleep(max(0.0, args.duration - (time.perf_counter() - start)))
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    handlers: dict[str, Histogram] = defaultdict(Histogram)
+    if manager is not None:
+        for station in manager.stations:
+            for action, metrics in station.metrics.actions.items():
+                if metrics.handler.count:
+                    handlers[action].merge(metrics.handler)
+        hydrated = sorted(
+            s.hydrated_in for s in manager.stations if s.hydrated_in is not None
+        )
+        await manager.async_stop_server()
+        print(f"stations registered: {len(manager.stations):>8,}")
+        if hydrated:
+            print(
+                f"connect to hydrated: p50 {statistics.median(hydrated) * 1000:.0f} ms"
+                f", max {hydrated[-1] * 1000:.0f} ms ({len(hydrated)} stations)"
+            )
+    stats.report(elapsed)
+    if handlers:
+        # Histogram buckets start at 1 ms, so the mean is the useful figure
+        print()
+        print("server handler time")
+        print(f"{'action':<22}{'count':>9}{'mean ms':>10}{'p99 ms':>10}{'max ms':>8}")
+        for action, histogram in sorted(handlers.items()):
+            print(
+                f"{action:<22}{histogram.count:>9,}"
+                f"{histogram.total_ms / histogram.count:>10.3f}"
+                f"{histogram.percentile(0.99):>10.0f}{histogram.max_ms:>8.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:9006")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="start an in-process ElecqOcppManager and load it instead of --url",
+    )
+    parser.add_argument("--port", type=int, default=9106)
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds to connect all")
+    parser.add_argument("--meter-interval", type=float, default=1.0)
+    parser.add_argument("--heartbeat-interval", type=float, default=60.0)
+    parser.add_argument("--status-interval", type=float, default=30.0)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -13,8 +16,61 @@ from .const import (
     CONF_ID_TOKEN,
     CONF_EVSE_ID,
     CONF_CONNECTOR_ID,
+    CONF_PUBLISH_INTERVAL,
+    CONF_SMOOTHING_FILTER,
+    CONF_SMOOTHING_WINDOW,
+    CONF_HISTORY,
+    CONF_HISTORY_RETENTION_DAYS,
+    CONF_HISTORY_COMPACT_DAYS,
+    CONF_IMPORT_STATISTICS,
+    CONF_INSTRUMENTATION,
+    CONF_SKIP_SCHEMA_VALIDATION,
+    CONF_GRID_ENTITY,
+    CONF_SITE_LIMIT_A,
+    CONF_SITE_PHASES,
+    CONF_SURPLUS_ENTITY,
+    CONF_MAX_COMMANDS_IN_FLIGHT,
+    CONF_ADAPTIVE_SAMPLING,
+    CONF_CHARGING_SAMPLE_INTERVAL,
+    CONF_IDLE_SAMPLE_INTERVAL,
+    CONF_SAMPLED_MEASURANDS,
+    CONF_RAW_PAYLOADS,
+    CONF_CAPTURE_FRAMES,
+    CONF_CHARGE_POINT_IDS,
+    CONF_POWER_ROLLUPS,
+    CONF_TARIFF,
+    DEFAULT_PUBLISH_INTERVAL,
+    DEFAULT_SMOOTHING_FILTER,
+    DEFAULT_SMOOTHING_WINDOW,
+    DEFAULT_HISTORY,
+    DEFAULT_HISTORY_RETENTION_DAYS,
+    DEFAULT_HISTORY_COMPACT_DAYS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_SKIP_SCHEMA_VALIDATION,
+    DEFAULT_SITE_LIMIT_A,
+    DEFAULT_SITE_PHASES,
+    DEFAULT_MAX_COMMANDS_IN_FLIGHT,
+    DEFAULT_ADAPTIVE_SAMPLING,
+    DEFAULT_CHARGING_SAMPLE_INTERVAL,
+    DEFAULT_IDLE_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLED_MEASURANDS,
+    DEFAULT_RAW_PAYLOADS,
+    DEFAULT_CAPTURE_FRAMES,
+    DEFAULT_CHARGE_POINT_IDS,
+    DEFAULT_POWER_ROLLUPS,
+    DEFAULT_TARIFF,
 )
+from .history import ElecqHistoryStore
+from .load_balancer import ElecqLoadBalancer
+from .migration import async_has_legacy_entities
+from .solar import ElecqSolarController
 from .ocpp_server import ElecqOcppManager
+from .sampling import SamplingPolicy
+from .services import async_setup_services
+from .state_store import ElecqStateStore
+from .tariff import TariffSchedule
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,9 +80,15 @@ PLATFORMS: list[str] = ["sensor", "binary_sensor", "switch"]
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up Elecq OCPP integration (YAML not used)."""
     hass.data.setdefault(DOMAIN, {})
+    await async_setup_services(hass)
+    async_setup_websocket_api(hass)
     return True
 
 
+def _history_path(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    return hass.config.path(f"{DOMAIN}_history_{entry.entry_id}.db")
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Elecq OCPP from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -35,28 +97,162 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     id_token: str = entry.data[CONF_ID_TOKEN]
     evse_id: int = entry.data[CONF_EVSE_ID]
     connector_id: int = entry.data[CONF_CONNECTOR_ID]
+    publish_interval: float = entry.options.get(
+        CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL
+    )
+    smoothing_filter: str = entry.options.get(
+        CONF_SMOOTHING_FILTER, DEFAULT_SMOOTHING_FILTER
+    )
+    smoothing_window: float = entry.options.get(
+        CONF_SMOOTHING_WINDOW, DEFAULT_SMOOTHING_WINDOW
+    )
+
+    history: ElecqHistoryStore | None = None
+    if entry.options.get(CONF_HISTORY, DEFAULT_HISTORY):
+        history = ElecqHistoryStore(
+            hass,
+            _history_path(hass, entry),
+            retention_days=entry.options.get(
+                CONF_HISTORY_RETENTION_DAYS, DEFAULT_HISTORY_RETENTION_DAYS
+            ),
+            compact_after_days=entry.options.get(
+                CONF_HISTORY_COMPACT_DAYS, DEFAULT_HISTORY_COMPACT_DAYS
+            ),
+        )
+
+    charge_point_ids = frozenset(
+        cp_id.strip()
+        for cp_id in entry.options.get(
+            CONF_CHARGE_POINT_IDS, DEFAULT_CHARGE_POINT_IDS
+        ).split(",")
+        if cp_id.strip()
+    )
+
+    sampling_policy: SamplingPolicy | None = None
+    if entry.options.get(CONF_ADAPTIVE_SAMPLING, DEFAULT_ADAPTIVE_SAMPLING):
+        measurands = entry.options.get(
+            CONF_SAMPLED_MEASURANDS, DEFAULT_SAMPLED_MEASURANDS
+        )
+        sampling_policy = SamplingPolicy(
+            charging_interval=entry.options.get(
+                CONF_CHARGING_SAMPLE_INTERVAL, DEFAULT_CHARGING_SAMPLE_INTERVAL
+            ),
+            idle_interval=entry.options.get(
+                CONF_IDLE_SAMPLE_INTERVAL, DEFAULT_IDLE_SAMPLE_INTERVAL
+            ),
+            measurands=tuple(
+                m.strip() for m in measurands.split(",") if m.strip()
+            ),
+        )
+
+    tariff: TariffSchedule | None = None
+    if tariff_rules := entry.options.get(CONF_TARIFF, DEFAULT_TARIFF).strip():
+        try:
+            tariff = TariffSchedule.parse(tariff_rules, dt_util.DEFAULT_TIME_ZONE)
+        except ValueError as err:
+            raise ConfigEntryError(f"Invalid tariff: {err}") from err
 
     manager = ElecqOcppManager(
         hass=hass,
+        entry_id=entry.entry_id,
         port=port,
         id_token=id_token,
         evse_id=evse_id,
         connector_id=connector_id,
+        history=history,
+        publish_interval=publish_interval,
+        smoothing_filter=smoothing_filter,
+        smoothing_window=smoothing_window,
+        instrumentation=entry.options.get(
+            CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION
+        ),
+        skip_schema_validation=entry.options.get(
+            CONF_SKIP_SCHEMA_VALIDATION, DEFAULT_SKIP_SCHEMA_VALIDATION
+        ),
+        max_commands_in_flight=entry.options.get(
+            CONF_MAX_COMMANDS_IN_FLIGHT, DEFAULT_MAX_COMMANDS_IN_FLIGHT
+        ),
+        sampling_policy=sampling_policy,
+        raw_payloads=entry.options.get(CONF_RAW_PAYLOADS, DEFAULT_RAW_PAYLOADS),
+        capture_frames=entry.options.get(
+            CONF_CAPTURE_FRAMES, DEFAULT_CAPTURE_FRAMES
+        ),
+        charge_point_ids=charge_point_ids,
+        power_rollups=entry.options.get(CONF_POWER_ROLLUPS, DEFAULT_POWER_ROLLUPS),
+        tariff=tariff,
     )
 
+    grid_entity: str | None = entry.options.get(CONF_GRID_ENTITY)
+    site_limit_a: float = entry.options.get(CONF_SITE_LIMIT_A, DEFAULT_SITE_LIMIT_A)
+    if grid_entity and site_limit_a > 0:
+        manager.balancer = ElecqLoadBalancer(
+            manager,
+            grid_entity,
+            site_limit_a,
+            entry.options.get(CONF_SITE_PHASES, DEFAULT_SITE_PHASES),
+        )
+        manager.balancer.async_start()
+        entry.async_on_unload(manager.balancer.async_stop)
+
+    surplus_entity: str | None = entry.options.get(CONF_SURPLUS_ENTITY)
+    if surplus_entity:
+        manager.solar = ElecqSolarController(
+            manager,
+            surplus_entity,
+            entry.options.get(CONF_SITE_PHASES, DEFAULT_SITE_PHASES),
+        )
+        manager.solar.async_start()
+        entry.async_on_unload(manager.solar.async_stop)
+
+    if (
+        history is not None
+        and "recorder" in hass.config.components
+        and entry.options.get(CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS)
+    ):
+        # Imported lazily: the recorder is an optional dependency
+        from .recorder_statistics import ElecqStatisticsImporter
+
+        manager.statistics = ElecqStatisticsImporter(hass, history)
+
+    manager.adopt_legacy_entities = async_has_legacy_entities(hass, entry.entry_id)
+
+    # Known chargers and their last state, so the entities come up with
+    # values instead of waiting for each charger to reconnect
+    manager.state_store = ElecqStateStore(hass, entry.entry_id)
+    await manager.state_store.async_restore(manager)
+
     hass.data[DOMAIN][entry.entry_id] = {
         "manager": manager,
     }
 
-    # Start the OCPP WebSocket server
-    hass.async_create_task(manager.async_start_server())
+    # Open the history, load the OCPP stack and start the WebSocket server
+    # in the background; nothing below depends on it
+    manager.async_start()
 
     # Forward entry setup to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    return True
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an entry to a newer version."""
+    if entry.version == 1:
+        # Version 1 served one charger under fixed unique ids and never
+        # stored its charge point id. The entities move to the first charger
+        # the entry registers (see async_get_or_create_station).
+        hass.config_entries.async_update_entry(entry, version=2)
+        _LOGGER.debug("Migrated %s to version 2", entry.title)
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry so changed options take effect."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     data = hass.data[DOMAIN].get(entry.entry_id)
@@ -72,3 +268,18 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id, None)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the history database and stored state when the entry is removed."""
+    path = _history_path(hass, entry)
+
+    def _remove() -> None:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    await hass.async_add_executor_job(_remove)
+    await ElecqStateStore(hass, entry.entry_id).async_remove()
@@ -5,13 +5,17 @@ from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, SIGNAL_STATE_UPDATED
-from .ocpp_server import ElecqOcppManager
+from .const import (
+    DOMAIN,
+    SIGNAL_STATION_ADDED,
+    GROUP_PLUGGED_IN,
+    GROUP_CHARGING,
+)
+from .ocpp_server import ElecqOcppManager, ElecqStation
 
 
 async def async_setup_entry(
@@ -22,51 +26,67 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][entry.entry_id]
     manager: ElecqOcppManager = data["manager"]
 
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, "elecq_au101")},
-        name="Elecq AU101 Charger",
-        manufacturer="Elecq",
-        model="AU101",
-    )
+    @callback
+    def _async_add_station(station: ElecqStation) -> None:
+        entities: list[BinarySensorEntity] = [
+            ElecqPluggedInBinarySensor(station),
+            ElecqChargingBinarySensor(station),
+        ]
+        async_add_entities(entities)
 
-    entities: list[BinarySensorEntity] = [
-        ElecqPluggedInBinarySensor(manager, device_info),
-        ElecqChargingBinarySensor(manager, device_info),
-    ]
-    async_add_entities(entities)
+    for station in manager.stations:
+        _async_add_station(station)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_STATION_ADDED.format(entry.entry_id), _async_add_station
+        )
+    )
 
 
 class _BaseElecqBinarySensor(BinarySensorEntity):
-    def __init__(self, manager: ElecqOcppManager, device_info: DeviceInfo) -> None:
-        self._manager = manager
-        self._attr_device_info = device_info
+    _key: str
+    _groups: tuple[str, ...]
+
+    def __init__(self, station: ElecqStation) -> None:
+        self._station = station
+        self._attr_device_info = station.device_info
+        self._attr_unique_id = f"{station.unique_id_prefix}_{self._key}"
 
     async def async_added_to_hass(self) -> None:
         async def _handle_update() -> None:
+            self._station.manager.dispatch_stats.state_writes += 1
             self.async_write_ha_state()
 
-        self.async_on_remove(
-            async_dispatcher_connect(self.hass, SIGNAL_STATE_UPDATED, _handle_update)
-        )
+        for group in self._groups:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    self._station.signal_state_updated(group),
+                    _handle_update,
+                )
+            )
 
 
 class ElecqPluggedInBinarySensor(_BaseElecqBinarySensor):
     _attr_has_entity_name = True
     _attr_name = "Plugged In"
-    _attr_unique_id = "elecq_au101_plugged_in"
+    _key = "plugged_in"
+    _groups = (GROUP_PLUGGED_IN,)
     _attr_device_class = BinarySensorDeviceClass.PLUG
 
     @property
     def is_on(self) -> bool:
-        return self._manager.state.plugged_in
+        return self._station.state.plugged_in
 
 
 class ElecqChargingBinarySensor(_BaseElecqBinarySensor):
     _attr_has_entity_name = True
     _attr_name = "Charging"
-    _attr_unique_id = "elecq_au101_charging"
+    _key = "charging"
+    _groups = (GROUP_CHARGING,)
     _attr_device_class = BinarySensorDeviceClass.BATTERY_CHARGING
 
     @property
     def is_on(self) -> bool:
-        return self._manager.state.charging
+        return self._station.state.charging
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Optional
+
+# Direction of a captured frame
+INBOUND = 0
+OUTBOUND = 1
+_DIRECTIONS = ("in", "out")
+
+# Capture files kept per charger: <cp_id>.jsonl plus this many rotated ones
+CAPTURE_BACKUPS = 4
+
+
+class TrafficCapture:
+    """Last `capacity` raw OCPP frames of one station, in a preallocated ring.
+
+    Recording a frame stores a reference to the string the websocket already
+    produced plus a timestamp and a direction byte; nothing is copied,
+    formatted or written. Frames only leave memory when export() is called,
+    so the capture can stay on in production.
+    """
+
+    __slots__ = ("capacity", "recorded", "_times", "_dirs", "_frames", "_next")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        # Frames recorded since start, including overwritten ones
+        self.recorded = 0
+        self._times = [0.0] * capacity
+        self._dirs = bytearray(capacity)
+        self._frames: list[Optional[str]] = [None] * capacity
+        self._next = 0
+
+    def record(self, direction: int, frame: str) -> None:
+        i = self._next
+        self._times[i] = time.time()
+        self._dirs[i] = direction
+        self._frames[i] = frame
+        self._next = (i + 1) % self.capacity
+        self.recorded += 1
+
+    def __len__(self) -> int:
+        return min(self.recorded, self.capacity)
+
+    def snapshot(self) -> list[tuple[float, str, str]]:
+        """The captured (timestamp, direction, frame) tuples, oldest first."""
+        size = len(self)
+        start = (self._next - size) % self.capacity
+        out = []
+        for n in range(size):
+            i = (start + n) % self.capacity
+            out.append((self._times[i], _DIRECTIONS[self._dirs[i]], self._frames[i]))
+        return out
+
+    def clear(self) -> None:
+        self._frames = [None] * self.capacity
+        self._next = 0
+        self.recorded = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"capacity": self.capacity, "recorded": self.recorded, "held": len(self)}
+
+
+def _rotate(path: str, backups: int) -> None:
+    for n in range(backups - 1, 0, -1):
+        older = f"{path}.{n}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{n + 1}")
+    if os.path.exists(path):
+        os.replace(path, f"{path}.1")
+
+
+def write_capture(
+    path: str,
+    cp_id: str,
+    frames: list[tuple[float, str, str]],
+    backups: int = CAPTURE_BACKUPS,
+) -> int:
+    """Write a snapshot as JSON lines, rotating older captures. Blocking.
+
+    Each line is {"ts": <epoch s>, "cp_id": ..., "dir": "in"|"out",
+    "frame": <raw OCPP-J text>}.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _rotate(path, backups)
+    with open(path, "w", encoding="utf-8") as fp:
+        for ts, direction, frame in frames:
+            fp.write(
+                json.dumps(
+                    {"ts": ts, "cp_id": cp_id, "dir": direction, "frame": frame}
+                )
+            )
+            fp.write("\n")
+    return len(frames)
+
+
+def read_capture(path: str) -> list[dict[str, Any]]:
+    """Load a capture file written by write_capture. Blocking."""
+    with open(path, encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
@@ -0,0 +1,458 @@
+"""OCPP 2.0.1 protocol side of the integration.
+
+Importing the ocpp library pulls in jsonschema and the full set of 2.0.1
+message classes, and websockets its own stack. None of that is needed until a
+charger connects, so ElecqOcppManager loads this module from the executor
+when it starts the server instead of at platform import time.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Callable, Optional
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from ocpp.messages import MessageType, get_validator
+from ocpp.routing import after, on
+from ocpp.v201 import ChargePoint as OcppChargePointBase
+from ocpp.v201 import call, call_result
+from ocpp.v201.enums import (
+    ChargingProfileStatusEnumType,
+    ClearChargingProfileStatusEnumType,
+    RegistrationStatusEnumType,
+    RequestStartStopStatusEnumType,
+    MessageTriggerEnumType,  # 👈 NEW
+)
+
+from .capture import INBOUND, OUTBOUND
+
+if TYPE_CHECKING:
+    from .ocpp_server import ElecqStation
+
+_LOGGER = logging.getLogger(__name__)
+
+__all__ = ["ConnectionClosed", "ElecqChargePoint", "async_serve"]
+
+
+# Actions the charger sends us and the ones we send it
+_INBOUND_ACTIONS = (
+    "BootNotification",
+    "Heartbeat",
+    "MeterValues",
+    "StatusNotification",
+    "TransactionEvent",
+)
+_OUTBOUND_ACTIONS = (
+    "ClearChargingProfile",
+    "GetTransactionStatus",
+    "GetVariables",
+    "RequestStartTransaction",
+    "RequestStopTransaction",
+    "SetChargingProfile",
+    "SetVariables",
+    "TriggerMessage",
+)
+
+# Id of the TxDefaultProfile the load balancer keeps replacing
+BALANCER_PROFILE_ID = 1
+
+# Inbound calls whose schema validation the trusted LAN fast path skips, with
+# the eventType it is limited to (None: any). Everything else, including the
+# Started/Ended TransactionEvents that open and close sessions, is validated.
+FAST_PATH_ACTIONS: dict[str, Optional[str]] = {
+    "Heartbeat": None,
+    "TransactionEvent": "Updated",
+}
+
+
+def _warm_validators() -> None:
+    """Build the JSON schema validators of every action we exchange.
+
+    The ocpp library caches one validator per action but builds it, reading
+    the schema file from disk, the first time that action is seen. Doing it
+    here moves that to the executor import instead of the first message on
+    the event loop.
+    """
+    for action in (*_INBOUND_ACTIONS, *_OUTBOUND_ACTIONS):
+        for message_type_id in (MessageType.Call, MessageType.CallResult):
+            try:
+                get_validator(message_type_id, action, "2.0.1")
+            except (OSError, ValueError):
+                _LOGGER.debug("No schema for %s (%s)", action, message_type_id)
+
+
+_warm_validators()
+
+
+def _reject_unknown(accepts: Callable[[str], bool]):
+    """process_request hook answering 404 to paths `accepts` refuses.
+
+    Runs on the HTTP upgrade request, before the handshake. Supports both
+    the legacy (path, headers) and the new (connection, request) signature.
+    """
+
+    def process_request(first, second):
+        if isinstance(first, str):
+            if accepts(first):
+                return None
+            return HTTPStatus.NOT_FOUND, [], b"Unknown charge point\n"
+        if accepts(second.path):
+            return None
+        return first.respond(HTTPStatus.NOT_FOUND, "Unknown charge point\n")
+
+    return process_request
+
+
+async def async_serve(handler, port: int, accepts: Callable[[str], bool]):
+    """Start the OCPP 2.0.1 websocket server for the paths `accepts` allows."""
+    return await websockets.serve(
+        handler,
+        host="0.0.0.0",
+        port=port,
+        subprotocols=["ocpp2.0.1"],
+        process_request=_reject_unknown(accepts),
+    )
+
+
+class ElecqChargePoint(OcppChargePointBase):
+    """OCPP 2.0.1 ChargePoint handlers."""
+
+    def __init__(self, cp_id: str, websocket, station: ElecqStation) -> None:
+        super().__init__(cp_id, websocket)
+        self._station = station
+        self._metrics = station.metrics
+        self._capture = station.capture
+        self._fast_path = station.manager.skip_schema_validation
+
+        # Instrumentation bookkeeping to attribute bytes on the wire to actions
+        self._raw_len = 0
+        self._inbound_action: Optional[str] = None
+        self._queued_calls: deque[list] = deque()
+        self._awaiting_action: Optional[str] = None
+
+    # ---- capture and instrumentation (no-ops unless enabled), fast path ----
+
+    async def route_message(self, raw_msg):
+        if self._capture is not None:
+            self._capture.record(INBOUND, raw_msg)
+        metrics = self._metrics
+        if metrics is None:
+            return await super().route_message(raw_msg)
+
+        self._raw_len = len(raw_msg)
+        if raw_msg.lstrip()[1:].lstrip()[:1] in ("3", "4"):
+            # CallResult / CallError for the call we are waiting on
+            action = metrics.action(self._awaiting_action or "Unknown")
+            action.bytes_in += self._raw_len
+        return await super().route_message(raw_msg)
+
+    async def _handle_call(self, msg):
+        if self._fast_path:
+            handlers = self.route_map.get(msg.action)
+            if handlers is not None and msg.action in FAST_PATH_ACTIONS:
+                event_type = FAST_PATH_ACTIONS[msg.action]
+                # Calls of one connection are handled one at a time, so the
+                # flag only ever applies to this message
+                handlers["_skip_schema_validation"] = (
+                    event_type is None or msg.payload.get("eventType") == event_type
+                )
+
+        metrics = self._metrics
+        if metrics is None:
+            return await super()._handle_call(msg)
+
+        action = metrics.action(msg.action)
+        action.received += 1
+        action.bytes_in += self._raw_len
+        self._inbound_action = msg.action
+        start = time.perf_counter()
+        try:
+            return await super()._handle_call(msg)
+        finally:
+            action.handler.record((time.perf_counter() - start) * 1000)
+            self._inbound_action = None
+
+    async def _send(self, message):
+        if self._capture is not None:
+            self._capture.record(OUTBOUND, message)
+        metrics = self._metrics
+        if metrics is not None:
+            if message[1:2] == "2":
+                # Calls are sent one at a time in lock order
+                name = "Unknown"
+                if self._queued_calls:
+                    entry = self._queued_calls.popleft()
+                    entry[1] = True
+                    name = entry[0]
+                self._awaiting_action = name
+            else:
+                name = self._inbound_action or "Unknown"
+            metrics.action(name).bytes_out += len(message)
+        return await super()._send(message)
+
+    async def call(self, payload, *args, **kwargs):
+        metrics = self._metrics
+        if metrics is None:
+            return await super().call(payload, *args, **kwargs)
+
+        name = type(payload).__name__.removesuffix("Payload")
+        action = metrics.action(name)
+        action.sent += 1
+        # [action, sent]; _send pops it when the call goes on the wire
+        entry = [name, False]
+        self._queued_calls.append(entry)
+        start = time.perf_counter()
+        try:
+            response = await super().call(payload, *args, **kwargs)
+        except asyncio.TimeoutError:
+            # Counted by the command queue: its timeout usually fires first
+            # and cancels this call instead of raising here
+            raise
+        except Exception:
+            action.errors += 1
+            raise
+        finally:
+            # Round trip as seen by the caller, including queueing behind
+            # other calls to the same charger
+            action.round_trip.record((time.perf_counter() - start) * 1000)
+            self._awaiting_action = None
+            if not entry[1] and entry in self._queued_calls:
+                self._queued_calls.remove(entry)
+        if response is None:
+            # CallError suppressed by the ocpp library
+            action.errors += 1
+        return response
+
+    # ---- requests to the charger ----
+
+    async def async_request_start_transaction(
+        self, evse_id: int, id_token: str
+    ) -> bool:
+        request = call.RequestStartTransaction(
+            evse_id=evse_id,
+            id_token={"idToken": id_token, "type": "Local"},
+            remote_start_id=int(datetime.now().timestamp()),
+        )
+        _LOGGER.info("Sending RequestStartTransaction: %s", request)
+        response = await self.call(request)
+        _LOGGER.info("RequestStartTransaction response: %s", response)
+        return (
+            getattr(response, "status", None)
+            == RequestStartStopStatusEnumType.accepted
+        )
+
+    async def async_request_stop_transaction(self, transaction_id: str) -> bool:
+        request = call.RequestStopTransaction(transaction_id=transaction_id)
+        _LOGGER.info("Sending RequestStopTransaction: %s", request)
+        response = await self.call(request)
+        _LOGGER.info("RequestStopTransaction response: %s", response)
+        return (
+            getattr(response, "status", None)
+            == RequestStartStopStatusEnumType.accepted
+        )
+
+    async def async_set_charging_limit(self, evse_id: int, limit_a: float) -> bool:
+        request = call.SetChargingProfile(
+            evse_id=evse_id,
+            charging_profile={
+                "id": BALANCER_PROFILE_ID,
+                "stackLevel": 0,
+                "chargingProfilePurpose": "TxDefaultProfile",
+                "chargingProfileKind": "Relative",
+                "chargingSchedule": [
+                    {
+                        "id": BALANCER_PROFILE_ID,
+                        "chargingRateUnit": "A",
+                        "chargingSchedulePeriod": [
+                            {"startPeriod": 0, "limit": limit_a},
+                        ],
+                    }
+                ],
+            },
+        )
+        _LOGGER.debug("Sending SetChargingProfile: %s", request)
+        response = await self.call(request)
+        _LOGGER.debug("SetChargingProfile response: %s", response)
+        return (
+            getattr(response, "status", None)
+            == ChargingProfileStatusEnumType.accepted
+        )
+
+    async def async_clear_charging_limit(self) -> bool:
+        """Remove the profile async_set_charging_limit installed."""
+        request = call.ClearChargingProfile(charging_profile_id=BALANCER_PROFILE_ID)
+        _LOGGER.debug("Sending ClearChargingProfile: %s", request)
+        response = await self.call(request)
+        _LOGGER.debug("ClearChargingProfile response: %s", response)
+        # Unknown: the charger has no such profile, which is the goal too
+        return getattr(response, "status", None) in (
+            ClearChargingProfileStatusEnumType.accepted,
+            ClearChargingProfileStatusEnumType.unknown,
+        )
+
+    async def async_get_variables(
+        self, component: str, variables: tuple[str, ...]
+    ) -> dict[str, Optional[str]]:
+        """Actual values of variables of one component, None if not known."""
+        request = call.GetVariables(
+            get_variable_data=[
+                {"component": {"name": component}, "variable": {"name": name}}
+                for name in variables
+            ]
+        )
+        response = await self.call(request)
+        values: dict[str, Optional[str]] = dict.fromkeys(variables)
+        for result in getattr(response, "get_variable_result", None) or ():
+            if result.get("attribute_status") == "Accepted":
+                values[result["variable"]["name"]] = result.get("attribute_value")
+        return values
+
+    async def async_set_variable(
+        self, component: str, variable: str, value: str
+    ) -> Optional[str]:
+        """Set one variable; returns the charger's SetVariableStatus."""
+        request = call.SetVariables(
+            set_variable_data=[
+                {
+                    "attributeValue": value,
+                    "component": {"name": component},
+                    "variable": {"name": variable},
+                }
+            ]
+        )
+        _LOGGER.debug("Sending SetVariables: %s", request)
+        response = await self.call(request)
+        results = getattr(response, "set_variable_result", None) or ()
+        return results[0].get("attribute_status") if results else None
+
+    async def async_trigger_status_notification(self) -> None:
+        # NOTE: do NOT pass evse_id here; this ocpp version doesn't accept it
+        req = call.TriggerMessage(
+            requested_message=MessageTriggerEnumType.status_notification,
+        )
+        _LOGGER.info(
+            "Sending TriggerMessage(StatusNotification) to Elecq for manual refresh: %s",
+            req,
+        )
+        resp = await self.call(req)
+        _LOGGER.info(
+            "TriggerMessage(StatusNotification) response from Elecq: %s", resp
+        )
+
+    async def async_trigger_message(self, requested_message: str) -> Optional[str]:
+        """Ask the charger to send a message now; returns the TriggerMessageStatus."""
+        response = await self.call(
+            call.TriggerMessage(requested_message=requested_message)
+        )
+        return getattr(response, "status", None)
+
+    async def async_get_transaction_status(
+        self, transaction_id: Optional[str] = None
+    ) -> Optional[bool]:
+        """Whether the charger still holds queued transaction messages."""
+        response = await self.call(
+            call.GetTransactionStatus(transaction_id=transaction_id)
+        )
+        return getattr(response, "messages_in_queue", None)
+
+    # ---- handlers ----
+
+    @on("BootNotification")
+    async def on_boot(self, charging_station, reason, **kwargs):
+        _LOGGER.info(
+            "BootNotification: model=%s, vendor=%s, reason=%s",
+            charging_station.get("model"),
+            charging_station.get("vendor_name"),
+            reason,
+        )
+
+        return call_result.BootNotification(
+            current_time=datetime.now(timezone.utc).isoformat(),
+            interval=60,
+            status=RegistrationStatusEnumType.accepted,
+        )
+
+    @after("BootNotification")
+    async def after_boot(self, **kwargs):
+        # Runs once the Accepted response is on the wire
+        self._station.async_on_boot()
+
+    @on("Heartbeat")
+    async def on_heartbeat(self, **kwargs):
+        return call_result.Heartbeat(
+            current_time=datetime.now(timezone.utc).isoformat(),
+        )
+
+    @on("StatusNotification")
+    async def on_status(
+        self,
+        timestamp,
+        evse_id,
+        connector_id,
+        connector_status,
+        **kwargs,
+    ):
+        st = self._station.state
+        status_upper = (connector_status or "").upper()
+        st.last_status = connector_status
+
+        if status_upper in ("AVAILABLE", "FAULTED"):
+            st.plugged_in = False
+        else:
+            st.plugged_in = True
+
+        if st.last_charging_state in ("Charging", "EVConnected"):
+            st.charging = not st.remote_stop_requested
+        elif st.last_charging_state in ("Idle", "Finished", "SuspendedEV", "SuspendedEVSE"):
+            st.charging = False
+        else:
+            st.charging = (
+                status_upper == "CHARGING"
+                and not st.remote_stop_requested
+            )
+
+        st.last_update = datetime.now(timezone.utc)
+        self._station._notify()
+        self._station.async_on_message("StatusNotification")
+
+        return call_result.StatusNotification()
+
+    @on("MeterValues")
+    async def on_meter_values(self, evse_id, meter_value, **kwargs):
+        # Sent on TriggerMessage(MeterValues) or between transactions
+        self._station.update_meter_values_message(meter_value)
+        self._station.async_on_message("MeterValues")
+        return call_result.MeterValues()
+
+    @on("TransactionEvent")
+    async def on_transaction_event(
+        self,
+        event_type,
+        timestamp,
+        trigger_reason,
+        seq_no,
+        transaction_info,
+        evse=None,
+        id_token=None,
+        meter_value=None,
+        **kwargs,
+    ):
+        # Payloads are not logged here; enable the traffic capture instead
+        self._station.update_transaction_event(
+            event_type=event_type,
+            trigger_reason=trigger_reason,
+            transaction_info=transaction_info,
+            meter_value=meter_value,
+            seq_no=seq_no,
+            timestamp=timestamp,
+            offline=bool(kwargs.get("offline")),
+        )
+        self._station.async_on_message("TransactionEvent")
+
+        return call_result.TransactionEvent()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# action -> (timeout in seconds per attempt, retries after a timeout).
+# Starting and stopping a session are not retried: the first attempt may
+# still be answered late, and a second start would be a second session.
+COMMAND_POLICY: dict[str, tuple[float, int]] = {
+    "RequestStartTransaction": (30.0, 0),
+    "RequestStopTransaction": (30.0, 0),
+    "TriggerMessage": (10.0, 2),
+    "SetChargingProfile": (15.0, 2),
+    "ClearChargingProfile": (15.0, 2),
+    "GetTransactionStatus": (15.0, 1),
+    "GetVariables": (15.0, 1),
+    "SetVariables": (15.0, 1),
+}
+DEFAULT_POLICY = (20.0, 0)
+
+# Seconds before the first retry, doubled for every further one
+RETRY_BACKOFF = 1.0
+
+# Distinct commands one station accepts before new ones are refused
+MAX_QUEUED = 16
+
+
+class ElecqCommandError(HomeAssistantError):
+    """A command could not be delivered to or was not answered by a charger."""
+
+
+@dataclass
+class CommandStats:
+    """Counters of one station's outbound command queue."""
+
+    submitted: int = 0
+    deduplicated: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+
+class CommandQueue:
+    """Outbound OCPP commands of one station.
+
+    A command is identified by a key (the action unless the caller passes a
+    more specific one). Submitting a command identical to one still queued or
+    in flight joins it instead of sending it again, so a double click or ten
+    automations asking for a refresh cost one call. At most max_in_flight
+    commands talk to the charger at once; each attempt has its action's
+    timeout and timed out idempotent actions are retried with backoff.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 1,
+        max_queued: int = MAX_QUEUED,
+        on_timeout: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._max_queued = max_queued
+        # Called with the action of every attempt that timed out
+        self._on_timeout = on_timeout
+        self._commands: dict[Hashable, asyncio.Future] = {}
+        self.stats = CommandStats()
+
+    @property
+    def pending(self) -> int:
+        """Commands queued or in flight."""
+        return len(self._commands)
+
+    async def async_run(
+        self,
+        action: str,
+        send: Callable[[], Awaitable[_T]],
+        key: Optional[Hashable] = None,
+    ) -> _T:
+        """Run send() as a queued command and return its result.
+
+        Raises ElecqCommandError if it timed out on every attempt or failed.
+        A caller that is cancelled while waiting does not cancel the command
+        for the others waiting on it.
+        """
+        if key is None:
+            key = action
+        command = self._commands.get(key)
+        if command is not None:
+            self.stats.deduplicated += 1
+            return await asyncio.shield(command)
+
+        if len(self._commands) >= self._max_queued:
+            self.stats.rejected += 1
+            raise ElecqCommandError(f"{action}: too many commands queued")
+
+        self.stats.submitted += 1
+        command = asyncio.ensure_future(self._async_execute(action, send))
+        self._commands[key] = command
+
+        def _done(fut: asyncio.Future) -> None:
+            if self._commands.get(key) is command:
+                del self._commands[key]
+            if not fut.cancelled():
+                # Retrieved even if every waiter gave up
+                fut.exception()
+
+        command.add_done_callback(_done)
+        return await asyncio.shield(command)
+
+    async def _async_execute(
+        self, action: str, send: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        timeout, retries = COMMAND_POLICY.get(action, DEFAULT_POLICY)
+        async with self._slots:
+            attempt = 0
+            while True:
+                try:
+                    return await asyncio.wait_for(send(), timeout)
+                except asyncio.TimeoutError:
+                    self.stats.timeouts += 1
+                    if self._on_timeout is not None:
+                        self._on_timeout(action)
+                    if attempt >= retries:
+                        self.stats.failed += 1
+                        raise ElecqCommandError(
+                            f"{action} not answered after {attempt + 1} "
+                            f"attempt(s) of {timeout:g} s"
+                        ) from None
+                except ElecqCommandError:
+                    self.stats.failed += 1
+                    raise
+                except Exception as err:  # noqa: BLE001
+                    self.stats.failed += 1
+                    _LOGGER.debug("%s failed", action, exc_info=True)
+                    raise ElecqCommandError(f"{action} failed: {err}") from err
+                self.stats.retries += 1
+                await asyncio.sleep(RETRY_BACKOFF * 2**attempt)
+                attempt += 1
@@ -3,7 +3,10 @@ from __future__ import annotations
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -11,17 +14,63 @@ from .const import (
     CONF_ID_TOKEN,
     CONF_EVSE_ID,
     CONF_CONNECTOR_ID,
+    CONF_PUBLISH_INTERVAL,
+    CONF_SMOOTHING_FILTER,
+    CONF_SMOOTHING_WINDOW,
+    CONF_HISTORY,
+    CONF_HISTORY_RETENTION_DAYS,
+    CONF_HISTORY_COMPACT_DAYS,
+    CONF_IMPORT_STATISTICS,
+    CONF_INSTRUMENTATION,
+    CONF_SKIP_SCHEMA_VALIDATION,
+    CONF_GRID_ENTITY,
+    CONF_SITE_LIMIT_A,
+    CONF_SITE_PHASES,
+    CONF_SURPLUS_ENTITY,
+    CONF_MAX_COMMANDS_IN_FLIGHT,
+    CONF_ADAPTIVE_SAMPLING,
+    CONF_CHARGING_SAMPLE_INTERVAL,
+    CONF_IDLE_SAMPLE_INTERVAL,
+    CONF_SAMPLED_MEASURANDS,
+    CONF_RAW_PAYLOADS,
+    CONF_CAPTURE_FRAMES,
+    CONF_CHARGE_POINT_IDS,
+    CONF_POWER_ROLLUPS,
+    CONF_TARIFF,
+    SMOOTHING_FILTERS,
     DEFAULT_PORT,
     DEFAULT_ID_TOKEN,
     DEFAULT_EVSE_ID,
     DEFAULT_CONNECTOR_ID,
+    DEFAULT_PUBLISH_INTERVAL,
+    DEFAULT_SMOOTHING_FILTER,
+    DEFAULT_SMOOTHING_WINDOW,
+    DEFAULT_HISTORY,
+    DEFAULT_HISTORY_RETENTION_DAYS,
+    DEFAULT_HISTORY_COMPACT_DAYS,
+    DEFAULT_IMPORT_STATISTICS,
+    DEFAULT_INSTRUMENTATION,
+    DEFAULT_SKIP_SCHEMA_VALIDATION,
+    DEFAULT_SITE_LIMIT_A,
+    DEFAULT_SITE_PHASES,
+    DEFAULT_MAX_COMMANDS_IN_FLIGHT,
+    DEFAULT_ADAPTIVE_SAMPLING,
+    DEFAULT_CHARGING_SAMPLE_INTERVAL,
+    DEFAULT_IDLE_SAMPLE_INTERVAL,
+    DEFAULT_SAMPLED_MEASURANDS,
+    DEFAULT_RAW_PAYLOADS,
+    DEFAULT_CAPTURE_FRAMES,
+    DEFAULT_CHARGE_POINT_IDS,
+    DEFAULT_POWER_ROLLUPS,
+    DEFAULT_TARIFF,
 )
+from .tariff import TariffSchedule
 
 
 class ElecqOcppConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Elecq OCPP."""
 
-    VERSION = 1
+    VERSION = 2
 
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
         if user_input is not None:
@@ -40,3 +89,169 @@ class ElecqOcppConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         )
 
         return self.async_show_form(step_id="user", data_schema=data_schema)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> ElecqOcppOptionsFlow:
+        return ElecqOcppOptionsFlow(config_entry)
+
+
+class ElecqOcppOptionsFlow(config_entries.OptionsFlow):
+    """Handle options for Elecq OCPP."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            tariff = user_input.get(CONF_TARIFF, "").strip()
+            try:
+                if tariff:
+                    TariffSchedule.parse(tariff, dt_util.DEFAULT_TIME_ZONE)
+            except ValueError:
+                errors[CONF_TARIFF] = "invalid_tariff"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = {**self._entry.options, **(user_input or {})}
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_CHARGE_POINT_IDS,
+                    default=options.get(
+                        CONF_CHARGE_POINT_IDS, DEFAULT_CHARGE_POINT_IDS
+                    ),
+                ): str,
+                vol.Required(
+                    CONF_PUBLISH_INTERVAL,
+                    default=options.get(
+                        CONF_PUBLISH_INTERVAL, DEFAULT_PUBLISH_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                vol.Required(
+                    CONF_SMOOTHING_FILTER,
+                    default=options.get(
+                        CONF_SMOOTHING_FILTER, DEFAULT_SMOOTHING_FILTER
+                    ),
+                ): vol.In(SMOOTHING_FILTERS),
+                vol.Required(
+                    CONF_SMOOTHING_WINDOW,
+                    default=options.get(
+                        CONF_SMOOTHING_WINDOW, DEFAULT_SMOOTHING_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+                vol.Required(
+                    CONF_HISTORY,
+                    default=options.get(CONF_HISTORY, DEFAULT_HISTORY),
+                ): bool,
+                vol.Required(
+                    CONF_HISTORY_RETENTION_DAYS,
+                    default=options.get(
+                        CONF_HISTORY_RETENTION_DAYS, DEFAULT_HISTORY_RETENTION_DAYS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_HISTORY_COMPACT_DAYS,
+                    default=options.get(
+                        CONF_HISTORY_COMPACT_DAYS, DEFAULT_HISTORY_COMPACT_DAYS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_IMPORT_STATISTICS,
+                    default=options.get(
+                        CONF_IMPORT_STATISTICS, DEFAULT_IMPORT_STATISTICS
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_POWER_ROLLUPS,
+                    default=options.get(CONF_POWER_ROLLUPS, DEFAULT_POWER_ROLLUPS),
+                ): bool,
+                vol.Required(
+                    CONF_INSTRUMENTATION,
+                    default=options.get(
+                        CONF_INSTRUMENTATION, DEFAULT_INSTRUMENTATION
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_RAW_PAYLOADS,
+                    default=options.get(CONF_RAW_PAYLOADS, DEFAULT_RAW_PAYLOADS),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+                vol.Required(
+                    CONF_CAPTURE_FRAMES,
+                    default=options.get(
+                        CONF_CAPTURE_FRAMES, DEFAULT_CAPTURE_FRAMES
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100000)),
+                vol.Required(
+                    CONF_SKIP_SCHEMA_VALIDATION,
+                    default=options.get(
+                        CONF_SKIP_SCHEMA_VALIDATION,
+                        DEFAULT_SKIP_SCHEMA_VALIDATION,
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_MAX_COMMANDS_IN_FLIGHT,
+                    default=options.get(
+                        CONF_MAX_COMMANDS_IN_FLIGHT, DEFAULT_MAX_COMMANDS_IN_FLIGHT
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=8)),
+                vol.Required(
+                    CONF_ADAPTIVE_SAMPLING,
+                    default=options.get(
+                        CONF_ADAPTIVE_SAMPLING, DEFAULT_ADAPTIVE_SAMPLING
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_CHARGING_SAMPLE_INTERVAL,
+                    default=options.get(
+                        CONF_CHARGING_SAMPLE_INTERVAL,
+                        DEFAULT_CHARGING_SAMPLE_INTERVAL,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Required(
+                    CONF_IDLE_SAMPLE_INTERVAL,
+                    default=options.get(
+                        CONF_IDLE_SAMPLE_INTERVAL, DEFAULT_IDLE_SAMPLE_INTERVAL
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+                vol.Optional(
+                    CONF_SAMPLED_MEASURANDS,
+                    default=options.get(
+                        CONF_SAMPLED_MEASURANDS, DEFAULT_SAMPLED_MEASURANDS
+                    ),
+                ): str,
+                vol.Optional(
+                    CONF_GRID_ENTITY,
+                    description={"suggested_value": options.get(CONF_GRID_ENTITY)},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor")
+                ),
+                vol.Required(
+                    CONF_SITE_LIMIT_A,
+                    default=options.get(CONF_SITE_LIMIT_A, DEFAULT_SITE_LIMIT_A),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Required(
+                    CONF_SITE_PHASES,
+                    default=options.get(CONF_SITE_PHASES, DEFAULT_SITE_PHASES),
+                ): vol.In([1, 3]),
+                vol.Optional(
+                    CONF_SURPLUS_ENTITY,
+                    description={
+                        "suggested_value": options.get(CONF_SURPLUS_ENTITY)
+                    },
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor")
+                ),
+                vol.Optional(
+                    CONF_TARIFF,
+                    default=options.get(CONF_TARIFF, DEFAULT_TARIFF),
+                ): str,
+            }
+        )
+
+        return self.async_show_form(
+            step_id="init", data_schema=data_schema, errors=errors
+        )
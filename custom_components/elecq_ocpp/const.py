@@ -2,7 +2,21 @@ from __future__ import annotations
 
 DOMAIN = "elecq_ocpp"
 
-SIGNAL_STATE_UPDATED = "elecq_ocpp_state_updated"
+# Dispatcher signals, formatted per config entry / charge point / state group
+SIGNAL_STATE_UPDATED = "elecq_ocpp_state_updated_{}_{}_{}"
+SIGNAL_STATION_ADDED = "elecq_ocpp_station_added_{}"
+
+# State groups: entities subscribe only to the groups they render
+GROUP_POWER = "power"
+GROUP_POWER_SMOOTHED = "power_smoothed"
+GROUP_ENERGY = "energy"
+GROUP_SESSION_ENERGY = "session_energy"
+GROUP_SESSION_COST = "session_cost"
+GROUP_STATUS = "status"
+GROUP_CHARGING_STATE = "charging_state"
+GROUP_PLUGGED_IN = "plugged_in"
+GROUP_CHARGING = "charging"
+GROUP_CONNECTION = "connection"
 
 # Config keys
 CONF_PORT = "port"
@@ -10,8 +24,69 @@ CONF_ID_TOKEN = "id_token"
 CONF_EVSE_ID = "evse_id"
 CONF_CONNECTOR_ID = "connector_id"
 
+# Option keys
+CONF_PUBLISH_INTERVAL = "publish_interval"
+CONF_SMOOTHING_FILTER = "smoothing_filter"
+CONF_SMOOTHING_WINDOW = "smoothing_window"
+CONF_HISTORY = "history"
+CONF_HISTORY_RETENTION_DAYS = "history_retention_days"
+CONF_HISTORY_COMPACT_DAYS = "history_compact_days"
+CONF_IMPORT_STATISTICS = "import_statistics"
+CONF_INSTRUMENTATION = "instrumentation"
+CONF_SKIP_SCHEMA_VALIDATION = "skip_schema_validation"
+CONF_GRID_ENTITY = "grid_entity"
+CONF_SITE_LIMIT_A = "site_limit_a"
+CONF_SITE_PHASES = "site_phases"
+CONF_SURPLUS_ENTITY = "surplus_entity"
+CONF_MAX_COMMANDS_IN_FLIGHT = "max_commands_in_flight"
+CONF_ADAPTIVE_SAMPLING = "adaptive_sampling"
+CONF_CHARGING_SAMPLE_INTERVAL = "charging_sample_interval"
+CONF_IDLE_SAMPLE_INTERVAL = "idle_sample_interval"
+CONF_SAMPLED_MEASURANDS = "sampled_measurands"
+CONF_RAW_PAYLOADS = "raw_payloads"
+CONF_CAPTURE_FRAMES = "capture_frames"
+CONF_CHARGE_POINT_IDS = "charge_point_ids"
+CONF_POWER_ROLLUPS = "power_rollups"
+CONF_TARIFF = "tariff"
+
+# Used to turn power into current where a meter only reports power
+NOMINAL_VOLTAGE = 230.0
+
+# IEC 61851: below 6 A a car cannot charge, so a station gets 6 A or nothing
+MIN_CURRENT_A = 6.0
+MAX_CURRENT_A = 32.0
+
+# Power smoothing filters
+SMOOTHING_TIME_AVERAGE = "time_average"
+SMOOTHING_EWMA = "ewma"
+SMOOTHING_MEDIAN = "median"
+SMOOTHING_FILTERS = [SMOOTHING_TIME_AVERAGE, SMOOTHING_EWMA, SMOOTHING_MEDIAN]
+
 # Default values
 DEFAULT_PORT = 9006
 DEFAULT_EVSE_ID = 1
 DEFAULT_CONNECTOR_ID = 1
 DEFAULT_ID_TOKEN = "ElecqAutoStart"
+DEFAULT_PUBLISH_INTERVAL = 1.0
+DEFAULT_SMOOTHING_FILTER = SMOOTHING_TIME_AVERAGE
+DEFAULT_SMOOTHING_WINDOW = 60
+DEFAULT_HISTORY = True
+DEFAULT_HISTORY_RETENTION_DAYS = 3650
+DEFAULT_HISTORY_COMPACT_DAYS = 90
+DEFAULT_IMPORT_STATISTICS = True
+DEFAULT_INSTRUMENTATION = False
+DEFAULT_SKIP_SCHEMA_VALIDATION = False
+DEFAULT_SITE_LIMIT_A = 0
+DEFAULT_SITE_PHASES = 1
+DEFAULT_MAX_COMMANDS_IN_FLIGHT = 1
+DEFAULT_ADAPTIVE_SAMPLING = False
+DEFAULT_CHARGING_SAMPLE_INTERVAL = 10
+DEFAULT_IDLE_SAMPLE_INTERVAL = 300
+DEFAULT_SAMPLED_MEASURANDS = (
+    "Energy.Active.Import.Register,Power.Active.Import,Current.Import,Voltage"
+)
+DEFAULT_RAW_PAYLOADS = 0
+DEFAULT_CAPTURE_FRAMES = 0
+DEFAULT_CHARGE_POINT_IDS = ""
+DEFAULT_POWER_ROLLUPS = True
+DEFAULT_TARIFF = ""
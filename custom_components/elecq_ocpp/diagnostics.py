@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_ID_TOKEN
+from .listener import DATA_LISTENERS
+from .ocpp_server import ElecqOcppManager, ElecqStation
+
+TO_REDACT = {CONF_ID_TOKEN}
+
+
+def _listener_diagnostics(hass: HomeAssistant, port: int) -> dict[str, Any]:
+    listener = hass.data.get(DATA_LISTENERS, {}).get(port)
+    return {
+        "port": port,
+        "rejected": listener.rejected if listener is not None else 0,
+    }
+
+
+def _station_diagnostics(station: ElecqStation) -> dict[str, Any]:
+    st = station.state
+    state = {
+        name: value
+        for name, value in asdict(st).items()
+        if name != "meter"
+    }
+    state["meter"] = st.meter.as_dict()
+    return {
+        "connected": station.is_available,
+        "state": state,
+        "sequencing": asdict(station.sequencer.stats),
+        "commands": {
+            **asdict(station.commands.stats),
+            "pending": station.commands.pending,
+        },
+        "hydration": {
+            "count": station.hydrations,
+            "last_seconds": station.hydrated_in,
+        },
+        "sampling": (
+            station.sampling.as_dict() if station.sampling is not None else None
+        ),
+        "capture": (
+            station.capture.as_dict() if station.capture is not None else None
+        ),
+        "rollups": (
+            station.rollups.as_dict() if station.rollups is not None else None
+        ),
+        "raw_payloads": (
+            list(station.raw_payloads) if station.raw_payloads is not None else None
+        ),
+        "ocpp_metrics": (
+            station.metrics.as_dict() if station.metrics is not None else None
+        ),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    manager: ElecqOcppManager = hass.data[DOMAIN][entry.entry_id]["manager"]
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "dispatch": asdict(manager.dispatch_stats),
+        "listener": _listener_diagnostics(hass, manager.port),
+        "load_balancer": (
+            manager.balancer.as_dict() if manager.balancer is not None else None
+        ),
+        "solar": manager.solar.as_dict() if manager.solar is not None else None,
+        "statistics": (
+            manager.statistics.as_dict() if manager.statistics is not None else None
+        ),
+        "stations": {
+            station.cp_id: _station_diagnostics(station)
+            for station in manager.stations
+        },
+    }
@@ -0,0 +1,375 @@
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pending rows are written when this many are buffered or on the next tick
+FLUSH_BATCH_SIZE = 500
+FLUSH_INTERVAL = timedelta(seconds=30)
+MAINTENANCE_INTERVAL = timedelta(hours=24)
+
+# Compacted samples are averaged into buckets of this many seconds
+COMPACT_RESOLUTION = 60
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        station TEXT NOT NULL,
+        transaction_id TEXT,
+        started REAL NOT NULL,
+        ended REAL NOT NULL,
+        energy_kwh REAL,
+        start_meter_kwh REAL,
+        stop_reason TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS sessions_station_started "
+    "ON sessions (station, started)",
+    """
+    CREATE TABLE IF NOT EXISTS samples (
+        station TEXT NOT NULL,
+        ts REAL NOT NULL,
+        power_kw REAL,
+        energy_kwh REAL,
+        resolution INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS samples_station_ts ON samples (station, ts)",
+    """
+    CREATE TABLE IF NOT EXISTS statistics_import (
+        station TEXT PRIMARY KEY,
+        baseline_kwh REAL,
+        imported_until REAL NOT NULL
+    )
+    """,
+)
+
+
+class ElecqHistoryStore:
+    """Append-only local history of charging sessions and meter samples.
+
+    Rows are buffered in memory and written in batches from the executor, so
+    nothing touches the disk on the event loop. Both tables are indexed on
+    (station, time) which keeps range queries fast as the file grows.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        retention_days: int,
+        compact_after_days: int,
+    ) -> None:
+        self.hass = hass
+        self.path = path
+        # 0 disables the respective maintenance step
+        self.retention_days = retention_days
+        self.compact_after_days = compact_after_days
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # sqlite connections must not be used from two threads at once
+        self._lock = threading.Lock()
+
+        self._pending_samples: list[tuple] = []
+        self._pending_sessions: list[tuple] = []
+        self._flush_scheduled = False
+        # Earliest sample time per station added since the last take_changes
+        self._changed: dict[str, float] = {}
+        self._unsub: list = []
+        self._unsub_stop = None
+
+    # ---- lifecycle ----
+
+    async def async_setup(self) -> None:
+        await self.hass.async_add_executor_job(self._open)
+        self._unsub.append(
+            async_track_time_interval(
+                self.hass, self._async_flush_tick, FLUSH_INTERVAL
+            )
+        )
+        self._unsub.append(
+            async_track_time_interval(
+                self.hass, self._async_maintenance_tick, MAINTENANCE_INTERVAL
+            )
+        )
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    async def _async_on_stop(self, _event: Event) -> None:
+        self._unsub_stop = None
+        await self.async_flush()
+
+    async def async_close(self) -> None:
+        for unsub in self._unsub:
+            unsub()
+        self._unsub.clear()
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        await self.async_flush()
+        await self.hass.async_add_executor_job(self._close)
+
+    def _open(self) -> None:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # Only takes effect before the first table is created; a database
+        # made without it is converted once by a full VACUUM
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            conn.execute("VACUUM")
+        conn.execute("PRAGMA journal_mode = WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        self._conn = conn
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- writes ----
+
+    @callback
+    def async_add_sample(
+        self,
+        station: str,
+        ts: float,
+        power_kw: Optional[float],
+        energy_kwh: Optional[float],
+    ) -> None:
+        self._pending_samples.append((station, ts, power_kw, energy_kwh))
+        if ts < self._changed.get(station, math.inf):
+            self._changed[station] = ts
+        if len(self._pending_samples) >= FLUSH_BATCH_SIZE:
+            self._async_schedule_flush()
+
+    @callback
+    def async_add_session(
+        self,
+        station: str,
+        transaction_id: Optional[str],
+        started: float,
+        ended: float,
+        energy_kwh: Optional[float],
+        start_meter_kwh: Optional[float],
+        stop_reason: Optional[str],
+    ) -> None:
+        self._pending_sessions.append(
+            (
+                station,
+                transaction_id,
+                started,
+                ended,
+                energy_kwh,
+                start_meter_kwh,
+                stop_reason,
+            )
+        )
+        self._async_schedule_flush()
+
+    @callback
+    def async_take_changes(self) -> dict[str, float]:
+        """Earliest new sample per station since the previous call."""
+        changed, self._changed = self._changed, {}
+        return changed
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.hass.async_create_task(self.async_flush())
+
+    async def _async_flush_tick(self, _now) -> None:
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Hand everything buffered so far to the executor in one batch."""
+        self._flush_scheduled = False
+        samples, self._pending_samples = self._pending_samples, []
+        sessions, self._pending_sessions = self._pending_sessions, []
+        if not samples and not sessions:
+            return
+        try:
+            await self.hass.async_add_executor_job(
+                self._write_batch, samples, sessions
+            )
+        except sqlite3.Error:
+            _LOGGER.exception(
+                "Error writing %d samples / %d sessions to %s",
+                len(samples),
+                len(sessions),
+                self.path,
+            )
+
+    def _write_batch(self, samples: list[tuple], sessions: list[tuple]) -> None:
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return
+            with conn:
+                if samples:
+                    conn.executemany(
+                        "INSERT INTO samples (station, ts, power_kw, energy_kwh) "
+                        "VALUES (?, ?, ?, ?)",
+                        samples,
+                    )
+                if sessions:
+                    conn.executemany(
+                        "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        sessions,
+                    )
+
+    # ---- maintenance ----
+
+    async def _async_maintenance_tick(self, _now) -> None:
+        await self.async_flush()
+        try:
+            await self.hass.async_add_executor_job(self._maintain, time.time())
+        except sqlite3.Error:
+            _LOGGER.exception("Error compacting history in %s", self.path)
+
+    def _maintain(self, now: float) -> None:
+        """Compact old raw samples, then drop rows beyond retention."""
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return
+            with conn:
+                if self.compact_after_days > 0:
+                    cutoff = now - self.compact_after_days * 86400
+                    conn.execute(
+                        "INSERT INTO samples "
+                        "SELECT station, CAST(ts / ? AS INTEGER) * ?, "
+                        "AVG(power_kw), MAX(energy_kwh), ? "
+                        "FROM samples WHERE resolution = 0 AND ts < ? "
+                        "GROUP BY station, CAST(ts / ? AS INTEGER)",
+                        (
+                            COMPACT_RESOLUTION,
+                            COMPACT_RESOLUTION,
+                            COMPACT_RESOLUTION,
+                            cutoff,
+                            COMPACT_RESOLUTION,
+                        ),
+                    )
+                    conn.execute(
+                        "DELETE FROM samples WHERE resolution = 0 AND ts < ?",
+                        (cutoff,),
+                    )
+                if self.retention_days > 0:
+                    cutoff = now - self.retention_days * 86400
+                    conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+                    conn.execute("DELETE FROM sessions WHERE ended < ?", (cutoff,))
+            # Frees one page per step of the statement; executescript runs
+            # it to completion
+            conn.executescript("PRAGMA incremental_vacuum;")
+
+    # ---- queries ----
+
+    async def async_get_sessions(
+        self, station: str, start: float, end: float
+    ) -> list[dict[str, Any]]:
+        """Sessions of a station that started within [start, end)."""
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(
+            self._query,
+            "SELECT * FROM sessions WHERE station = ? AND started >= ? "
+            "AND started < ? ORDER BY started",
+            (station, start, end),
+        )
+
+    async def async_get_samples(
+        self, station: str, start: float, end: float
+    ) -> list[dict[str, Any]]:
+        """Meter samples of a station within [start, end), oldest first."""
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(
+            self._query,
+            "SELECT ts, power_kw, energy_kwh, resolution FROM samples "
+            "WHERE station = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (station, start, end),
+        )
+
+    async def async_get_hourly(
+        self, station: str, start: float, end: float
+    ) -> list[dict[str, Any]]:
+        """Per hour aggregates of a station's samples within [start, end)."""
+        await self.async_flush()
+        return await self.hass.async_add_executor_job(
+            self._query,
+            "SELECT CAST(ts / 3600 AS INTEGER) * 3600 AS hour, "
+            "MIN(energy_kwh) AS energy_min, MAX(energy_kwh) AS energy_max, "
+            "AVG(power_kw) AS power_mean, MIN(power_kw) AS power_min, "
+            "MAX(power_kw) AS power_max "
+            "FROM samples WHERE station = ? AND ts >= ? AND ts < ? "
+            "GROUP BY hour ORDER BY hour",
+            (station, start, end),
+        )
+
+    async def async_get_stations(self) -> list[str]:
+        """Stations that have samples."""
+        await self.async_flush()
+        rows = await self.hass.async_add_executor_job(
+            self._query, "SELECT DISTINCT station FROM samples", ()
+        )
+        return [row["station"] for row in rows]
+
+    async def async_get_first_sample_time(self, station: str) -> Optional[float]:
+        rows = await self.hass.async_add_executor_job(
+            self._query,
+            "SELECT MIN(ts) AS ts FROM samples WHERE station = ?",
+            (station,),
+        )
+        return rows[0]["ts"] if rows else None
+
+    # ---- statistics import bookkeeping ----
+
+    async def async_get_import_state(
+        self,
+    ) -> dict[str, tuple[Optional[float], float]]:
+        """station -> (baseline_kwh, imported_until) of the statistics import."""
+        rows = await self.hass.async_add_executor_job(
+            self._query, "SELECT * FROM statistics_import", ()
+        )
+        return {
+            row["station"]: (row["baseline_kwh"], row["imported_until"])
+            for row in rows
+        }
+
+    async def async_set_import_state(
+        self, station: str, baseline_kwh: Optional[float], imported_until: float
+    ) -> None:
+        await self.hass.async_add_executor_job(
+            self._execute,
+            "INSERT OR REPLACE INTO statistics_import VALUES (?, ?, ?)",
+            (station, baseline_kwh, imported_until),
+        )
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return
+            with conn:
+                conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple) -> list[dict[str, Any]]:
+        with self._lock:
+            conn = self._conn
+            if conn is None:
+                return []
+            cursor = conn.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
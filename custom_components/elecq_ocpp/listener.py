@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from types import ModuleType
+from typing import TYPE_CHECKING, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from websockets.server import WebSocketServer
+
+    from .ocpp_server import ElecqOcppManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key of the listeners by port
+DATA_LISTENERS = f"{DOMAIN}_listeners"
+
+
+def charge_point_id(path: str) -> str:
+    """Charge point id from the websocket request path."""
+    return path.split("?", 1)[0].strip("/") or "unknown"
+
+
+def async_get_listener(hass: HomeAssistant, port: int) -> ElecqOcppListener:
+    """The listener of a port, shared by every entry using that port.
+
+    Listeners stay registered when their server closes, so an entry that
+    reloads gets the same one back.
+    """
+    listeners: dict[int, ElecqOcppListener] = hass.data.setdefault(
+        DATA_LISTENERS, {}
+    )
+    listener = listeners.get(port)
+    if listener is None:
+        listener = listeners[port] = ElecqOcppListener(hass, port)
+    return listener
+
+
+class ElecqOcppListener:
+    """One OCPP websocket server per port, routing connections to entries.
+
+    Entries list the charge point ids they serve; an entry without a list
+    takes every id no other entry on the port claims. The route is looked
+    up from the request path before the websocket handshake, so a charger
+    no entry serves gets an HTTP 404 without an upgrade, a task or any OCPP
+    work.
+    """
+
+    def __init__(self, hass: HomeAssistant, port: int) -> None:
+        self.hass = hass
+        self.port = port
+        self._managers: list[ElecqOcppManager] = []
+        self._routes: dict[str, ElecqOcppManager] = {}
+        self._default: Optional[ElecqOcppManager] = None
+        self._server: Optional[WebSocketServer] = None
+        self._lock = asyncio.Lock()
+
+        self.rejected = 0
+
+    def route(self, cp_id: str) -> Optional[ElecqOcppManager]:
+        manager = self._routes.get(cp_id)
+        return manager if manager is not None else self._default
+
+    def _accepts(self, path: str) -> bool:
+        if self.route(charge_point_id(path)) is not None:
+            return True
+        self.rejected += 1
+        _LOGGER.debug(
+            "Elecq OCPP: rejected unknown charge point %s on port %s",
+            charge_point_id(path),
+            self.port,
+        )
+        return False
+
+    def _rebuild_routes(self) -> None:
+        routes: dict[str, ElecqOcppManager] = {}
+        default: Optional[ElecqOcppManager] = None
+        for manager in self._managers:
+            if not manager.charge_point_ids:
+                if default is None:
+                    default = manager
+                else:
+                    _LOGGER.warning(
+                        "Elecq OCPP: more than one entry on port %s accepts any "
+                        "charge point; list the ids each entry serves",
+                        self.port,
+                    )
+            for cp_id in manager.charge_point_ids:
+                if cp_id in routes:
+                    _LOGGER.warning(
+                        "Elecq OCPP: charge point %s is listed by two entries "
+                        "on port %s; the first one serves it",
+                        cp_id,
+                        self.port,
+                    )
+                    continue
+                routes[cp_id] = manager
+        self._routes = routes
+        self._default = default
+
+    async def _async_on_connect(self, websocket) -> None:
+        req = getattr(websocket, "request", None)
+        path = req.path if req is not None else getattr(websocket, "path", "/")
+        cp_id = charge_point_id(path)
+        manager = self.route(cp_id)
+        if manager is None:
+            # Its entry was unloaded after the handshake was accepted
+            await websocket.close()
+            return
+        await manager.async_handle_connection(websocket, cp_id)
+
+    async def async_attach(self, manager: ElecqOcppManager, ocpp: ModuleType) -> None:
+        """Route the manager's charge points here; starts the server if needed."""
+        async with self._lock:
+            if manager not in self._managers:
+                self._managers.append(manager)
+                self._rebuild_routes()
+            if self._server is None:
+                self._server = await ocpp.async_serve(
+                    self._async_on_connect, self.port, self._accepts
+                )
+                _LOGGER.info(
+                    "Elecq OCPP 2.0.1 server listening on 0.0.0.0:%s", self.port
+                )
+
+    async def async_detach(self, manager: ElecqOcppManager) -> None:
+        """Stop routing to the manager; the last one out closes the server."""
+        async with self._lock:
+            if manager in self._managers:
+                self._managers.remove(manager)
+                self._rebuild_routes()
+            if self._managers or self._server is None:
+                return
+            server, self._server = self._server, None
+            server.close()
+            await server.wait_closed()
+            _LOGGER.info("Elecq OCPP server on port %s stopped.", self.port)
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Optional
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import MAX_CURRENT_A, MIN_CURRENT_A, NOMINAL_VOLTAGE
+
+if TYPE_CHECKING:
+    from .ocpp_server import ElecqOcppManager, ElecqStation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Source name of the balancer's cap in ElecqStation.async_set_current_limit
+LIMIT_SOURCE = "load_balancer"
+
+# Headroom kept below the site limit for load spikes between meter readings
+SAFETY_MARGIN_A = 1.0
+
+# Limit changes smaller than this are not worth a SetChargingProfile
+DEADBAND_A = 1.0
+
+# Decreases go out immediately; increases to one station at most this often,
+# so a fluctuating house load doesn't make the car ramp up and down
+RAISE_HOLDOFF = 30.0
+
+# Fraction of an amp limits are rounded down to (the OCPP limit has one
+# decimal)
+_RESOLUTION = 10
+
+
+class _Share:
+    """Balancer bookkeeping for one station."""
+
+    __slots__ = (
+        "station",
+        "active",
+        "current_a",
+        "sent_a",
+        "wanted_a",
+        "raised_at",
+        "sending",
+    )
+
+    def __init__(self, station: ElecqStation) -> None:
+        self.station = station
+        self.active = False
+        # Current the station draws right now, as far as we know
+        self.current_a = 0.0
+        # Limit the charger accepted last; None until one was sent
+        self.sent_a: Optional[float] = None
+        # Latest target while a SetChargingProfile is in flight
+        self.wanted_a: Optional[float] = None
+        self.raised_at = -math.inf
+        self.sending = False
+
+
+class ElecqLoadBalancer:
+    """Keep the site under its current limit by throttling the chargers.
+
+    The grid meter measures house and car load together. The car load is
+    known per station, so the house load is the grid reading minus the sum
+    of the station currents; that sum is kept up to date incrementally as
+    stations report. On every grid reading, whatever the site limit leaves
+    above the house load is shared equally between the plugged in stations
+    and pushed as a TxDefaultProfile current limit when it moved enough.
+    """
+
+    def __init__(
+        self,
+        manager: ElecqOcppManager,
+        grid_entity_id: str,
+        site_limit_a: float,
+        site_phases: int = 1,
+    ) -> None:
+        self.manager = manager
+        self.hass: HomeAssistant = manager.hass
+        self.grid_entity_id = grid_entity_id
+        self.site_limit_a = site_limit_a
+        self.site_phases = site_phases
+
+        self._shares: dict[str, _Share] = {}
+        # Active shares in the order they became active: first come, first
+        # served when there is not enough for everyone
+        self._active: dict[str, _Share] = {}
+        self._ev_total_a = 0.0
+        self._grid_a: Optional[float] = None
+        self._unsub = None
+
+        self.rebalances = 0
+        self.profiles_sent = 0
+
+    # ---- lifecycle ----
+
+    @callback
+    def async_start(self) -> None:
+        self._unsub = async_track_state_change_event(
+            self.hass, [self.grid_entity_id], self._async_grid_changed
+        )
+        state = self.hass.states.get(self.grid_entity_id)
+        if state is not None:
+            self._async_grid_state(state)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    # ---- inputs ----
+
+    @callback
+    def _async_grid_changed(self, event: Event) -> None:
+        state = event.data.get("new_state")
+        if state is not None:
+            self._async_grid_state(state)
+
+    @callback
+    def _async_grid_state(self, state) -> None:
+        if state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            return
+        try:
+            value = float(state.state)
+        except ValueError:
+            return
+        unit = state.attributes.get("unit_of_measurement")
+        if unit == "A":
+            amps = value
+        elif unit == "W":
+            amps = value / (NOMINAL_VOLTAGE * self.site_phases)
+        elif unit == "kW":
+            amps = value * 1000 / (NOMINAL_VOLTAGE * self.site_phases)
+        else:
+            _LOGGER.warning(
+                "Grid meter %s reports %s; expected A, W or kW",
+                self.grid_entity_id,
+                unit,
+            )
+            return
+        self.async_set_grid_current(amps)
+
+    @callback
+    def async_set_grid_current(self, amps: float) -> None:
+        """New grid import per phase (negative when exporting)."""
+        self._grid_a = amps
+        self._rebalance()
+
+    @callback
+    def async_update_station(self, station: ElecqStation) -> None:
+        """Track what a station draws; O(1) unless it (de)activated."""
+        share = self._shares.get(station.cp_id)
+        if share is None:
+            share = self._shares[station.cp_id] = _Share(station)
+
+        st = station.state
+        active = station.cp is not None and st.plugged_in
+        current = 0.0
+        if active:
+            current = st.meter.current_import_a
+            if current is None:
+                power = st.power_kw or 0.0
+                current = power * 1000 / (NOMINAL_VOLTAGE * self.site_phases)
+
+        if share.active:
+            self._ev_total_a -= share.current_a
+        share.current_a = current
+        if active:
+            self._ev_total_a += current
+
+        if active != share.active:
+            share.active = active
+            if active:
+                self._active[station.cp_id] = share
+            else:
+                self._active.pop(station.cp_id, None)
+                # The charger may have forgotten the profile by next time
+                share.sent_a = None
+                share.wanted_a = None
+            self._rebalance()
+
+    # ---- allocation ----
+
+    def _rebalance(self) -> None:
+        active = self._active
+        if self._grid_a is None or not active:
+            return
+        self.rebalances += 1
+
+        house_a = self._grid_a - self._ev_total_a
+        budget = self.site_limit_a - SAFETY_MARGIN_A - house_a
+        share_a = budget / len(active)
+        now = self.hass.loop.time()
+
+        if share_a >= MIN_CURRENT_A:
+            target = math.floor(min(share_a, MAX_CURRENT_A) * _RESOLUTION)
+            target /= _RESOLUTION
+            for share in active.values():
+                self._offer(share, target, now)
+            return
+
+        # Not enough for everyone: the first stations get the minimum, the
+        # rest are paused
+        funded = max(0, int(budget // MIN_CURRENT_A))
+        for i, share in enumerate(active.values()):
+            self._offer(share, MIN_CURRENT_A if i < funded else 0.0, now)
+
+    def _offer(self, share: _Share, target: float, now: float) -> None:
+        if share.sending:
+            share.wanted_a = target
+            return
+        sent = share.sent_a
+        if sent is not None:
+            delta = target - sent
+            if (target == 0) == (sent == 0):
+                if -DEADBAND_A < delta < DEADBAND_A:
+                    return
+                if delta > 0 and now - share.raised_at < RAISE_HOLDOFF:
+                    return
+            elif target > 0 and now - share.raised_at < RAISE_HOLDOFF:
+                # Resuming a paused station counts as a raise
+                return
+        share.sending = True
+        self.hass.async_create_task(self._async_send(share, target))
+
+    async def _async_send(self, share: _Share, target: float) -> None:
+        try:
+            ok = await share.station.async_set_current_limit(LIMIT_SOURCE, target)
+        finally:
+            share.sending = False
+        if ok:
+            self.profiles_sent += 1
+            if share.sent_a is None or target > share.sent_a:
+                share.raised_at = self.hass.loop.time()
+            share.sent_a = target
+        wanted, share.wanted_a = share.wanted_a, None
+        if wanted is not None and share.active:
+            self._offer(share, wanted, self.hass.loop.time())
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "grid_entity_id": self.grid_entity_id,
+            "site_limit_a": self.site_limit_a,
+            "site_phases": self.site_phases,
+            "grid_a": self._grid_a,
+            "ev_total_a": self._ev_total_a,
+            "rebalances": self.rebalances,
+            "profiles_sent": self.profiles_sent,
+            "stations": {
+                cp_id: {
+                    "active": share.active,
+                    "current_a": share.current_a,
+                    "limit_a": share.sent_a,
+                }
+                for cp_id, share in self._shares.items()
+            },
+        }
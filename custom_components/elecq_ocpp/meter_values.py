@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+
+class MeterReading:
+    """Latest decoded value of every measurand we understand.
+
+    Values are normalized (kW, kWh, A, V, Hz, %). A slot keeps its last known
+    value until the charger reports it again.
+    """
+
+    __slots__ = (
+        "power_active_import_kw",
+        "power_active_export_kw",
+        "power_offered_kw",
+        "power_factor",
+        "energy_active_import_kwh",
+        "energy_active_export_kwh",
+        "current_import_a",
+        "current_l1_a",
+        "current_l2_a",
+        "current_l3_a",
+        "current_offered_a",
+        "voltage_v",
+        "voltage_l1_v",
+        "voltage_l2_v",
+        "voltage_l3_v",
+        "frequency_hz",
+        "soc_pct",
+    )
+
+    def __init__(self) -> None:
+        for name in self.__slots__:
+            setattr(self, name, None)
+
+    def as_dict(self) -> dict[str, Optional[float]]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# Bit per slot, so decode_meter_values can report what a message contained
+# without building a set
+SLOT_BITS: dict[str, int] = {
+    name: 1 << i for i, name in enumerate(MeterReading.__slots__)
+}
+
+# Unit -> factor to the slot's normalized unit. A missing unit keeps the value
+# as sent, which is how AU101 firmware reports power and energy.
+_POWER_UNITS = {None: 1.0, "kW": 1.0, "W": 0.001}
+_ENERGY_UNITS = {None: 1.0, "kWh": 1.0, "Wh": 0.001}
+_CURRENT_UNITS = {None: 1.0, "A": 1.0}
+_VOLTAGE_UNITS = {None: 1.0, "V": 1.0}
+_FREQUENCY_UNITS = {None: 1.0, "Hz": 1.0}
+_PERCENT_UNITS = {None: 1.0, "Percent": 1.0}
+
+_SUPPLY_LOCATIONS = (None, "Outlet", "Inlet", "Cable")
+_EV_LOCATIONS = (None, "EV")
+
+# (measurand, phases, locations, units, slot). Phase None means the total /
+# single phase value.
+_RULES: tuple[tuple[str, tuple, tuple, dict, str], ...] = (
+    ("Power.Active.Import", (None,), _SUPPLY_LOCATIONS, _POWER_UNITS, "power_active_import_kw"),
+    ("Power.Active.Export", (None,), _SUPPLY_LOCATIONS, _POWER_UNITS, "power_active_export_kw"),
+    ("Power.Offered", (None,), _SUPPLY_LOCATIONS, _POWER_UNITS, "power_offered_kw"),
+    ("Power.Factor", (None,), _SUPPLY_LOCATIONS, {None: 1.0}, "power_factor"),
+    ("Energy.Active.Import.Register", (None,), _SUPPLY_LOCATIONS, _ENERGY_UNITS, "energy_active_import_kwh"),
+    ("Energy.Active.Export.Register", (None,), _SUPPLY_LOCATIONS, _ENERGY_UNITS, "energy_active_export_kwh"),
+    ("Current.Import", (None,), _SUPPLY_LOCATIONS, _CURRENT_UNITS, "current_import_a"),
+    ("Current.Import", ("L1", "L1-N"), _SUPPLY_LOCATIONS, _CURRENT_UNITS, "current_l1_a"),
+    ("Current.Import", ("L2", "L2-N"), _SUPPLY_LOCATIONS, _CURRENT_UNITS, "current_l2_a"),
+    ("Current.Import", ("L3", "L3-N"), _SUPPLY_LOCATIONS, _CURRENT_UNITS, "current_l3_a"),
+    ("Current.Offered", (None,), _SUPPLY_LOCATIONS, _CURRENT_UNITS, "current_offered_a"),
+    ("Voltage", (None,), _SUPPLY_LOCATIONS, _VOLTAGE_UNITS, "voltage_v"),
+    ("Voltage", ("L1", "L1-N"), _SUPPLY_LOCATIONS, _VOLTAGE_UNITS, "voltage_l1_v"),
+    ("Voltage", ("L2", "L2-N"), _SUPPLY_LOCATIONS, _VOLTAGE_UNITS, "voltage_l2_v"),
+    ("Voltage", ("L3", "L3-N"), _SUPPLY_LOCATIONS, _VOLTAGE_UNITS, "voltage_l3_v"),
+    ("Frequency", (None,), _SUPPLY_LOCATIONS, _FREQUENCY_UNITS, "frequency_hz"),
+    ("SoC", (None,), _EV_LOCATIONS, _PERCENT_UNITS, "soc_pct"),
+)
+
+
+def _compile(
+    rules: tuple[tuple[str, tuple, tuple, dict, str], ...],
+) -> dict[tuple, tuple[str, float, int]]:
+    table: dict[tuple, tuple[str, float, int]] = {}
+    for measurand, phases, locations, units, slot in rules:
+        for phase in phases:
+            for location in locations:
+                for unit, factor in units.items():
+                    table[(measurand, phase, location, unit)] = (
+                        slot,
+                        factor,
+                        SLOT_BITS[slot],
+                    )
+    return table
+
+
+# (measurand, phase, location, unit) -> (slot, factor, slot bit)
+_DECODE_TABLE = _compile(_RULES)
+
+_POW10 = {m: 10.0**m for m in range(-9, 10)}
+
+# OCPP 2.0.1 default when a sampledValue omits the measurand
+_DEFAULT_MEASURAND = "Energy.Active.Import.Register"
+
+
+def decode_meter_values(
+    meter_value: list[dict[str, Any]], reading: MeterReading
+) -> int:
+    """Decode meterValue[] into reading in one pass.
+
+    Returns a bit mask (see SLOT_BITS) of the slots this message updated.
+    Unknown measurand/phase/location/unit combinations are skipped.
+    """
+    table = _DECODE_TABLE
+    seen = 0
+    for mv in meter_value:
+        for sv in mv.get("sampled_value", ()):
+            uom = sv.get("unit_of_measure")
+            if uom:
+                unit = uom.get("unit")
+                mult = uom.get("multiplier") or 0
+            else:
+                unit = None
+                mult = 0
+
+            entry = table.get(
+                (
+                    sv.get("measurand", _DEFAULT_MEASURAND),
+                    sv.get("phase"),
+                    sv.get("location"),
+                    unit,
+                )
+            )
+            if entry is None:
+                continue
+            slot, factor, bit = entry
+
+            try:
+                value = float(sv["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if mult:
+                value *= _POW10.get(mult) or 10.0**mult
+
+            setattr(reading, slot, value * factor)
+            seen |= bit
+    return seen
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open ended
+BUCKETS_MS: tuple[float, ...] = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; recording is a bisect and two adds."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def merge(self, other: Histogram) -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class ActionMetrics:
+    """Traffic and timing of one OCPP action on one station."""
+
+    __slots__ = (
+        "received",
+        "sent",
+        "bytes_in",
+        "bytes_out",
+        "handler",
+        "round_trip",
+        "timeouts",
+        "errors",
+    )
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.sent = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Time spent in our handler for charger initiated calls
+        self.handler = Histogram()
+        # Round trip of calls we send to the charger
+        self.round_trip = Histogram()
+        self.timeouts = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "received": self.received,
+            "sent": self.sent,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "handler": self.handler.as_dict(),
+            "round_trip": self.round_trip.as_dict(),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class StationMetrics:
+    """OCPP instrumentation of one charge point, broken down by action."""
+
+    def __init__(self) -> None:
+        self.actions: dict[str, ActionMetrics] = {}
+        self.connections = 0
+
+    def action(self, name: str) -> ActionMetrics:
+        metrics = self.actions.get(name)
+        if metrics is None:
+            metrics = self.actions[name] = ActionMetrics()
+        return metrics
+
+    @property
+    def reconnects(self) -> int:
+        return max(0, self.connections - 1)
+
+    @property
+    def messages(self) -> int:
+        return sum(m.received + m.sent for m in self.actions.values())
+
+    @property
+    def timeouts(self) -> int:
+        return sum(m.timeouts for m in self.actions.values())
+
+    def combined(self, attr: str) -> Histogram:
+        """All actions' handler or round_trip histograms merged into one."""
+        merged = Histogram()
+        for metrics in self.actions.values():
+            merged.merge(getattr(metrics, attr))
+        return merged
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "reconnects": self.reconnects,
+            "actions": {
+                name: metrics.as_dict()
+                for name, metrics in sorted(self.actions.items())
+            },
+        }
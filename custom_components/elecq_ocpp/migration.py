@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Unique id prefix and device identifier of the single charger served by
+# config entries of version 1
+LEGACY_PREFIX = "elecq_au101"
+LEGACY_DEVICE_ID = "elecq_au101"
+
+
+@callback
+def async_has_legacy_entities(hass: HomeAssistant, entry_id: str) -> bool:
+    """Whether entities of the entry still have version 1 unique ids."""
+    return any(
+        entity.unique_id.startswith(f"{LEGACY_PREFIX}_")
+        for entity in er.async_entries_for_config_entry(er.async_get(hass), entry_id)
+    )
+
+
+@callback
+def async_adopt_legacy_entities(
+    hass: HomeAssistant, entry_id: str, cp_id: str
+) -> None:
+    """Move the version 1 device and entities of an entry to a charger.
+
+    Renames unique ids like `elecq_au101_power` to `elecq_<cp_id>_power` and
+    the device identifier to the charge point id, so the entity ids, names
+    and statistics stay with the charger. Ids the charger already has are
+    left alone.
+    """
+    prefix = f"elecq_{cp_id.lower()}"
+    ent_reg = er.async_get(hass)
+    for entity in er.async_entries_for_config_entry(ent_reg, entry_id):
+        if not entity.unique_id.startswith(f"{LEGACY_PREFIX}_"):
+            continue
+        unique_id = prefix + entity.unique_id[len(LEGACY_PREFIX) :]
+        if unique_id == entity.unique_id:
+            continue
+        if ent_reg.async_get_entity_id(entity.domain, DOMAIN, unique_id):
+            _LOGGER.warning(
+                "Not migrating %s: %s already exists", entity.entity_id, unique_id
+            )
+            continue
+        ent_reg.async_update_entity(entity.entity_id, new_unique_id=unique_id)
+
+    dev_reg = dr.async_get(hass)
+    device = dev_reg.async_get_device(identifiers={(DOMAIN, LEGACY_DEVICE_ID)})
+    if (
+        device is not None
+        and dev_reg.async_get_device(identifiers={(DOMAIN, cp_id)}) is None
+    ):
+        dev_reg.async_update_device(device.id, new_identifiers={(DOMAIN, cp_id)})
+
+    _LOGGER.info("Elecq OCPP: moved the existing entities to charge point %s", cp_id)
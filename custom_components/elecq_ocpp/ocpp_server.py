@@ -1,34 +1,70 @@
 from __future__ import annotations
 
+import asyncio
+import importlib
 import logging
-from dataclasses import dataclass
+import math
+from collections import deque
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timezone
-from typing import Any, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Optional
 
-import websockets
-from websockets.server import WebSocketServer
-from websockets.exceptions import ConnectionClosed
-
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-
-from ocpp.routing import on
-from ocpp.v201 import ChargePoint as OcppChargePointBase
-from ocpp.v201 import call, call_result
-from ocpp.v201.enums import (
-    RegistrationStatusEnumType,
-    RequestStartStopStatusEnumType,
-    MessageTriggerEnumType,  # 👈 NEW
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import (
+    DOMAIN,
+    SIGNAL_STATE_UPDATED,
+    SIGNAL_STATION_ADDED,
+    GROUP_POWER,
+    GROUP_POWER_SMOOTHED,
+    GROUP_ENERGY,
+    GROUP_SESSION_ENERGY,
+    GROUP_SESSION_COST,
+    GROUP_STATUS,
+    GROUP_CHARGING_STATE,
+    GROUP_PLUGGED_IN,
+    GROUP_CHARGING,
+    GROUP_CONNECTION,
+    DEFAULT_PUBLISH_INTERVAL,
+    DEFAULT_SMOOTHING_FILTER,
+    DEFAULT_SMOOTHING_WINDOW,
+    DEFAULT_MAX_COMMANDS_IN_FLIGHT,
 )
-
-from .const import SIGNAL_STATE_UPDATED
+from .capture import TrafficCapture, write_capture
+from .commands import CommandQueue, ElecqCommandError
+from .history import ElecqHistoryStore
+from .listener import ElecqOcppListener, async_get_listener
+from .metrics import StationMetrics
+from .migration import async_adopt_legacy_entities
+from .meter_values import MeterReading, SLOT_BITS, decode_meter_values
+from .rollups import PowerRollups
+from .sampling import AdaptiveSampling, SamplingPolicy
+from .sequencing import DUPLICATE, HELD, STALE, TransactionSequencer
+from .smoothing import create_power_filter
+from .tariff import TariffSchedule
+
+if TYPE_CHECKING:
+    from .charge_point import ElecqChargePoint
+    from .load_balancer import ElecqLoadBalancer
+    from .recorder_statistics import ElecqStatisticsImporter
+    from .solar import ElecqSolarController
+    from .state_store import ElecqStateStore
 
 _LOGGER = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ElecqChargerState:
-    """Live state from Elecq charger."""
+    """Live state from Elecq charger.
+
+    Only decoded values are kept; raw payloads are not referenced after a
+    message was applied (see ElecqStation.raw_payloads for debugging).
+    """
 
     power_kw: Optional[float] = None
     power_kw_smoothed: Optional[float] = None
@@ -41,6 +77,12 @@ class ElecqChargerState:
     session_event_type: Optional[str] = None
     session_trigger_reason: Optional[str] = None
 
+    # Time-of-use cost of the session, with the sample it was counted up to
+    session_cost: Optional[float] = None
+    session_average_price: Optional[float] = None
+    session_cost_ts: Optional[float] = None
+    session_cost_meter_kwh: Optional[float] = None
+
     plugged_in: bool = False
     charging: bool = False
 
@@ -49,93 +91,546 @@ class ElecqChargerState:
     transaction_id: Optional[str] = None
     last_status: Optional[str] = None
     last_charging_state: Optional[str] = None
+    last_stopped_reason: Optional[str] = None
 
-    last_transaction_info: Optional[dict[str, Any]] = None
-    last_meter_value: Optional[list[dict[str, Any]]] = None
+    # Every decoded measurand (voltage, per phase current, SoC, ...)
+    meter: MeterReading = field(default_factory=MeterReading)
 
     last_update: Optional[datetime] = None
 
 
-class ElecqOcppManager:
-    """Manager running OCPP server & storing charger state."""
+# Which state group each rendered field belongs to. Fields not listed here
+# (timestamps, bookkeeping) never trigger an entity update.
+STATE_GROUPS: dict[str, str] = {
+    "power_kw": GROUP_POWER,
+    "power_kw_smoothed": GROUP_POWER_SMOOTHED,
+    "energy_kwh": GROUP_ENERGY,
+    "session_energy_kwh": GROUP_SESSION_ENERGY,
+    "session_cost": GROUP_SESSION_COST,
+    "session_average_price": GROUP_SESSION_COST,
+    "last_status": GROUP_STATUS,
+    "last_charging_state": GROUP_CHARGING_STATE,
+    "transaction_id": GROUP_CHARGING_STATE,
+    "plugged_in": GROUP_PLUGGED_IN,
+    "charging": GROUP_CHARGING,
+}
+
+_TRACKED_FIELDS: tuple[str, ...] = tuple(
+    f.name for f in fields(ElecqChargerState) if f.name in STATE_GROUPS
+)
 
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        port: int,
-        id_token: str,
-        evse_id: int,
-        connector_id: int,
-    ) -> None:
-        self.hass = hass
-        self.port = port
-        self.id_token = id_token
-        self.evse_id = evse_id
-        self.connector_id = connector_id
+# Extra measurands each form a group named after their MeterReading slot.
+# Import power and energy are already covered by power_kw / energy_kwh.
+METER_GROUPS: tuple[str, ...] = tuple(
+    name
+    for name in MeterReading.__slots__
+    if name not in ("power_active_import_kw", "energy_active_import_kwh")
+)
+
+# Groups carrying measurements; these are rate limited by publish_interval.
+# Plug, charging and connection transitions are always published at once.
+_RATE_LIMITED_GROUPS = frozenset(
+    {
+        GROUP_POWER,
+        GROUP_POWER_SMOOTHED,
+        GROUP_ENERGY,
+        GROUP_SESSION_ENERGY,
+        GROUP_SESSION_COST,
+        *METER_GROUPS,
+    }
+)
+
+# Capture files go to <config>/elecq_ocpp_captures/<cp_id>.jsonl
+CAPTURE_DIR = f"{DOMAIN}_captures"
+
+# Seconds after a connection before it is hydrated, unless BootNotification
+# comes first (a charger that only reconnected doesn't send one)
+HYDRATE_DELAY = 2.0
+# Messages a hydration asks for, and the seconds from its start after which
+# it publishes whatever arrived: the commands' own timeouts and retries add up
+# to minutes, too long to hold an unresponsive charger's updates back
+HYDRATE_TRIGGERS = ("StatusNotification", "MeterValues", "TransactionEvent")
+HYDRATE_TIMEOUT = 10.0
+
+# Quiet time after the last offline TransactionEvent before the replayed
+# backlog is published in one go
+REPLAY_SETTLE_SECONDS = 2.0
+
+_POWER_BIT = SLOT_BITS["power_active_import_kw"]
+_ENERGY_BIT = SLOT_BITS["energy_active_import_kwh"]
 
-        self._cp: Optional[ElecqChargePoint] = None
-        self._server: Optional[WebSocketServer] = None
+
+@dataclass
+class DispatchStats:
+    """Counters showing how many updates actually reach the entities."""
+
+    notifies: int = 0
+    signals_sent: int = 0
+    state_writes: int = 0
+
+
+def _parse_charger_time(timestamp: Optional[str]) -> datetime:
+    """Charger timestamp as an aware datetime, falling back to now."""
+    if timestamp:
+        parsed = dt_util.parse_datetime(timestamp)
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed
+    return datetime.now(timezone.utc)
+
+
+class ElecqStation:
+    """One connected charge point: its state and its command channel."""
+
+    def __init__(self, manager: ElecqOcppManager, cp_id: str) -> None:
+        self.manager = manager
+        self.hass = manager.hass
+        self.cp_id = cp_id
+
+        self.cp: Optional[ElecqChargePoint] = None
 
         self.state = ElecqChargerState()
 
-        self._power_window: list[float] = []
-        self._max_power_samples: int = 5
+        # Per-action OCPP instrumentation, None when disabled
+        self.metrics: Optional[StationMetrics] = (
+            StationMetrics() if manager.instrumentation else None
+        )
+
+        self._power_filter = create_power_filter(
+            manager.smoothing_filter, manager.smoothing_window
+        )
+
+        self._signals: dict[str, str] = {
+            group: SIGNAL_STATE_UPDATED.format(manager.entry_id, cp_id, group)
+            for group in (*STATE_GROUPS.values(), *METER_GROUPS, GROUP_CONNECTION)
+        }
+        # Values as last published, used to find what moved since then
+        self._published: dict[str, Any] = {
+            name: getattr(self.state, name) for name in _TRACKED_FIELDS
+        }
+        self._published_meter: dict[str, Optional[float]] = dict.fromkeys(
+            METER_GROUPS
+        )
+        self._published_available = False
+
+        # Coalescing: groups waiting to be sent and when each was last sent
+        self._pending_groups: set[str] = set()
+        self._last_sent: dict[str, float] = {}
+        self._publish_scheduled = False
+        self._publish_timer: Optional[asyncio.TimerHandle] = None
+
+        # Ordering / dedupe of TransactionEvents and offline replay batching
+        self.sequencer = TransactionSequencer()
+        self._replay_timer: Optional[asyncio.TimerHandle] = None
+        self._stale_reading = MeterReading()
+
+        # Outbound commands: dedupe, timeouts, retries, concurrency
+        self.commands = CommandQueue(
+            manager.max_commands_in_flight,
+            on_timeout=self._record_timeout if self.metrics is not None else None,
+        )
+
+        # Sampling interval management, None when the charger is left alone
+        self.sampling: Optional[AdaptiveSampling] = (
+            AdaptiveSampling(self, manager.sampling_policy)
+            if manager.sampling_policy is not None
+            else None
+        )
+
+        # Charging current caps by source and the limit the charger accepted
+        self._current_limits: dict[str, float] = {}
+        self._sent_limit: Optional[float] = None
+
+        # Hydration: state requested from the charger right after connecting
+        self._hydrate_timer: Optional[asyncio.TimerHandle] = None
+        self._hydration_task: Optional[asyncio.Task] = None
+        self._hydrating = False
+        self._hydration_waiters: dict[str, asyncio.Future] = {}
+        self._connected_at: Optional[float] = None
+        self.hydrations = 0
+        # Seconds from connect to the consolidated state of the last one
+        self.hydrated_in: Optional[float] = None
+
+        # Raw OCPP frames in both directions, None unless enabled
+        self.capture: Optional[TrafficCapture] = (
+            TrafficCapture(manager.capture_frames) if manager.capture_frames else None
+        )
+
+        # Power and energy at several resolutions for dashboards, None if off
+        self.rollups: Optional[PowerRollups] = (
+            PowerRollups() if manager.power_rollups else None
+        )
+
+        # Last raw TransactionEvent payloads, None unless enabled
+        self.raw_payloads: Optional[deque[dict[str, Any]]] = (
+            deque(maxlen=manager.raw_payloads) if manager.raw_payloads else None
+        )
+
+    def signal_state_updated(self, group: str) -> str:
+        """Dispatcher signal fired when a field of the given group changes."""
+        return self._signals[group]
+
+    @property
+    def unique_id_prefix(self) -> str:
+        """Prefix for unique ids of the entities belonging to this station."""
+        return f"elecq_{self.cp_id.lower()}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(
+            identifiers={(DOMAIN, self.cp_id)},
+            name=f"Elecq {self.cp_id}",
+            manufacturer="Elecq",
+            model="AU101",
+        )
+
+    @callback
+    def async_mark_disconnected(self) -> None:
+        """Reset what only holds while the charger is connected."""
+        self._cancel_hydration()
+        st = self.state
+        st.charging = False
+        st.plugged_in = False
+        st.transaction_id = None
+        st.last_charging_state = None
+        st.last_status = "Disconnected"
+        st.remote_stop_requested = False
+        st.last_update = datetime.now(timezone.utc)
+        self._notify()
+
+    @callback
+    def async_on_connect(self) -> None:
+        """A charger connection was set up; hydrate it shortly."""
+        self._connected_at = self.hass.loop.time()
+        self._cancel_hydration()
+        self._hydrate_timer = self.hass.loop.call_later(
+            HYDRATE_DELAY, self._async_start_hydration
+        )
+
+    @callback
+    def async_on_boot(self) -> None:
+        """BootNotification was accepted."""
+        if self.sampling is not None:
+            self.sampling.async_on_boot()
+        self._async_start_hydration()
+
+    @callback
+    def async_on_message(self, action: str) -> None:
+        """An inbound call was handled; completes a hydration waiting for it."""
+        waiter = self._hydration_waiters.pop(action, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def _cancel_hydration(self) -> None:
+        if self._hydrate_timer is not None:
+            self._hydrate_timer.cancel()
+            self._hydrate_timer = None
+        if self._hydration_task is not None:
+            self._hydration_task.cancel()
+            self._hydration_task = None
+        self._hydrating = False
+        self._hydration_waiters = {}
+
+    @callback
+    def _async_start_hydration(self) -> None:
+        self._cancel_hydration()
+        if self.cp is not None:
+            self._hydrating = True
+            self._hydration_task = self.hass.async_create_task(self._async_hydrate())
+
+    async def _async_trigger(self, action: str) -> Optional[str]:
+        return await self.commands.async_run(
+            "TriggerMessage",
+            lambda: self._connected_cp().async_trigger_message(action),
+            key=("TriggerMessage", action),
+        )
+
+    async def _async_hydrate(self) -> None:
+        """Ask for the full state at once and publish it as one update.
+
+        Triggers StatusNotification, MeterValues and TransactionEvent and asks
+        GetTransactionStatus whether offline events are queued, all submitted
+        together, then waits for the triggered messages. Publishing is held
+        until then, so the entities go from the restored to the live state in
+        one step instead of one message at a time over minutes. All of it
+        runs under HYDRATE_TIMEOUT; commands still queued at the deadline
+        carry on without holding the publish back.
+        """
+        loop = self.hass.loop
+        task = asyncio.current_task()
+        waiters = self._hydration_waiters = {
+            action: loop.create_future() for action in HYDRATE_TRIGGERS
+        }
+        try:
+            await asyncio.wait_for(
+                self._async_request_state(waiters), HYDRATE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.debug(
+                "Hydration of %s incomplete after %g s", self.cp_id, HYDRATE_TIMEOUT
+            )
+        finally:
+            # Unless a newer hydration has replaced this one
+            if self._hydration_task is task:
+                self._hydration_task = None
+                self._hydrating = False
+                self._hydration_waiters = {}
+        self.hydrations += 1
+        if self._connected_at is not None:
+            self.hydrated_in = loop.time() - self._connected_at
+        self._notify()
+
+    async def _async_request_state(
+        self, waiters: dict[str, asyncio.Future]
+    ) -> None:
+        results = await asyncio.gather(
+            *(self._async_trigger(action) for action in HYDRATE_TRIGGERS),
+            self.commands.async_run(
+                "GetTransactionStatus",
+                lambda: self._connected_cp().async_get_transaction_status(),
+            ),
+            return_exceptions=True,
+        )
+        *trigger_results, transaction_status = results
+        pending = [
+            waiters[action]
+            for action, status in zip(HYDRATE_TRIGGERS, trigger_results)
+            if status == "Accepted" and action in waiters
+        ]
+        if transaction_status is True:
+            # The charger holds offline events; they follow as a replay
+            self._begin_replay()
+        if pending:
+            await asyncio.wait(pending)
+        for result in results:
+            if isinstance(result, ElecqCommandError):
+                _LOGGER.debug("Hydration of %s: %s", self.cp_id, result)
 
     def _notify(self) -> None:
-        async_dispatcher_send(self.hass, SIGNAL_STATE_UPDATED)
+        """Schedule a publish; bursts within one loop tick are merged."""
+        self.manager.dispatch_stats.notifies += 1
+        if self._replay_timer is not None or self._hydrating:
+            # Published once when the offline backlog / hydration is through
+            return
+        balancer = self.manager.balancer
+        if balancer is not None:
+            balancer.async_update_station(self)
+        if self.sampling is not None:
+            self.sampling.async_update()
+        if not self._publish_scheduled:
+            self._publish_scheduled = True
+            self.hass.loop.call_soon(self._async_publish)
+
+    def _async_publish(self) -> None:
+        """Send the state groups that changed and are due.
+
+        Rate limited groups sent less than publish_interval ago stay pending
+        and go out when the interval expires, so the final value always lands.
+        """
+        self._publish_scheduled = False
+        if self._publish_timer is not None:
+            self._publish_timer.cancel()
+            self._publish_timer = None
+
+        st = self.state
+        published = self._published
+        pending = self._pending_groups
+        for name in _TRACKED_FIELDS:
+            value = getattr(st, name)
+            if published[name] != value:
+                published[name] = value
+                pending.add(STATE_GROUPS[name])
+
+        meter = st.meter
+        published_meter = self._published_meter
+        for name in METER_GROUPS:
+            value = getattr(meter, name)
+            if published_meter[name] != value:
+                published_meter[name] = value
+                pending.add(name)
+
+        available = self.cp is not None
+        if available != self._published_available:
+            self._published_available = available
+            pending.add(GROUP_CONNECTION)
+
+        if not pending:
+            return
+
+        state_store = self.manager.state_store
+        if state_store is not None:
+            state_store.async_schedule_save()
+
+        interval = self.manager.publish_interval
+        now = self.hass.loop.time()
+        next_due: Optional[float] = None
+        sent = 0
+        for group in list(pending):
+            if interval > 0 and group in _RATE_LIMITED_GROUPS:
+                due = self._last_sent.get(group, -interval) + interval
+                if due > now:
+                    next_due = due if next_due is None else min(next_due, due)
+                    continue
+                self._last_sent[group] = now
+            pending.discard(group)
+            async_dispatcher_send(self.hass, self._signals[group])
+            sent += 1
+        self.manager.dispatch_stats.signals_sent += sent
+
+        if next_due is not None:
+            self._publish_timer = self.hass.loop.call_at(
+                next_due, self._async_publish
+            )
+
+    def async_shutdown(self) -> None:
+        """Cancel pending rate-limited publishes, replay and hydration timers."""
+        self._cancel_hydration()
+        if self._publish_timer is not None:
+            self._publish_timer.cancel()
+            self._publish_timer = None
+        if self._replay_timer is not None:
+            self._replay_timer.cancel()
+            self._replay_timer = None
 
-    def _update_power_smoothing(self, power_kw: float) -> None:
-        self._power_window.append(power_kw)
-        if len(self._power_window) > self._max_power_samples:
-            self._power_window.pop(0)
-        self.state.power_kw_smoothed = sum(self._power_window) / len(self._power_window)
+    def _update_power_smoothing(self, power_kw: float, timestamp: float) -> None:
+        self.state.power_kw_smoothed = self._power_filter.update(timestamp, power_kw)
 
-    def _update_session_energy(self, total_kwh: float) -> None:
+    def _update_session_energy(self, total_kwh: float, ts: float) -> None:
         st = self.state
         if st.session_start is None:
             return
         if st.session_start_meter_kwh is None:
             st.session_start_meter_kwh = total_kwh
         st.session_energy_kwh = max(0.0, total_kwh - st.session_start_meter_kwh)
+        tariff = self.manager.tariff
+        if tariff is not None:
+            self._update_session_cost(tariff, total_kwh, ts)
 
-    def update_meter_values(self, meter_value: list[dict[str, Any]]) -> None:
-        """Parse meterValue[] from TransactionEvent."""
+    def _update_session_cost(
+        self, tariff: TariffSchedule, total_kwh: float, ts: float
+    ) -> None:
+        """Add the energy since the previous sample at the prices it spans."""
         st = self.state
-        power_kw = st.power_kw
-        total_kwh = st.energy_kwh
-
-        for mv in meter_value:
-            for sv in mv.get("sampled_value", []):
-                measurand = sv.get("measurand")
-                val_raw = sv.get("value")
-                uom = sv.get("unit_of_measure", {}) or {}
-                unit = uom.get("unit")
-                mult = uom.get("multiplier", 0) or 0
-
-                try:
-                    value = float(val_raw) * (10 ** mult)
-                except (TypeError, ValueError):
-                    continue
+        if st.session_cost is None:
+            st.session_cost = 0.0
+        last_kwh = st.session_cost_meter_kwh
+        last_ts = st.session_cost_ts
+        if last_kwh is not None and last_ts is not None and total_kwh > last_kwh:
+            st.session_cost += tariff.cost(last_ts, ts, total_kwh - last_kwh)
+        # A lower reading (meter reset) only moves the baseline
+        st.session_cost_meter_kwh = total_kwh
+        st.session_cost_ts = ts
+        if st.session_energy_kwh:
+            st.session_average_price = st.session_cost / st.session_energy_kwh
+
+    def _record_session_end(
+        self,
+        transaction_id: Optional[str],
+        stop_reason: Optional[str],
+        ended: datetime,
+    ) -> None:
+        """Append the session that is about to be cleared to the history."""
+        st = self.state
+        history = self.manager.history
+        if history is None or st.session_start is None:
+            return
+        history.async_add_session(
+            station=self.cp_id,
+            transaction_id=transaction_id,
+            started=st.session_start.timestamp(),
+            ended=ended.timestamp(),
+            energy_kwh=st.session_energy_kwh,
+            start_meter_kwh=st.session_start_meter_kwh,
+            stop_reason=stop_reason,
+        )
 
-                if measurand == "Power.Active.Import":
-                    if unit == "W":
-                        power_kw = value / 1000.0
-                    else:
-                        power_kw = value
-                elif measurand == "Energy.Active.Import.Register":
-                    total_kwh = value
+    def update_meter_values(
+        self,
+        meter_value: list[dict[str, Any]],
+        when: Optional[datetime] = None,
+    ) -> None:
+        """Parse meterValue[] from TransactionEvent.
 
-        st.power_kw = power_kw
-        if power_kw is not None:
-            self._update_power_smoothing(power_kw)
+        `when` is the charger's time of the sample; it defaults to now.
+        """
+        st = self.state
+        if when is None:
+            when = datetime.now(timezone.utc)
+        ts = when.timestamp()
+        seen = decode_meter_values(meter_value, st.meter)
+
+        if seen & _POWER_BIT:
+            st.power_kw = st.meter.power_active_import_kw
+        if st.power_kw is not None:
+            self._update_power_smoothing(st.power_kw, ts)
+
+        if seen & _ENERGY_BIT:
+            st.energy_kwh = st.meter.energy_active_import_kwh
+        if st.energy_kwh is not None:
+            self._update_session_energy(st.energy_kwh, ts)
+
+        history = self.manager.history
+        if history is not None and seen & (_POWER_BIT | _ENERGY_BIT):
+            history.async_add_sample(self.cp_id, ts, st.power_kw, st.energy_kwh)
+        if self.rollups is not None and seen & (_POWER_BIT | _ENERGY_BIT):
+            self.rollups.add(ts, st.power_kw, st.energy_kwh)
+
+        solar = self.manager.solar
+        if solar is not None and seen & _POWER_BIT and self._replay_timer is None:
+            solar.async_on_sample(self)
+
+        st.last_update = when
+        self._notify()
 
-        st.energy_kwh = total_kwh
-        if total_kwh is not None:
-            self._update_session_energy(total_kwh)
+    def update_meter_values_message(self, meter_value: list[dict[str, Any]]) -> None:
+        """Apply a MeterValues message at the time of its newest sample."""
+        timestamp = meter_value[-1].get("timestamp") if meter_value else None
+        self.update_meter_values(meter_value, _parse_charger_time(timestamp))
 
-        st.last_meter_value = meter_value
-        st.last_update = datetime.now(timezone.utc)
+    def _record_stale_samples(
+        self, meter_value: list[dict[str, Any]], when: datetime
+    ) -> None:
+        """Keep meter values of a stale event in the history only."""
+        history = self.manager.history
+        if history is None:
+            return
+        reading = self._stale_reading
+        seen = decode_meter_values(meter_value, reading)
+        if seen & (_POWER_BIT | _ENERGY_BIT):
+            history.async_add_sample(
+                self.cp_id,
+                when.timestamp(),
+                reading.power_active_import_kw,
+                reading.energy_active_import_kwh,
+            )
+
+    def _begin_replay(self) -> None:
+        """Hold back publishing while the charger replays queued events."""
+        if self._replay_timer is None:
+            _LOGGER.info("Charge point %s is replaying offline events.", self.cp_id)
+        else:
+            self._replay_timer.cancel()
+        self._replay_timer = self.hass.loop.call_later(
+            REPLAY_SETTLE_SECONDS, self._async_end_replay
+        )
+
+    def _async_end_replay(self) -> None:
+        if self._replay_timer is None:
+            return
+        self._replay_timer.cancel()
+        self._replay_timer = None
+        self._apply_held_events()
+        _LOGGER.info(
+            "Charge point %s finished replaying offline events (%s).",
+            self.cp_id,
+            self.sequencer.stats,
+        )
         self._notify()
+        # Get the replayed hours into the long-term statistics now
+        statistics = self.manager.statistics
+        if statistics is not None:
+            statistics.async_schedule_import()
 
     def update_transaction_event(
         self,
@@ -143,36 +638,128 @@ class ElecqOcppManager:
         trigger_reason: str | None,
         transaction_info: dict[str, Any] | None,
         meter_value: list[dict[str, Any]] | None,
+        *,
+        seq_no: Optional[int] = None,
+        timestamp: Optional[str] = None,
+        offline: bool = False,
+    ) -> None:
+        """Handle TransactionEvent from charger.
+
+        seq_no and the charger timestamp are used to drop duplicates, to
+        apply replayed (offline) events in seq_no order and to keep them from
+        overwriting newer state. Payloads are snake_case, as the ocpp library
+        hands them to the handler.
+        """
+        when = _parse_charger_time(timestamp)
+
+        if self.raw_payloads is not None:
+            self.raw_payloads.append(
+                {
+                    "timestamp": timestamp,
+                    "event_type": event_type,
+                    "trigger_reason": trigger_reason,
+                    "seq_no": seq_no,
+                    "offline": offline,
+                    "transaction_info": transaction_info,
+                    "meter_value": meter_value,
+                }
+            )
+
+        transaction_id = None
+        if transaction_info:
+            transaction_id = transaction_info.get("transaction_id")
+
+        verdict = self.sequencer.check(
+            transaction_id, seq_no, when.timestamp(), offline
+        )
+        if verdict == DUPLICATE:
+            _LOGGER.debug(
+                "Ignoring duplicate TransactionEvent %s seq_no=%s", event_type, seq_no
+            )
+            return
+
+        if offline:
+            self._begin_replay()
+        elif self._replay_timer is not None:
+            # Live traffic again: this event's publish includes the backlog
+            self._replay_timer.cancel()
+            self._replay_timer = None
+            self._apply_held_events()
+
+        event = (
+            event_type, trigger_reason, transaction_info, meter_value, seq_no, when
+        )
+        if verdict == HELD:
+            _LOGGER.debug(
+                "Holding replayed TransactionEvent %s seq_no=%s until the "
+                "events before it arrive",
+                event_type,
+                seq_no,
+            )
+            self.sequencer.hold(transaction_id, seq_no, event)
+            for held in self.sequencer.release(transaction_id):
+                self._apply_held_event(held)
+            return
+
+        self._apply_transaction_event(verdict, *event)
+
+    def _apply_held_events(self) -> None:
+        for held in self.sequencer.release_all():
+            self._apply_held_event(held)
+
+    def _apply_held_event(self, event: tuple) -> None:
+        when = event[-1]
+        verdict = self.sequencer.check_order(when.timestamp(), offline=True)
+        self._apply_transaction_event(verdict, *event)
+
+    def _apply_transaction_event(
+        self,
+        verdict: str,
+        event_type: str,
+        trigger_reason: str | None,
+        transaction_info: dict[str, Any] | None,
+        meter_value: list[dict[str, Any]] | None,
+        seq_no: Optional[int],
+        when: datetime,
     ) -> None:
-        """Handle TransactionEvent from charger."""
         st = self.state
+        transaction_id = None
+        if transaction_info:
+            transaction_id = transaction_info.get("transaction_id")
+
+        if verdict == STALE:
+            _LOGGER.debug(
+                "TransactionEvent %s seq_no=%s at %s is older than current "
+                "state; recording history only",
+                event_type,
+                seq_no,
+                when,
+            )
+            if meter_value:
+                self._record_stale_samples(meter_value, when)
+            return
 
         st.session_event_type = event_type
         st.session_trigger_reason = trigger_reason
-        st.last_transaction_info = transaction_info
 
         if meter_value:
-            self.update_meter_values(meter_value)
+            self.update_meter_values(meter_value, when)
 
+        stopped_reason = None
         if transaction_info:
-            charging_state = (
-                transaction_info.get("charging_state")
-                or transaction_info.get("chargingState")
-            )
-            transaction_id = (
-                transaction_info.get("transaction_id")
-                or transaction_info.get("transactionId")
-            )
-            stopped_reason = (
-                transaction_info.get("stopped_reason")
-                or transaction_info.get("stoppedReason")
-            )
+            charging_state = transaction_info.get("charging_state")
+            stopped_reason = transaction_info.get("stopped_reason")
+            if stopped_reason is not None:
+                st.last_stopped_reason = stopped_reason
 
             if stopped_reason == "EVDisconnected":
                 _LOGGER.info(
                     "EV disconnected (stoppedReason=EVDisconnected). "
                     "Marking unplugged and clearing session."
                 )
+                self._record_session_end(
+                    st.transaction_id or transaction_id, stopped_reason, when
+                )
                 st.plugged_in = False
                 st.charging = False
                 st.transaction_id = None
@@ -180,7 +767,7 @@ class ElecqOcppManager:
                 st.remote_stop_requested = False
                 st.session_start = None
                 st.session_start_meter_kwh = None
-                st.last_update = datetime.now(timezone.utc)
+                st.last_update = when
                 self._notify()
                 return
 
@@ -202,44 +789,66 @@ class ElecqOcppManager:
                 st.charging = False
 
         if event_type == "Started":
-            st.session_start = datetime.now(timezone.utc)
+            st.session_start = when
             st.session_start_meter_kwh = st.energy_kwh
             st.session_energy_kwh = 0.0
+            st.session_cost = 0.0 if self.manager.tariff is not None else None
+            st.session_average_price = None
+            st.session_cost_ts = when.timestamp()
+            st.session_cost_meter_kwh = st.energy_kwh
             st.remote_stop_requested = False
         elif event_type in ("Ended", "Stopped"):
+            self._record_session_end(st.transaction_id, stopped_reason, when)
             st.session_start = None
             st.session_start_meter_kwh = None
             st.remote_stop_requested = False
             st.charging = False
 
-        st.last_update = datetime.now(timezone.utc)
+        st.last_update = when
         self._notify()
 
     @property
     def is_available(self) -> bool:
-        return self._cp is not None
+        return self.cp is not None
 
-    async def async_request_start(self) -> bool:
-        if self._cp is None:
-            _LOGGER.warning("Cannot start transaction: no charger connected.")
-            return False
+    async def async_export_capture(self) -> tuple[str, int]:
+        """Write the captured frames to this station's capture file.
 
-        request = call.RequestStartTransaction(
-            evse_id=self.evse_id,
-            id_token={"idToken": self.id_token, "type": "Local"},
-            remote_start_id=int(datetime.now().timestamp()),
+        The previous files are rotated. Returns the path and the number of
+        frames written.
+        """
+        if self.capture is None:
+            raise HomeAssistantError(
+                f"Traffic capture is not enabled for charger {self.cp_id}"
+            )
+        path = self.hass.config.path(CAPTURE_DIR, f"{slugify(self.cp_id)}.jsonl")
+        frames = self.capture.snapshot()
+        count = await self.hass.async_add_executor_job(
+            write_capture, path, self.cp_id, frames
         )
-        _LOGGER.info("Sending RequestStartTransaction: %s", request)
-        try:
-            response = await self._cp.call(request)
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.exception("Error sending RequestStartTransaction: %s", err)
-            return False
+        return path, count
 
-        _LOGGER.info("RequestStartTransaction response: %s", response)
-        ok = (
-            getattr(response, "status", None)
-            == RequestStartStopStatusEnumType.accepted
+    def _connected_cp(self) -> ElecqChargePoint:
+        """The live charge point, resolved when a queued command is sent."""
+        if self.cp is None:
+            raise ElecqCommandError(f"Charger {self.cp_id} is not connected")
+        return self.cp
+
+    def _record_timeout(self, action: str) -> None:
+        self.metrics.action(action).timeouts += 1
+
+    async def async_request_start(self) -> bool:
+        """Ask the charger to start a session; False if it refused.
+
+        Raises ElecqCommandError when the charger is not connected or did not
+        answer.
+        """
+        evse_id, id_token = self.manager.evse_id, self.manager.id_token
+        ok = await self.commands.async_run(
+            "RequestStartTransaction",
+            lambda: self._connected_cp().async_request_start_transaction(
+                evse_id, id_token
+            ),
         )
         if ok:
             self.state.remote_stop_requested = False
@@ -247,25 +856,21 @@ class ElecqOcppManager:
         return ok
 
     async def async_request_stop(self) -> bool:
-        st = self.state
-        if self._cp is None or not st.transaction_id:
-            _LOGGER.warning(
-                "Cannot stop transaction: no active transaction_id or CP."
-            )
-            return False
+        """Ask the charger to stop the running session; False if it refused.
 
-        request = call.RequestStopTransaction(transaction_id=st.transaction_id)
-        _LOGGER.info("Sending RequestStopTransaction: %s", request)
-        try:
-            response = await self._cp.call(request)
-        except Exception as err:  # noqa: BLE001
-            _LOGGER.exception("Error sending RequestStopTransaction: %s", err)
-            return False
-
-        _LOGGER.info("RequestStopTransaction response: %s", response)
-        ok = (
-            getattr(response, "status", None)
-            == RequestStartStopStatusEnumType.accepted
+        Raises ElecqCommandError when there is no session, the charger is not
+        connected or did not answer.
+        """
+        st = self.state
+        transaction_id = st.transaction_id
+        if not transaction_id:
+            raise ElecqCommandError(f"Charger {self.cp_id} has no active session")
+
+        ok = await self.commands.async_run(
+            "RequestStopTransaction",
+            lambda: self._connected_cp().async_request_stop_transaction(
+                transaction_id
+            ),
         )
         if ok:
             st.remote_stop_requested = True
@@ -273,172 +878,260 @@ class ElecqOcppManager:
             self._notify()
         return ok
 
-    async def async_request_refresh(self) -> None:
-        """Ask the charger to send a fresh StatusNotification via TriggerMessage."""
-        if self._cp is None:
-            _LOGGER.debug(
-                "Refresh request skipped: no charge point connected yet."
-            )
-            return
+    async def async_set_current_limit(
+        self, source: str, limit_a: Optional[float]
+    ) -> bool:
+        """Set (None: clear) the current cap requested by source.
+
+        The load balancer and the solar controller each keep their own cap;
+        the charger gets the lowest one (0 pauses charging). With no cap left
+        the profile is cleared, so the charger is back to its own limits.
+        Returns False when the charger did not take it; errors are logged,
+        not raised.
+        """
+        if limit_a is None:
+            self._current_limits.pop(source, None)
+        else:
+            self._current_limits[source] = limit_a
+        if self.cp is None:
+            return False
 
+        # inf: no cap, the profile is cleared
+        limit = min(self._current_limits.values(), default=math.inf)
+        if limit == self._sent_limit:
+            return True
+        action = "ClearChargingProfile" if limit == math.inf else "SetChargingProfile"
+        evse_id = self.manager.evse_id
         try:
-            # NOTE: do NOT pass evse_id here; this ocpp version doesn't accept it
-            req = call.TriggerMessage(
-                requested_message=MessageTriggerEnumType.status_notification,
+            ok = await self.commands.async_run(
+                action,
+                lambda: (
+                    self._connected_cp().async_clear_charging_limit()
+                    if limit == math.inf
+                    else self._connected_cp().async_set_charging_limit(evse_id, limit)
+                ),
+                key=(action, limit),
             )
-            _LOGGER.info(
-                "Sending TriggerMessage(StatusNotification) to Elecq for manual refresh: %s",
-                req,
-            )
-            resp = await self._cp.call(req)
-            _LOGGER.info(
-                "TriggerMessage(StatusNotification) response from Elecq: %s", resp
-            )
-        except Exception:  # noqa: BLE001
-            _LOGGER.exception("Error sending TriggerMessage(StatusNotification)")
-
-    async def async_start_server(self) -> None:
-        async def _on_connect(websocket):
-            req = getattr(websocket, "request", None)
-            if websocket.subprotocol != "ocpp2.0.1":
-                _LOGGER.warning(
-                    "Client did not negotiate ocpp2.0.1 (got %s) - closing.",
-                    websocket.subprotocol,
-                )
-                await websocket.close()
-                return
-
-            path = req.path if req is not None else "/"
-            cp_id = path.strip("/") or "unknown"
-            _LOGGER.info("Elecq OCPP: new connection id=%s path=%s", cp_id, path)
-
-            cp = ElecqChargePoint(cp_id, websocket, self)
-            self._cp = cp
-
-            try:
-                await cp.start()
-            except ConnectionClosed:
-                _LOGGER.info("Elecq OCPP: connection closed for %s", cp_id)
-            finally:
-                st = self.state
-                st.charging = False
-                st.plugged_in = False
-                st.transaction_id = None
-                st.last_charging_state = None
-                st.last_status = "Disconnected"
-                st.remote_stop_requested = False
-                st.last_update = datetime.now(timezone.utc)
-                self._notify()
+        except ElecqCommandError as err:
+            _LOGGER.warning("Error sending %s: %s", action, err)
+            return False
+        if ok:
+            self._sent_limit = limit
+        return ok
 
-        self._server = await websockets.serve(
-            _on_connect,
-            host="0.0.0.0",
-            port=self.port,
-            subprotocols=["ocpp2.0.1"],
+    async def async_get_variables(
+        self, component: str, variables: tuple[str, ...]
+    ) -> dict[str, Optional[str]]:
+        """Read device model variables; raises ElecqCommandError on failure."""
+        return await self.commands.async_run(
+            "GetVariables",
+            lambda: self._connected_cp().async_get_variables(component, variables),
+            key=("GetVariables", component, variables),
         )
-        _LOGGER.info(
-            "Elecq OCPP 2.0.1 server listening on 0.0.0.0:%s",
-            self.port,
-        )
-
-    async def async_stop_server(self) -> None:
-        if self._server is not None:
-            self._server.close()
-            await self._server.wait_closed()
-            self._server = None
-            _LOGGER.info("Elecq OCPP server stopped.")
-
-
-class ElecqChargePoint(OcppChargePointBase):
-    """OCPP 2.0.1 ChargePoint handlers."""
-
-    def __init__(self, cp_id: str, websocket, manager: ElecqOcppManager) -> None:
-        super().__init__(cp_id, websocket)
-        self._manager = manager
 
-    @on("BootNotification")
-    async def on_boot(self, charging_station, reason, **kwargs):
-        _LOGGER.info(
-            "BootNotification: model=%s, vendor=%s, reason=%s",
-            charging_station.get("model"),
-            charging_station.get("vendor_name")
-            or charging_station.get("vendorName"),
-            reason,
+    async def async_set_variable(
+        self, component: str, variable: str, value: str
+    ) -> Optional[str]:
+        """Set a device model variable and return the charger's status."""
+        return await self.commands.async_run(
+            "SetVariables",
+            lambda: self._connected_cp().async_set_variable(
+                component, variable, value
+            ),
+            key=("SetVariables", component, variable, value),
         )
 
-        return call_result.BootNotification(
-            current_time=datetime.now(timezone.utc).isoformat(),
-            interval=60,
-            status=RegistrationStatusEnumType.accepted,
+    async def async_request_refresh(self) -> None:
+        """Ask the charger to send a fresh StatusNotification via TriggerMessage.
+
+        Concurrent refreshes share one TriggerMessage.
+        """
+        await self.commands.async_run(
+            "TriggerMessage",
+            lambda: self._connected_cp().async_trigger_status_notification(),
+            key=("TriggerMessage", "StatusNotification"),
         )
 
-    @on("Heartbeat")
-    async def on_heartbeat(self, **kwargs):
-        return call_result.Heartbeat(
-            current_time=datetime.now(timezone.utc).isoformat(),
-        )
 
-    @on("StatusNotification")
-    async def on_status(
+class ElecqOcppManager:
+    """Manager running OCPP server & keeping a registry of charge points."""
+
+    def __init__(
         self,
-        timestamp,
-        evse_id,
-        connector_id,
-        connector_status,
-        **kwargs,
-    ):
-        st = self._manager.state
-        status_upper = (connector_status or "").upper()
-        st.last_status = connector_status
-
-        if status_upper in ("AVAILABLE", "FAULTED"):
-            st.plugged_in = False
-        else:
-            st.plugged_in = True
+        hass: HomeAssistant,
+        entry_id: str,
+        port: int,
+        id_token: str,
+        evse_id: int,
+        connector_id: int,
+        history: Optional[ElecqHistoryStore] = None,
+        publish_interval: float = DEFAULT_PUBLISH_INTERVAL,
+        smoothing_filter: str = DEFAULT_SMOOTHING_FILTER,
+        smoothing_window: float = DEFAULT_SMOOTHING_WINDOW,
+        instrumentation: bool = False,
+        skip_schema_validation: bool = False,
+        max_commands_in_flight: int = DEFAULT_MAX_COMMANDS_IN_FLIGHT,
+        sampling_policy: Optional[SamplingPolicy] = None,
+        raw_payloads: int = 0,
+        capture_frames: int = 0,
+        charge_point_ids: frozenset[str] = frozenset(),
+        power_rollups: bool = True,
+        tariff: Optional[TariffSchedule] = None,
+    ) -> None:
+        self.hass = hass
+        self.entry_id = entry_id
+        self.port = port
+        # Ids this entry serves on its port; empty: any id no other entry lists
+        self.charge_point_ids = charge_point_ids
+        self.id_token = id_token
+        self.evse_id = evse_id
+        self.connector_id = connector_id
+        # Optional on-disk history of sessions and meter samples
+        self.history = history
+        # Minimum seconds between two publishes of a measurement group
+        self.publish_interval = publish_interval
+        # Filter type and window (seconds) behind power_kw_smoothed
+        self.smoothing_filter = smoothing_filter
+        self.smoothing_window = smoothing_window
+        self.instrumentation = instrumentation
+        # Trusted LAN: skip JSON schema validation of high-rate messages
+        self.skip_schema_validation = skip_schema_validation
+        # Commands per station talking to the charger at the same time
+        self.max_commands_in_flight = max_commands_in_flight
+        # Meter sampling intervals to negotiate, None to leave chargers alone
+        self.sampling_policy = sampling_policy
+        # Raw TransactionEvent payloads kept per station for debugging
+        self.raw_payloads = raw_payloads
+        # Raw frames per station kept by the traffic capture (0: off)
+        self.capture_frames = capture_frames
+        # In-memory power/energy rollups per station for dashboards
+        self.power_rollups = power_rollups
+        # Time-of-use prices behind the session cost, None to not track it
+        self.tariff = tariff
+
+        # Site load balancer, set up by the entry when a limit is configured
+        self.balancer: Optional[ElecqLoadBalancer] = None
+        # Solar surplus controller, set up when a surplus sensor is configured
+        self.solar: Optional[ElecqSolarController] = None
+        # Entities from before one entry served several chargers are moved
+        # to the first station registered (see migration.py)
+        self.adopt_legacy_entities = False
+        # Long-term statistics import of the history, set up by the entry
+        self.statistics: Optional[ElecqStatisticsImporter] = None
+        # Snapshot of the station states across restarts, set up by the entry
+        self.state_store: Optional[ElecqStateStore] = None
+
+        # Shared server of this port and the websockets it routed to us
+        self._listener: Optional[ElecqOcppListener] = None
+        self._connections: set[Any] = set()
+        self._start_task: Optional[asyncio.Task] = None
+
+        # The charge_point module (ocpp + websockets), loaded on first start
+        self._ocpp: Optional[ModuleType] = None
+
+        # Registry of charge points keyed by the id from the URL path
+        self._stations: dict[str, ElecqStation] = {}
+
+        self.dispatch_stats = DispatchStats()
 
-        if st.last_charging_state in ("Charging", "EVConnected"):
-            st.charging = not st.remote_stop_requested
-        elif st.last_charging_state in ("Idle", "Finished", "SuspendedEV", "SuspendedEVSE"):
-            st.charging = False
-        else:
-            st.charging = (
-                status_upper == "CHARGING"
-                and not st.remote_stop_requested
+    @property
+    def stations(self) -> list[ElecqStation]:
+        return list(self._stations.values())
+
+    def get_station(self, cp_id: str) -> Optional[ElecqStation]:
+        return self._stations.get(cp_id)
+
+    def async_get_or_create_station(self, cp_id: str) -> ElecqStation:
+        """Return the station for cp_id, registering it on first sight."""
+        station = self._stations.get(cp_id)
+        if station is None:
+            station = ElecqStation(self, cp_id)
+            self._stations[cp_id] = station
+            if self.adopt_legacy_entities:
+                self.adopt_legacy_entities = False
+                async_adopt_legacy_entities(self.hass, self.entry_id, cp_id)
+            _LOGGER.info("Elecq OCPP: registered charge point %s", cp_id)
+            async_dispatcher_send(
+                self.hass, SIGNAL_STATION_ADDED.format(self.entry_id), station
+            )
+        return station
+
+    @callback
+    def async_start(self) -> None:
+        """Start the server in the background so entry setup never waits."""
+        self._start_task = self.hass.async_create_task(self.async_start_server())
+
+    async def async_load_ocpp(self) -> ModuleType:
+        """Import the OCPP stack off the event loop, once."""
+        if self._ocpp is None:
+            self._ocpp = await self.hass.async_add_executor_job(
+                importlib.import_module, f"{__package__}.charge_point"
             )
+        return self._ocpp
 
-        st.last_update = datetime.now(timezone.utc)
-        self._manager._notify()
+    async def async_start_server(self) -> None:
+        if self.history is not None:
+            await self.history.async_setup()
+            if self.statistics is not None:
+                await self.statistics.async_setup()
+        ocpp = await self.async_load_ocpp()
+        self._listener = async_get_listener(self.hass, self.port)
+        await self._listener.async_attach(self, ocpp)
+
+    async def async_handle_connection(self, websocket, cp_id: str) -> None:
+        """Serve one charger connection routed here by the listener."""
+        ocpp = self._ocpp
+        if websocket.subprotocol != "ocpp2.0.1":
+            _LOGGER.warning(
+                "Client did not negotiate ocpp2.0.1 (got %s) - closing.",
+                websocket.subprotocol,
+            )
+            await websocket.close()
+            return
 
-        return call_result.StatusNotification()
+        _LOGGER.info("Elecq OCPP: new connection id=%s port=%s", cp_id, self.port)
 
-    @on("TransactionEvent")
-    async def on_transaction_event(
-        self,
-        event_type,
-        timestamp,
-        trigger_reason,
-        seq_no,
-        transaction_info,
-        evse=None,
-        id_token=None,
-        meter_value=None,
-        **kwargs,
-    ):
-        _LOGGER.debug(
-            "TransactionEvent: event_type=%s trigger_reason=%s seq_no=%s "
-            "transaction_info=%s meter_value=%s",
-            event_type,
-            trigger_reason,
-            seq_no,
-            transaction_info,
-            meter_value,
-        )
+        station = self.async_get_or_create_station(cp_id)
+        cp = ocpp.ElecqChargePoint(cp_id, websocket, station)
+        station.cp = cp
+        self._connections.add(websocket)
+        if station.metrics is not None:
+            station.metrics.connections += 1
+        station.async_on_connect()
+        station._notify()
 
-        self._manager.update_transaction_event(
-            event_type=event_type,
-            trigger_reason=trigger_reason,
-            transaction_info=transaction_info,
-            meter_value=meter_value,
-        )
+        try:
+            await cp.start()
+        except ocpp.ConnectionClosed:
+            _LOGGER.info("Elecq OCPP: connection closed for %s", cp_id)
+        finally:
+            self._connections.discard(websocket)
+            # A reconnect may already have replaced this charge point; the
+            # old socket closing late must not touch the new connection
+            if station.cp is cp:
+                station.cp = None
+                station._sent_limit = None
+                station.async_mark_disconnected()
 
-        return call_result.TransactionEvent()
+    async def async_stop_server(self) -> None:
+        if self._start_task is not None and not self._start_task.done():
+            self._start_task.cancel()
+        self._start_task = None
+        if self.state_store is not None:
+            # Before our connections close and reset the state
+            await self.state_store.async_close()
+        if self._listener is not None:
+            await self._listener.async_detach(self)
+            self._listener = None
+        # The listener may keep serving other entries: close our chargers
+        if self._connections:
+            await asyncio.gather(
+                *(ws.close() for ws in list(self._connections)),
+                return_exceptions=True,
+            )
+        for station in self._stations.values():
+            station.async_shutdown()
+        if self.statistics is not None:
+            await self.statistics.async_close()
+        if self.history is not None:
+            await self.history.async_close()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Optional
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+)
+from homeassistant.const import UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .history import ElecqHistoryStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Hours handed to the recorder per call
+IMPORT_BATCH_HOURS = 500
+
+# Minute past every hour at which the previous hour is imported
+IMPORT_MINUTE = 12
+
+HOUR = 3600
+
+
+def energy_statistic_id(cp_id: str) -> str:
+    return f"{DOMAIN}:{slugify(cp_id)}_energy"
+
+
+def power_statistic_id(cp_id: str) -> str:
+    return f"{DOMAIN}:{slugify(cp_id)}_power"
+
+
+class ElecqStatisticsImporter:
+    """Turn the sample history into hourly long-term statistics.
+
+    Live state writes only cover what arrives while Home Assistant is
+    running and the charger is online. This imports every complete hour of
+    the history store as external statistics (one energy sum and one power
+    mean/min/max per station) in batches, with the hours the samples were
+    taken in. Hours that receive late samples (offline replay, recovered
+    events) are imported again, which overwrites them.
+
+    The energy sum is the meter reading minus the first reading ever
+    imported (kept in the history database), so any hour can be recomputed
+    on its own.
+    """
+
+    def __init__(self, hass: HomeAssistant, history: ElecqHistoryStore) -> None:
+        self.hass = hass
+        self.history = history
+        # station -> (baseline_kwh, imported_until)
+        self._state: dict[str, tuple[Optional[float], float]] = {}
+        # station -> earliest sample time not yet imported (-inf: all)
+        self._dirty: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._unsub = None
+        self._closed = False
+
+        self.runs = 0
+        self.hours_imported = 0
+
+    async def async_setup(self) -> None:
+        self._state = await self.history.async_get_import_state()
+        for station in await self.history.async_get_stations():
+            if station not in self._state:
+                # History from before the import existed: backfill it
+                self._dirty[station] = -math.inf
+        self._unsub = async_track_time_change(
+            self.hass, self._async_tick, minute=IMPORT_MINUTE, second=0
+        )
+        self.async_schedule_import()
+
+    async def async_close(self) -> None:
+        """Stop importing and wait for a running import (before history closes)."""
+        self._closed = True
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        async with self._lock:
+            pass
+
+    @callback
+    def async_schedule_import(self) -> None:
+        if not self._closed:
+            self.hass.async_create_task(self.async_import())
+
+    async def _async_tick(self, _now) -> None:
+        await self.async_import()
+
+    async def async_import(self) -> None:
+        """Import every complete hour that is new or received late samples."""
+        async with self._lock:
+            if self._closed:
+                return
+            self.runs += 1
+            await self.history.async_flush()
+            dirty = self._dirty
+            for station, ts in self.history.async_take_changes().items():
+                if ts < dirty.get(station, math.inf):
+                    dirty[station] = ts
+
+            end = math.floor(time.time() / HOUR) * HOUR
+            for station in {*self._state, *dirty}:
+                await self._async_import_station(station, end)
+
+    async def _async_import_station(self, station: str, end: float) -> None:
+        baseline, imported_until = self._state.get(station, (None, None))
+        start = self._dirty.get(station, math.inf)
+        if imported_until is not None:
+            start = min(start, imported_until)
+        if start == -math.inf:
+            start = await self.history.async_get_first_sample_time(station)
+            if start is None:
+                self._dirty.pop(station, None)
+                return
+        start = math.floor(start / HOUR) * HOUR
+        if start >= end:
+            # Only the current, incomplete hour changed
+            return
+
+        rows = await self.history.async_get_hourly(station, start, end)
+        if baseline is None:
+            baseline = next(
+                (r["energy_min"] for r in rows if r["energy_min"] is not None),
+                None,
+            )
+        self._add_statistics(station, rows, baseline)
+
+        self._dirty.pop(station, None)
+        imported_until = max(end, imported_until or end)
+        self._state[station] = (baseline, imported_until)
+        await self.history.async_set_import_state(station, baseline, imported_until)
+
+    def _add_statistics(
+        self, cp_id: str, rows: list[dict[str, Any]], baseline: Optional[float]
+    ) -> None:
+        energy: list[StatisticData] = []
+        power: list[StatisticData] = []
+        for row in rows:
+            start = dt_util.utc_from_timestamp(row["hour"])
+            if row["energy_max"] is not None and baseline is not None:
+                energy.append(
+                    StatisticData(
+                        start=start,
+                        state=row["energy_max"],
+                        sum=row["energy_max"] - baseline,
+                    )
+                )
+            if row["power_mean"] is not None:
+                power.append(
+                    StatisticData(
+                        start=start,
+                        mean=row["power_mean"],
+                        min=row["power_min"],
+                        max=row["power_max"],
+                    )
+                )
+        self.hours_imported += len(rows)
+
+        energy_meta = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"Elecq {cp_id} energy",
+            source=DOMAIN,
+            statistic_id=energy_statistic_id(cp_id),
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        power_meta = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"Elecq {cp_id} power",
+            source=DOMAIN,
+            statistic_id=power_statistic_id(cp_id),
+            unit_of_measurement=UnitOfPower.KILO_WATT,
+        )
+        for meta, stats in ((energy_meta, energy), (power_meta, power)):
+            for i in range(0, len(stats), IMPORT_BATCH_HOURS):
+                async_add_external_statistics(
+                    self.hass, meta, stats[i : i + IMPORT_BATCH_HOURS]
+                )
+        if rows:
+            _LOGGER.debug(
+                "Imported %d hours of statistics for %s", len(rows), cp_id
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "hours_imported": self.hours_imported,
+            "stations": {
+                station: {"baseline_kwh": baseline, "imported_until": until}
+                for station, (baseline, until) in self._state.items()
+            },
+        }
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any, Optional
+
+# name -> (bucket length in seconds, 0 for raw samples; buckets kept)
+#   raw   last 360 samples
+#   10s   1 hour
+#   1m    24 hours
+#   15m   7 days
+RESOLUTIONS: dict[str, tuple[int, int]] = {
+    "raw": (0, 360),
+    "10s": (10, 360),
+    "1m": (60, 1440),
+    "15m": (900, 672),
+}
+
+# Bytes per stored point: time and energy as doubles (an energy register
+# needs more digits than a float holds), mean and max power as floats.
+# 2832 points, i.e. about 66 KiB per station once it reported.
+POINT_BYTES = 2 * 8 + 2 * 4
+
+_NAN = float("nan")
+
+
+class _PointRing:
+    """Fixed-size ring of (time, power, max power, energy) points.
+
+    Array backed, so a full ring costs the same as an empty one. Missing
+    values are stored as NaN.
+    """
+
+    __slots__ = ("capacity", "times", "power", "power_max", "energy", "head", "size")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.power = array("f", bytes(4 * capacity))
+        self.power_max = array("f", bytes(4 * capacity))
+        self.energy = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.size = 0
+
+    def push(self, t: float, power: float, power_max: float, energy: float) -> None:
+        if self.size < self.capacity:
+            slot = (self.head + self.size) % self.capacity
+            self.size += 1
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % self.capacity
+        self.times[slot] = t
+        self.power[slot] = power
+        self.power_max[slot] = power_max
+        self.energy[slot] = energy
+
+    def slots(self):
+        """Slot indexes, oldest first."""
+        capacity, head = self.capacity, self.head
+        return ((head + n) % capacity for n in range(self.size))
+
+
+class _Bucket:
+    """The bucket of one resolution still being filled."""
+
+    __slots__ = ("start", "count", "power_sum", "power_count", "power_max", "energy")
+
+    def __init__(self) -> None:
+        self.start: Optional[float] = None
+        self.clear()
+
+    def clear(self) -> None:
+        self.count = 0
+        self.power_sum = 0.0
+        self.power_count = 0
+        self.power_max = _NAN
+        self.energy = _NAN
+
+    def add(self, power: Optional[float], energy: Optional[float]) -> None:
+        self.count += 1
+        if power is not None:
+            self.power_sum += power
+            self.power_count += 1
+            if not power <= self.power_max:  # also replaces NaN
+                self.power_max = power
+        if energy is not None:
+            self.energy = energy
+
+    def point(self) -> tuple[float, float, float, float]:
+        mean = self.power_sum / self.power_count if self.power_count else _NAN
+        return self.start, mean, self.power_max, self.energy
+
+
+def _value(x: float) -> Optional[float]:
+    return None if math.isnan(x) else round(x, 4)
+
+
+class PowerRollups:
+    """Power and energy of one station at several resolutions, in memory.
+
+    Every sample goes into the raw ring and into the current bucket of each
+    coarser resolution; a bucket is pushed to its ring when a sample of a
+    later bucket arrives. Buckets hold the mean and max power and the last
+    energy reading. Samples older than the newest one (offline replays) only
+    reach the history database.
+
+    The rings are allocated on the first sample and never grow: memory per
+    station is fixed by RESOLUTIONS (see POINT_BYTES).
+    """
+
+    __slots__ = ("_rings", "_buckets", "_last_ts")
+
+    def __init__(self) -> None:
+        self._rings: Optional[dict[str, _PointRing]] = None
+        self._buckets: dict[str, _Bucket] = {}
+        self._last_ts = -math.inf
+
+    @staticmethod
+    def memory_bytes() -> int:
+        """Bytes held by the rings of one station."""
+        return POINT_BYTES * sum(capacity for _, capacity in RESOLUTIONS.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        rings = self._rings
+        return {
+            "bytes": self.memory_bytes() if rings is not None else 0,
+            "points": {
+                name: ring.size for name, ring in (rings or {}).items()
+            },
+        }
+
+    def add(
+        self, ts: float, power_kw: Optional[float], energy_kwh: Optional[float]
+    ) -> None:
+        if ts < self._last_ts:
+            return
+        self._last_ts = ts
+        rings = self._rings
+        if rings is None:
+            rings = self._rings = {
+                name: _PointRing(capacity)
+                for name, (_, capacity) in RESOLUTIONS.items()
+            }
+            self._buckets = {
+                name: _Bucket() for name, (length, _) in RESOLUTIONS.items() if length
+            }
+
+        power = _NAN if power_kw is None else power_kw
+        energy = _NAN if energy_kwh is None else energy_kwh
+        rings["raw"].push(ts, power, power, energy)
+
+        for name, bucket in self._buckets.items():
+            length = RESOLUTIONS[name][0]
+            start = ts - ts % length
+            if start != bucket.start:
+                if bucket.count:
+                    rings[name].push(*bucket.point())
+                    bucket.clear()
+                bucket.start = start
+            bucket.add(power_kw, energy_kwh)
+
+    def points(
+        self, resolution: str, since: Optional[float] = None
+    ) -> dict[str, list[Any]]:
+        """Columns of the points at a resolution, oldest first.
+
+        The bucket being filled is included as the last point. `since`
+        drops points that start before it.
+        """
+        columns: dict[str, list[Any]] = {
+            "time": [],
+            "power_kw": [],
+            "power_max_kw": [],
+            "energy_kwh": [],
+        }
+        if self._rings is None:
+            return columns
+        ring = self._rings[resolution]
+        rows = [
+            (ring.times[i], ring.power[i], ring.power_max[i], ring.energy[i])
+            for i in ring.slots()
+        ]
+        bucket = self._buckets.get(resolution)
+        if bucket is not None and bucket.count:
+            rows.append(bucket.point())
+        for t, power, power_max, energy in rows:
+            if since is not None and t < since:
+                continue
+            columns["time"].append(t)
+            columns["power_kw"].append(_value(power))
+            columns["power_max_kw"].append(_value(power_max))
+            columns["energy_kwh"].append(_value(energy))
+        return columns
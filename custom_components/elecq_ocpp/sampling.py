@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+from homeassistant.core import callback
+
+from .commands import ElecqCommandError
+
+if TYPE_CHECKING:
+    from .ocpp_server import ElecqStation
+
+_LOGGER = logging.getLogger(__name__)
+
+# OCPP 2.0.1 device model variables behind TransactionEvent(Updated)
+SAMPLED_DATA_CTRLR = "SampledDataCtrlr"
+TX_UPDATED_INTERVAL = "TxUpdatedInterval"
+TX_UPDATED_MEASURANDS = "TxUpdatedMeasurands"
+
+# Seconds before trying again after a command failed, doubled for every
+# further failure up to the maximum; a boot starts over
+RETRY_DELAY = 60.0
+MAX_RETRY_DELAY = 3600.0
+
+
+@dataclass(frozen=True)
+class SamplingPolicy:
+    """How often, and what, a station samples during a transaction."""
+
+    # Seconds between TransactionEvent(Updated) while charging / otherwise
+    charging_interval: int
+    idle_interval: int
+    # Measurands to sample; empty leaves the charger's list alone
+    measurands: tuple[str, ...] = ()
+
+
+class AdaptiveSampling:
+    """Keep a station's TxUpdatedInterval in line with its charging state.
+
+    After BootNotification the current settings are read with GetVariables
+    and the measurand list and interval are set with SetVariables. From then
+    on every charging/not charging transition switches the interval, so the
+    charger sends few meter values while idle or suspended. A charger that
+    rejects the variables is left alone; one that does not answer is asked
+    again after RETRY_DELAY, backing off, instead of on every state change.
+    """
+
+    def __init__(self, station: ElecqStation, policy: SamplingPolicy) -> None:
+        self.station = station
+        self.policy = policy
+        # Values read from the charger after boot
+        self.reported: dict[str, Optional[str]] = {}
+        # Interval the charger accepted last, None when unknown
+        self.applied_interval: Optional[int] = None
+        self.supported = True
+        self._wanted: Optional[int] = None
+        self._busy = False
+        # Loop time before which nothing is sent after a failure
+        self._retry_at = 0.0
+        self._retry_delay = RETRY_DELAY
+
+    def _target(self) -> int:
+        policy = self.policy
+        if self.station.state.charging:
+            return policy.charging_interval
+        return policy.idle_interval
+
+    @callback
+    def async_on_boot(self) -> None:
+        """The charger (re)booted and was accepted; configure it from scratch."""
+        self.applied_interval = None
+        self.supported = True
+        self._retry_at = 0.0
+        self._retry_delay = RETRY_DELAY
+        self.station.hass.async_create_task(self._async_configure())
+
+    def _failed(self) -> None:
+        self._retry_at = self.station.hass.loop.time() + self._retry_delay
+        self._retry_delay = min(self._retry_delay * 2, MAX_RETRY_DELAY)
+
+    @callback
+    def async_update(self) -> None:
+        """Called on every state change; O(1) unless the target moved."""
+        if not self.supported or self.station.cp is None:
+            return
+        target = self._target()
+        if target == self.applied_interval or target == self._wanted:
+            return
+        if self._retry_at and self.station.hass.loop.time() < self._retry_at:
+            return
+        self._wanted = target
+        if not self._busy:
+            self.station.hass.async_create_task(self._async_apply())
+
+    async def _async_configure(self) -> None:
+        self._busy = True
+        try:
+            self.reported = await self.station.async_get_variables(
+                SAMPLED_DATA_CTRLR, (TX_UPDATED_INTERVAL, TX_UPDATED_MEASURANDS)
+            )
+            measurands = ",".join(self.policy.measurands)
+            if measurands and self.reported.get(TX_UPDATED_MEASURANDS) != measurands:
+                status = await self.station.async_set_variable(
+                    SAMPLED_DATA_CTRLR, TX_UPDATED_MEASURANDS, measurands
+                )
+                if status != "Accepted":
+                    _LOGGER.warning(
+                        "Charger %s did not accept %s=%s (%s)",
+                        self.station.cp_id,
+                        TX_UPDATED_MEASURANDS,
+                        measurands,
+                        status,
+                    )
+            interval = self.reported.get(TX_UPDATED_INTERVAL)
+            if interval is not None and interval.isdigit():
+                self.applied_interval = int(interval)
+        except ElecqCommandError as err:
+            _LOGGER.warning(
+                "Could not read sampling settings of %s: %s", self.station.cp_id, err
+            )
+            self._failed()
+        finally:
+            self._busy = False
+        self._wanted = None
+        self.async_update()
+
+    async def _async_apply(self) -> None:
+        self._busy = True
+        try:
+            while self._wanted is not None and self._wanted != self.applied_interval:
+                interval = self._wanted
+                status = await self.station.async_set_variable(
+                    SAMPLED_DATA_CTRLR, TX_UPDATED_INTERVAL, str(interval)
+                )
+                if status in ("Accepted", "RebootRequired"):
+                    self.applied_interval = interval
+                    continue
+                _LOGGER.warning(
+                    "Charger %s did not accept %s=%s (%s); leaving it as is",
+                    self.station.cp_id,
+                    TX_UPDATED_INTERVAL,
+                    interval,
+                    status,
+                )
+                self.supported = False
+                break
+        except ElecqCommandError as err:
+            # Tried again on a state change once the retry delay is over
+            _LOGGER.warning(
+                "Could not set sampling interval of %s: %s", self.station.cp_id, err
+            )
+            self._failed()
+        else:
+            self._retry_at = 0.0
+            self._retry_delay = RETRY_DELAY
+        finally:
+            self._busy = False
+            self._wanted = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "charging_interval": self.policy.charging_interval,
+            "idle_interval": self.policy.idle_interval,
+            "measurands": list(self.policy.measurands),
+            "reported": self.reported,
+            "applied_interval": self.applied_interval,
+            "supported": self.supported,
+        }
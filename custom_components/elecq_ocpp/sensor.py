@@ -1,19 +1,89 @@
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.const import (
+    EntityCategory,
+    PERCENTAGE,
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfFrequency,
     UnitOfPower,
     UnitOfEnergy,
+    UnitOfTime,
 )
 from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 
-from .const import DOMAIN, SIGNAL_STATE_UPDATED
-from .ocpp_server import ElecqOcppManager
+from .const import (
+    DOMAIN,
+    SIGNAL_STATION_ADDED,
+    GROUP_POWER,
+    GROUP_POWER_SMOOTHED,
+    GROUP_ENERGY,
+    GROUP_SESSION_ENERGY,
+    GROUP_SESSION_COST,
+    GROUP_STATUS,
+    GROUP_CHARGING_STATE,
+)
+from .ocpp_server import ElecqOcppManager, ElecqStation
+
+
+def _meter(
+    key: str,
+    name: str,
+    unit: str | None,
+    device_class: SensorDeviceClass,
+    enabled: bool = False,
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT,
+) -> SensorEntityDescription:
+    return SensorEntityDescription(
+        key=key,
+        name=name,
+        native_unit_of_measurement=unit,
+        device_class=device_class,
+        state_class=state_class,
+        entity_registry_enabled_default=enabled,
+    )
+
+
+# Extra measurands from meterValue[]; keys are MeterReading slots. The common
+# ones are enabled by default, per phase and export values are opt-in.
+METER_SENSORS: tuple[SensorEntityDescription, ...] = (
+    _meter("current_import_a", "Current", UnitOfElectricCurrent.AMPERE, SensorDeviceClass.CURRENT, True),
+    _meter("current_l1_a", "Current L1", UnitOfElectricCurrent.AMPERE, SensorDeviceClass.CURRENT),
+    _meter("current_l2_a", "Current L2", UnitOfElectricCurrent.AMPERE, SensorDeviceClass.CURRENT),
+    _meter("current_l3_a", "Current L3", UnitOfElectricCurrent.AMPERE, SensorDeviceClass.CURRENT),
+    _meter("current_offered_a", "Current Offered", UnitOfElectricCurrent.AMPERE, SensorDeviceClass.CURRENT),
+    _meter("voltage_v", "Voltage", UnitOfElectricPotential.VOLT, SensorDeviceClass.VOLTAGE, True),
+    _meter("voltage_l1_v", "Voltage L1", UnitOfElectricPotential.VOLT, SensorDeviceClass.VOLTAGE),
+    _meter("voltage_l2_v", "Voltage L2", UnitOfElectricPotential.VOLT, SensorDeviceClass.VOLTAGE),
+    _meter("voltage_l3_v", "Voltage L3", UnitOfElectricPotential.VOLT, SensorDeviceClass.VOLTAGE),
+    _meter("frequency_hz", "Frequency", UnitOfFrequency.HERTZ, SensorDeviceClass.FREQUENCY, True),
+    _meter("soc_pct", "State of Charge", PERCENTAGE, SensorDeviceClass.BATTERY, True),
+    _meter("power_active_export_kw", "Power Export", UnitOfPower.KILO_WATT, SensorDeviceClass.POWER),
+    _meter("power_offered_kw", "Power Offered", UnitOfPower.KILO_WATT, SensorDeviceClass.POWER),
+    _meter("power_factor", "Power Factor", None, SensorDeviceClass.POWER_FACTOR),
+    _meter(
+        "energy_active_export_kwh",
+        "Energy Export",
+        UnitOfEnergy.KILO_WATT_HOUR,
+        SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+)
+
+
+# Instrumentation counters, only created when instrumentation is enabled
+OCPP_METRIC_SENSORS: tuple[tuple[str, str, str | None], ...] = (
+    ("ocpp_messages", "OCPP Messages", None),
+    ("ocpp_handler_p99", "OCPP Handler p99", UnitOfTime.MILLISECONDS),
+    ("ocpp_round_trip_p99", "OCPP Round Trip p99", UnitOfTime.MILLISECONDS),
+    ("ocpp_timeouts", "OCPP Timeouts", None),
+    ("ocpp_reconnects", "OCPP Reconnects", None),
+)
 
 
 async def async_setup_entry(
@@ -24,88 +94,167 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][entry.entry_id]
     manager: ElecqOcppManager = data["manager"]
 
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, "elecq_au101")},
-        name="Elecq AU101 Charger",
-        manufacturer="Elecq",
-        model="AU101",
+    @callback
+    def _async_add_station(station: ElecqStation) -> None:
+        entities: list[SensorEntity] = [
+            ElecqPowerSensor(station),
+            ElecqSmoothedPowerSensor(station),
+            ElecqEnergySensor(station),
+            ElecqSessionEnergySensor(station),
+            ElecqStatusSensor(station),
+            ElecqChargingStateSensor(station),
+        ]
+        if manager.tariff is not None:
+            entities.append(ElecqSessionCostSensor(station))
+            entities.append(ElecqSessionAveragePriceSensor(station))
+        entities.extend(
+            ElecqMeterSensor(station, description)
+            for description in METER_SENSORS
+        )
+        if station.metrics is not None:
+            entities.extend(
+                ElecqOcppMetricSensor(station, key, name, unit)
+                for key, name, unit in OCPP_METRIC_SENSORS
+            )
+        async_add_entities(entities)
+
+    for station in manager.stations:
+        _async_add_station(station)
+
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_STATION_ADDED.format(entry.entry_id), _async_add_station
+        )
     )
 
-    entities: list[SensorEntity] = [
-        ElecqPowerSensor(manager, device_info),
-        ElecqSmoothedPowerSensor(manager, device_info),
-        ElecqEnergySensor(manager, device_info),
-        ElecqSessionEnergySensor(manager, device_info),
-        ElecqStatusSensor(manager, device_info),
-        ElecqChargingStateSensor(manager, device_info),  # 👈 NEW
-    ]
-    async_add_entities(entities)
-
 
 class _BaseElecqSensor(SensorEntity):
-    def __init__(self, manager: ElecqOcppManager, device_info: DeviceInfo) -> None:
-        self._manager = manager
-        self._attr_device_info = device_info
+    _key: str
+    _groups: tuple[str, ...]
+
+    def __init__(self, station: ElecqStation) -> None:
+        self._station = station
+        self._attr_device_info = station.device_info
+        self._attr_unique_id = f"{station.unique_id_prefix}_{self._key}"
 
     async def async_added_to_hass(self) -> None:
         async def _handle_update() -> None:
+            self._station.manager.dispatch_stats.state_writes += 1
             self.async_write_ha_state()
 
-        self.async_on_remove(
-            async_dispatcher_connect(self.hass, SIGNAL_STATE_UPDATED, _handle_update)
-        )
+        for group in self._groups:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    self._station.signal_state_updated(group),
+                    _handle_update,
+                )
+            )
 
 
 class ElecqPowerSensor(_BaseElecqSensor):
     _attr_has_entity_name = True
     _attr_name = "Power"
-    _attr_unique_id = "elecq_au101_power"
+    _key = "power"
+    _groups = (GROUP_POWER,)
     _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
 
     @property
     def native_value(self):
-        return self._manager.state.power_kw
+        return self._station.state.power_kw
 
 
 class ElecqSmoothedPowerSensor(_BaseElecqSensor):
     _attr_has_entity_name = True
     _attr_name = "Power (Smoothed)"
-    _attr_unique_id = "elecq_au101_power_smoothed"
+    _key = "power_smoothed"
+    _groups = (GROUP_POWER_SMOOTHED,)
     _attr_native_unit_of_measurement = UnitOfPower.KILO_WATT
     _attr_device_class = SensorDeviceClass.POWER
     _attr_state_class = SensorStateClass.MEASUREMENT
 
     @property
     def native_value(self):
-        return self._manager.state.power_kw_smoothed
+        return self._station.state.power_kw_smoothed
+
+    @property
+    def extra_state_attributes(self):
+        manager = self._station.manager
+        return {
+            "filter": manager.smoothing_filter,
+            "window_seconds": manager.smoothing_window,
+        }
 
 
 class ElecqEnergySensor(_BaseElecqSensor):
     _attr_has_entity_name = True
     _attr_name = "Total Energy"
-    _attr_unique_id = "elecq_au101_energy"
+    _key = "energy"
+    _groups = (GROUP_ENERGY,)
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
 
     @property
     def native_value(self):
-        return self._manager.state.energy_kwh
+        return self._station.state.energy_kwh
 
 
 class ElecqSessionEnergySensor(_BaseElecqSensor):
     _attr_has_entity_name = True
     _attr_name = "Session Energy"
-    _attr_unique_id = "elecq_au101_session_energy"
+    _key = "session_energy"
+    _groups = (GROUP_SESSION_ENERGY,)
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL
 
     @property
     def native_value(self):
-        return self._manager.state.session_energy_kwh
+        return self._station.state.session_energy_kwh
+
+
+class ElecqSessionCostSensor(_BaseElecqSensor):
+    """Session cost at the configured time-of-use prices."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Session Cost"
+    _key = "session_cost"
+    _groups = (GROUP_SESSION_COST,)
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_suggested_display_precision = 2
+
+    async def async_added_to_hass(self) -> None:
+        self._attr_native_unit_of_measurement = self.hass.config.currency
+        await super().async_added_to_hass()
+
+    @property
+    def native_value(self):
+        return self._station.state.session_cost
+
+
+class ElecqSessionAveragePriceSensor(_BaseElecqSensor):
+    """Session cost divided by session energy."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Session Average Price"
+    _key = "session_average_price"
+    _groups = (GROUP_SESSION_COST,)
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 3
+
+    async def async_added_to_hass(self) -> None:
+        self._attr_native_unit_of_measurement = (
+            f"{self.hass.config.currency}/{UnitOfEnergy.KILO_WATT_HOUR}"
+        )
+        await super().async_added_to_hass()
+
+    @property
+    def native_value(self):
+        return self._station.state.session_average_price
 
 
 class ElecqStatusSensor(_BaseElecqSensor):
@@ -113,11 +262,12 @@ class ElecqStatusSensor(_BaseElecqSensor):
 
     _attr_has_entity_name = True
     _attr_name = "Charger Status"
-    _attr_unique_id = "elecq_au101_status"
+    _key = "status"
+    _groups = (GROUP_STATUS,)
 
     @property
     def native_value(self):
-        return self._manager.state.last_status or "Unknown"
+        return self._station.state.last_status or "Unknown"
 
 
 class ElecqChargingStateSensor(_BaseElecqSensor):
@@ -130,11 +280,12 @@ class ElecqChargingStateSensor(_BaseElecqSensor):
 
     _attr_has_entity_name = True
     _attr_name = "Info"
-    _attr_unique_id = "elecq_au101_charging_state"
+    _key = "charging_state"
+    _groups = (GROUP_CHARGING_STATE,)
 
     @property
     def native_value(self):
-        cs = self._manager.state.last_charging_state
+        cs = self._station.state.last_charging_state
         if cs is None:
             return "Unknown"
 
@@ -147,10 +298,90 @@ class ElecqChargingStateSensor(_BaseElecqSensor):
     @property
     def extra_state_attributes(self):
         """Expose raw state for debugging/automation if desired."""
-        st = self._manager.state
+        st = self._station.state
         attrs = {}
         if st.last_charging_state is not None:
             attrs["raw_charging_state"] = st.last_charging_state
         if st.transaction_id is not None:
             attrs["transaction_id"] = st.transaction_id
         return attrs
+
+
+class ElecqMeterSensor(_BaseElecqSensor):
+    """One of the extra measurands decoded from meterValue[]."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, station: ElecqStation, description: SensorEntityDescription
+    ) -> None:
+        self.entity_description = description
+        self._key = description.key
+        self._groups = (description.key,)
+        super().__init__(station)
+
+    @property
+    def native_value(self):
+        return getattr(self._station.state.meter, self._key)
+
+
+class ElecqOcppMetricSensor(_BaseElecqSensor):
+    """Polled view of the station's OCPP instrumentation.
+
+    Metrics change with every message, so these entities poll instead of
+    listening for dispatcher signals to keep them off the hot path.
+    """
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = True
+    _groups = ()
+
+    def __init__(
+        self, station: ElecqStation, key: str, name: str, unit: str | None
+    ) -> None:
+        self._key = key
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = (
+            SensorStateClass.MEASUREMENT
+            if unit is not None
+            else SensorStateClass.TOTAL_INCREASING
+        )
+        super().__init__(station)
+
+    @property
+    def native_value(self):
+        metrics = self._station.metrics
+        if self._key == "ocpp_messages":
+            return metrics.messages
+        if self._key == "ocpp_handler_p99":
+            return metrics.combined("handler").percentile(0.99)
+        if self._key == "ocpp_round_trip_p99":
+            return metrics.combined("round_trip").percentile(0.99)
+        if self._key == "ocpp_timeouts":
+            return metrics.timeouts
+        return metrics.reconnects
+
+    @property
+    def extra_state_attributes(self):
+        metrics = self._station.metrics
+        if self._key == "ocpp_messages":
+            return {
+                name: action.received + action.sent
+                for name, action in sorted(metrics.actions.items())
+            }
+        if self._key in ("ocpp_handler_p99", "ocpp_round_trip_p99"):
+            attr = "handler" if self._key == "ocpp_handler_p99" else "round_trip"
+            return {
+                name: getattr(action, attr).percentile(0.99)
+                for name, action in sorted(metrics.actions.items())
+                if getattr(action, attr).count
+            }
+        if self._key == "ocpp_timeouts":
+            return {
+                name: action.timeouts
+                for name, action in sorted(metrics.actions.items())
+                if action.timeouts
+            }
+        return None
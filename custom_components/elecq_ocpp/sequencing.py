@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+# Verdicts for an incoming TransactionEvent
+APPLY = "apply"
+DUPLICATE = "duplicate"
+STALE = "stale"
+HELD = "held"
+
+# Transactions tracked per station; older ones are forgotten first
+MAX_TRANSACTIONS = 8
+# Out-of-order seq_nos remembered above the contiguous watermark. When a gap
+# never fills, the watermark is moved past it once this many are pending.
+# This also bounds the replayed events held back per transaction.
+MAX_PENDING_SEQ = 64
+
+
+@dataclass
+class SequenceStats:
+    """Counters describing the TransactionEvent stream of one station."""
+
+    applied: int = 0
+    duplicates: int = 0
+    stale: int = 0
+    offline: int = 0
+    reordered: int = 0
+    gaps: int = 0
+    lost: int = 0
+
+
+class _TransactionSeq:
+    __slots__ = ("contiguous", "pending", "highest")
+
+    def __init__(self) -> None:
+        # Every seq_no <= contiguous has been seen
+        self.contiguous = -1
+        # Seen seq_nos above the watermark
+        self.pending: set[int] = set()
+        self.highest = -1
+
+
+class TransactionSequencer:
+    """Dedupe and order the TransactionEvents of one station.
+
+    OCPP 2.0.1 numbers the events of a transaction with an incrementing
+    seq_no. After an outage the charger replays what it queued (offline=True)
+    and may resend events it never got a response for. Events already seen
+    are duplicates; events older than what the live state already reflects
+    are stale and must not overwrite it.
+
+    A replayed event above a gap in its transaction's seq_nos is held until
+    the gap fills, then released with the events it unblocks in seq_no
+    order. A gap that never fills is given up after MAX_PENDING_SEQ events;
+    whatever is still held when the replay ends is released in seq_no order
+    by release_all(). Live events are never held: the charger sends them in
+    order, and waiting would delay the state the user sees.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SequenceStats()
+        self._transactions: dict[str, _TransactionSeq] = {}
+        # Held replayed events per transaction: seq_no -> event
+        self._held: dict[str, dict[int, Any]] = {}
+        # Charger time (epoch seconds) of the newest event applied to state
+        self.latest_applied: Optional[float] = None
+
+    def check(
+        self,
+        transaction_id: Optional[str],
+        seq_no: Optional[int],
+        timestamp: float,
+        offline: bool = False,
+    ) -> str:
+        stats = self.stats
+        if offline:
+            stats.offline += 1
+
+        if transaction_id is not None and seq_no is not None:
+            if self._seen(transaction_id, seq_no):
+                stats.duplicates += 1
+                return DUPLICATE
+            if offline:
+                if seq_no > self._transactions[transaction_id].contiguous:
+                    stats.reordered += 1
+                    return HELD
+                if transaction_id in self._held:
+                    # Released together with the events held behind it
+                    return HELD
+
+        return self.check_order(timestamp, offline)
+
+    def check_order(self, timestamp: float, offline: bool = False) -> str:
+        """STALE or APPLY for an event already known not to be a duplicate."""
+        stats = self.stats
+        # Only replayed events can be stale; live events always win, even if
+        # the charger clock stepped backwards
+        if (
+            offline
+            and self.latest_applied is not None
+            and timestamp < self.latest_applied
+        ):
+            stats.stale += 1
+            return STALE
+
+        if self.latest_applied is None or timestamp > self.latest_applied:
+            self.latest_applied = timestamp
+        stats.applied += 1
+        return APPLY
+
+    def hold(self, transaction_id: str, seq_no: int, event: Any) -> None:
+        """Keep an event check() returned HELD for until release() has it."""
+        self._held.setdefault(transaction_id, {})[seq_no] = event
+
+    def release(self, transaction_id: Optional[str]) -> list[Any]:
+        """Held events of a transaction no gap blocks anymore, in order."""
+        held = self._held.get(transaction_id)
+        if not held:
+            return []
+        tx = self._transactions.get(transaction_id)
+        contiguous = tx.contiguous if tx is not None else max(held)
+        ready = sorted(seq_no for seq_no in held if seq_no <= contiguous)
+        events = [held.pop(seq_no) for seq_no in ready]
+        if not held:
+            del self._held[transaction_id]
+        return events
+
+    def release_all(self) -> list[Any]:
+        """Every held event, each transaction's in seq_no order."""
+        events = [
+            held[seq_no]
+            for held in self._held.values()
+            for seq_no in sorted(held)
+        ]
+        self._held.clear()
+        return events
+
+    def _seen(self, transaction_id: str, seq_no: int) -> bool:
+        """Record seq_no; True if it was already recorded before."""
+        tx = self._transactions.get(transaction_id)
+        if tx is None:
+            if len(self._transactions) >= MAX_TRANSACTIONS:
+                del self._transactions[next(iter(self._transactions))]
+            tx = self._transactions[transaction_id] = _TransactionSeq()
+            # Joining mid-transaction (e.g. after a restart): start from here
+            if seq_no > 0:
+                tx.contiguous = seq_no - 1
+
+        if seq_no <= tx.contiguous or seq_no in tx.pending:
+            return True
+
+        if seq_no > tx.highest + 1 and tx.highest >= 0:
+            self.stats.gaps += 1
+        tx.highest = max(tx.highest, seq_no)
+
+        if seq_no == tx.contiguous + 1:
+            tx.contiguous = seq_no
+            while tx.contiguous + 1 in tx.pending:
+                tx.contiguous += 1
+                tx.pending.discard(tx.contiguous)
+        else:
+            tx.pending.add(seq_no)
+            if len(tx.pending) > MAX_PENDING_SEQ:
+                # Give up on the oldest gap
+                lowest = min(tx.pending)
+                self.stats.lost += lowest - tx.contiguous - 1
+                tx.contiguous = lowest
+                tx.pending.discard(lowest)
+                while tx.contiguous + 1 in tx.pending:
+                    tx.contiguous += 1
+                    tx.pending.discard(tx.contiguous)
+        return False
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .history import ElecqHistoryStore
+from .ocpp_server import ElecqStation
+
+SERVICE_GET_SESSIONS = "get_sessions"
+SERVICE_GET_SAMPLES = "get_samples"
+SERVICE_EXPORT_CAPTURE = "export_capture"
+
+ATTR_CHARGE_POINT_ID = "charge_point_id"
+ATTR_START = "start"
+ATTR_END = "end"
+
+_RANGE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CHARGE_POINT_ID): cv.string,
+        vol.Required(ATTR_START): cv.datetime,
+        vol.Required(ATTR_END): cv.datetime,
+    }
+)
+
+_STATION_SCHEMA = vol.Schema({vol.Required(ATTR_CHARGE_POINT_ID): cv.string})
+
+
+def _history_for(hass: HomeAssistant, cp_id: str) -> ElecqHistoryStore:
+    """Find the history store of the entry serving this charge point."""
+    for data in hass.data.get(DOMAIN, {}).values():
+        manager = data["manager"]
+        if manager.get_station(cp_id) is not None:
+            if manager.history is None:
+                break
+            return manager.history
+    raise HomeAssistantError(f"No charging history for charge point {cp_id}")
+
+
+def _station_for(hass: HomeAssistant, cp_id: str) -> ElecqStation:
+    for data in hass.data.get(DOMAIN, {}).values():
+        station = data["manager"].get_station(cp_id)
+        if station is not None:
+            return station
+    raise HomeAssistantError(f"Unknown charge point {cp_id}")
+
+
+def _range(call: ServiceCall) -> tuple[float, float]:
+    """The requested range as timestamps; times without a zone are local."""
+    return (
+        dt_util.as_utc(call.data[ATTR_START]).timestamp(),
+        dt_util.as_utc(call.data[ATTR_END]).timestamp(),
+    )
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the history query and capture export services."""
+
+    async def _get_sessions(call: ServiceCall) -> ServiceResponse:
+        history = _history_for(hass, call.data[ATTR_CHARGE_POINT_ID])
+        sessions = await history.async_get_sessions(
+            call.data[ATTR_CHARGE_POINT_ID], *_range(call)
+        )
+        return {"sessions": sessions}
+
+    async def _get_samples(call: ServiceCall) -> ServiceResponse:
+        history = _history_for(hass, call.data[ATTR_CHARGE_POINT_ID])
+        samples = await history.async_get_samples(
+            call.data[ATTR_CHARGE_POINT_ID], *_range(call)
+        )
+        return {"samples": samples}
+
+    async def _export_capture(call: ServiceCall) -> ServiceResponse:
+        station = _station_for(hass, call.data[ATTR_CHARGE_POINT_ID])
+        path, frames = await station.async_export_capture()
+        return {"path": path, "frames": frames}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SESSIONS,
+        _get_sessions,
+        schema=_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SAMPLES,
+        _get_samples,
+        schema=_RANGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_CAPTURE,
+        _export_capture,
+        schema=_STATION_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, insort
+
+from .const import (
+    SMOOTHING_EWMA,
+    SMOOTHING_MEDIAN,
+    SMOOTHING_TIME_AVERAGE,
+)
+
+# Upper bound on samples kept per filter. Chargers sample every few seconds at
+# most, so this covers windows of several minutes; older samples are dropped
+# early if a window would need more.
+DEFAULT_CAPACITY = 512
+
+
+class _SampleRing:
+    """Fixed-size ring of (timestamp, value) samples, oldest first.
+
+    Samples are stored unboxed (8 bytes each), so a full ring costs the same
+    as an empty one.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.size = 0
+
+    def index(self, offset: int) -> int:
+        """Slot of the sample `offset` positions after the oldest one."""
+        return (self.head + offset) % self.capacity
+
+    def push(self, timestamp: float, value: float) -> None:
+        slot = (self.head + self.size) % self.capacity
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.size += 1
+
+    def pop_oldest(self) -> None:
+        self.head = (self.head + 1) % self.capacity
+        self.size -= 1
+
+    def clear(self) -> None:
+        self.head = 0
+        self.size = 0
+
+
+class TimeWeightedAverage:
+    """Moving average over the last `window` seconds, weighted by time.
+
+    Consecutive samples form trapezoids; a running sum of their areas is kept
+    and segments leaving the window are subtracted, so each update is O(1)
+    amortized regardless of how irregular the sampling is.
+    """
+
+    def __init__(self, window: float, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.window = window
+        self._ring = _SampleRing(capacity)
+        self._area = 0.0
+
+    def _segment_area(self, first: int) -> float:
+        ring = self._ring
+        a = ring.index(first)
+        b = ring.index(first + 1)
+        return (
+            (ring.values[a] + ring.values[b])
+            / 2.0
+            * (ring.times[b] - ring.times[a])
+        )
+
+    def update(self, timestamp: float, value: float) -> float:
+        ring = self._ring
+        if ring.size:
+            last = ring.index(ring.size - 1)
+            if timestamp < ring.times[last]:
+                # Clock went backwards (e.g. charger time resync): start over
+                self.reset()
+            elif ring.size == ring.capacity:
+                self._area -= self._segment_area(0)
+                ring.pop_oldest()
+
+        ring.push(timestamp, value)
+        if ring.size >= 2:
+            self._area += self._segment_area(ring.size - 2)
+
+        # Drop whole segments that ended before the window started
+        start = timestamp - self.window
+        while ring.size >= 2 and ring.times[ring.index(1)] <= start:
+            self._area -= self._segment_area(0)
+            ring.pop_oldest()
+
+        if ring.size < 2:
+            return value
+
+        # The oldest segment may straddle the window start: cut it there
+        a = ring.index(0)
+        b = ring.index(1)
+        t0, t1 = ring.times[a], ring.times[b]
+        area = self._area
+        if t0 < start:
+            v0, v1 = ring.values[a], ring.values[b]
+            v_start = v0 + (v1 - v0) * (start - t0) / (t1 - t0)
+            area -= (v0 + v_start) / 2.0 * (start - t0)
+            t0 = start
+
+        span = timestamp - t0
+        if span <= 0:
+            return value
+        return area / span
+
+    def reset(self) -> None:
+        self._ring.clear()
+        self._area = 0.0
+
+
+class Ewma:
+    """Exponentially weighted moving average with time constant `window`.
+
+    The weight of each sample depends on the time since the previous one, so
+    irregular sampling does not skew the result. O(1) per update.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._value: float | None = None
+        self._last: float = 0.0
+
+    def update(self, timestamp: float, value: float) -> float:
+        if self._value is None or timestamp < self._last or self.window <= 0:
+            self._value = value
+        else:
+            alpha = 1.0 - math.exp(-(timestamp - self._last) / self.window)
+            self._value += alpha * (value - self._value)
+        self._last = timestamp
+        return self._value
+
+    def reset(self) -> None:
+        self._value = None
+
+
+class MovingMedian:
+    """Median of the samples from the last `window` seconds.
+
+    Rejects single-sample spikes. Keeps the samples in a ring plus a sorted
+    copy; updates are a binary search and a short list shift, bounded by
+    the ring capacity.
+    """
+
+    def __init__(self, window: float, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.window = window
+        self._ring = _SampleRing(capacity)
+        self._sorted: list[float] = []
+
+    def _drop_oldest(self) -> None:
+        ring = self._ring
+        old = ring.values[ring.head]
+        del self._sorted[bisect_left(self._sorted, old)]
+        ring.pop_oldest()
+
+    def update(self, timestamp: float, value: float) -> float:
+        ring = self._ring
+        if ring.size:
+            if timestamp < ring.times[ring.index(ring.size - 1)]:
+                self.reset()
+            elif ring.size == ring.capacity:
+                self._drop_oldest()
+
+        ring.push(timestamp, value)
+        insort(self._sorted, value)
+
+        start = timestamp - self.window
+        while ring.size > 1 and ring.times[ring.head] < start:
+            self._drop_oldest()
+
+        ordered = self._sorted
+        mid = len(ordered) // 2
+        if len(ordered) % 2:
+            return ordered[mid]
+        return (ordered[mid - 1] + ordered[mid]) / 2.0
+
+    def reset(self) -> None:
+        self._ring.clear()
+        self._sorted.clear()
+
+
+PowerFilter = TimeWeightedAverage | Ewma | MovingMedian
+
+_FILTERS = {
+    SMOOTHING_TIME_AVERAGE: TimeWeightedAverage,
+    SMOOTHING_EWMA: Ewma,
+    SMOOTHING_MEDIAN: MovingMedian,
+}
+
+
+def create_power_filter(kind: str, window: float) -> PowerFilter:
+    """Build the smoothing filter selected in the options."""
+    try:
+        return _FILTERS[kind](window)
+    except KeyError:
+        raise ValueError(f"Unknown smoothing filter: {kind}") from None
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Coroutine, Optional
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .commands import ElecqCommandError
+from .const import MAX_CURRENT_A, MIN_CURRENT_A, NOMINAL_VOLTAGE
+
+if TYPE_CHECKING:
+    from .ocpp_server import ElecqOcppManager, ElecqStation
+
+_LOGGER = logging.getLogger(__name__)
+
+# Source name of the controller's cap in ElecqStation.async_set_current_limit
+LIMIT_SOURCE = "solar"
+
+# Surplus must cover the minimum current this long before a session starts,
+# and stay below it this long before it is stopped
+START_DELAY = 60.0
+STOP_DELAY = 120.0
+
+# A session runs at least MIN_ON_TIME once started and the charger rests at
+# least MIN_OFF_TIME once stopped, whatever the surplus does
+MIN_ON_TIME = 300.0
+MIN_OFF_TIME = 300.0
+
+# Limit changes smaller than this are not sent
+DEADBAND_A = 1.0
+
+
+class _SolarStation:
+    """Controller state of one station in solar mode."""
+
+    __slots__ = (
+        "station",
+        "started_at",
+        "stopped_at",
+        "above_since",
+        "below_since",
+        "limit_a",
+        "busy",
+    )
+
+    def __init__(self, station: ElecqStation) -> None:
+        self.station = station
+        self.started_at = -math.inf
+        self.stopped_at = -math.inf
+        # When surplus went above / below the minimum current, None if not
+        self.above_since: Optional[float] = None
+        self.below_since: Optional[float] = None
+        self.limit_a: Optional[float] = None
+        # A start, stop or limit command is in flight
+        self.busy = False
+
+
+class ElecqSolarController:
+    """Charge from excess PV on the stations switched to solar mode.
+
+    The surplus sensor reports what the site exports. What the solar
+    stations draw themselves is added back, the result is handed out to
+    them first come, first served, and each gets a current limit matching
+    its part. Sessions are started when the surplus covers the minimum
+    charging current for START_DELAY and stopped when it has not for
+    STOP_DELAY, within minimum on and off times.
+
+    The loop runs on new samples: a power reading from a solar station or a
+    change of the surplus sensor schedules one control step for the current
+    loop tick, so it reacts within one sample period without polling. While
+    a delay or minimum on/off time is running, a timer also wakes it when
+    the earliest of them is due, so a steady surplus still starts a session.
+    """
+
+    def __init__(
+        self,
+        manager: ElecqOcppManager,
+        surplus_entity_id: str,
+        phases: int = 1,
+    ) -> None:
+        self.manager = manager
+        self.hass: HomeAssistant = manager.hass
+        self.surplus_entity_id = surplus_entity_id
+        self.phases = phases
+
+        self._stations: dict[str, _SolarStation] = {}
+        self._export_w: Optional[float] = None
+        self._control_scheduled = False
+        self._unsub = None
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.steps = 0
+        self.commands = 0
+
+    # ---- lifecycle ----
+
+    @callback
+    def async_start(self) -> None:
+        self._unsub = async_track_state_change_event(
+            self.hass, [self.surplus_entity_id], self._async_surplus_changed
+        )
+        state = self.hass.states.get(self.surplus_entity_id)
+        if state is not None:
+            self._async_surplus_state(state)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._cancel_wakeup()
+
+    # ---- solar mode per station ----
+
+    def is_enabled(self, station: ElecqStation) -> bool:
+        return station.cp_id in self._stations
+
+    @callback
+    def async_set_enabled(self, station: ElecqStation, enabled: bool) -> None:
+        if enabled:
+            if station.cp_id not in self._stations:
+                self._stations[station.cp_id] = _SolarStation(station)
+                self._async_schedule_control()
+        elif self._stations.pop(station.cp_id, None) is not None:
+            # Hand the charger back to the user at full current
+            self.hass.async_create_task(
+                station.async_set_current_limit(LIMIT_SOURCE, None)
+            )
+
+    # ---- inputs ----
+
+    @callback
+    def _async_surplus_changed(self, event: Event) -> None:
+        state = event.data.get("new_state")
+        if state is not None:
+            self._async_surplus_state(state)
+
+    @callback
+    def _async_surplus_state(self, state) -> None:
+        if state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+            self._export_w = None
+            return
+        try:
+            value = float(state.state)
+        except ValueError:
+            return
+        unit = state.attributes.get("unit_of_measurement")
+        if unit == "kW":
+            value *= 1000
+        elif unit != "W":
+            _LOGGER.warning(
+                "Surplus sensor %s reports %s; expected W or kW",
+                self.surplus_entity_id,
+                unit,
+            )
+            return
+        self._export_w = value
+        self._async_schedule_control()
+
+    @callback
+    def async_on_sample(self, station: ElecqStation) -> None:
+        """A station decoded a new power reading."""
+        if station.cp_id in self._stations:
+            self._async_schedule_control()
+
+    @callback
+    def _async_schedule_control(self) -> None:
+        # The rest of the message (charging state etc.) is applied first
+        if not self._control_scheduled and self._stations:
+            self._control_scheduled = True
+            self.hass.loop.call_soon(self._async_control)
+
+    @callback
+    def _async_wakeup(self) -> None:
+        self._wakeup = None
+        self._async_schedule_control()
+
+    def _cancel_wakeup(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+    # ---- control ----
+
+    @callback
+    def _async_control(self) -> None:
+        self._control_scheduled = False
+        self._cancel_wakeup()
+        if self._export_w is None:
+            return
+        self.steps += 1
+
+        watts_per_amp = NOMINAL_VOLTAGE * self.phases
+        min_w = MIN_CURRENT_A * watts_per_amp
+        now = self.hass.loop.time()
+        # Earliest time a running delay could start or stop a session
+        next_due: Optional[float] = None
+
+        pool_w = self._export_w
+        for ss in self._stations.values():
+            st = ss.station.state
+            if st.charging:
+                pool_w += max(0.0, st.power_kw or 0.0) * 1000
+
+        for ss in self._stations.values():
+            station = ss.station
+            st = station.state
+            if ss.busy:
+                # Leave it alone until its last command is answered
+                if st.charging:
+                    pool_w -= (ss.limit_a or MIN_CURRENT_A) * watts_per_amp
+                continue
+            if not station.is_available or not st.plugged_in:
+                ss.above_since = ss.below_since = None
+                continue
+
+            if st.charging:
+                if pool_w >= min_w:
+                    ss.below_since = None
+                    target = min(MAX_CURRENT_A, math.floor(pool_w / watts_per_amp))
+                else:
+                    # Hold at the minimum until it has been short long enough
+                    if ss.below_since is None:
+                        ss.below_since = now
+                    target = MIN_CURRENT_A
+                    if (
+                        now - ss.below_since >= STOP_DELAY
+                        and now - ss.started_at >= MIN_ON_TIME
+                    ):
+                        ss.stopped_at = now
+                        ss.below_since = None
+                        self._async_command(ss, station.async_request_stop())
+                        continue
+                    due = max(
+                        ss.below_since + STOP_DELAY, ss.started_at + MIN_ON_TIME
+                    )
+                    next_due = due if next_due is None else min(next_due, due)
+                pool_w -= target * watts_per_amp
+                if ss.limit_a is None or abs(target - ss.limit_a) >= DEADBAND_A:
+                    ss.limit_a = target
+                    self._async_command(
+                        ss, station.async_set_current_limit(LIMIT_SOURCE, target)
+                    )
+                continue
+
+            if pool_w < min_w:
+                ss.above_since = None
+                continue
+            if ss.above_since is None:
+                ss.above_since = now
+            if (
+                now - ss.above_since >= START_DELAY
+                and now - ss.stopped_at >= MIN_OFF_TIME
+            ):
+                target = min(MAX_CURRENT_A, math.floor(pool_w / watts_per_amp))
+                pool_w -= target * watts_per_amp
+                ss.started_at = now
+                ss.above_since = None
+                ss.limit_a = target
+                self._async_command(ss, self._async_start_session(station, target))
+            else:
+                due = max(ss.above_since + START_DELAY, ss.stopped_at + MIN_OFF_TIME)
+                next_due = due if next_due is None else min(next_due, due)
+
+        if next_due is not None:
+            self._wakeup = self.hass.loop.call_at(next_due, self._async_wakeup)
+
+    async def _async_start_session(
+        self, station: ElecqStation, limit_a: float
+    ) -> bool:
+        await station.async_set_current_limit(LIMIT_SOURCE, limit_a)
+        return await station.async_request_start()
+
+    def _async_command(
+        self, ss: _SolarStation, command: Coroutine[Any, Any, bool]
+    ) -> None:
+        ss.busy = True
+        self.commands += 1
+        self.hass.async_create_task(self._async_run(ss, command))
+
+    async def _async_run(
+        self, ss: _SolarStation, command: Coroutine[Any, Any, bool]
+    ) -> None:
+        try:
+            if not await command:
+                _LOGGER.debug(
+                    "Solar command for %s was not accepted", ss.station.cp_id
+                )
+                ss.limit_a = None
+        except ElecqCommandError as err:
+            _LOGGER.warning("Solar command for %s failed: %s", ss.station.cp_id, err)
+            ss.limit_a = None
+        finally:
+            ss.busy = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "surplus_entity_id": self.surplus_entity_id,
+            "export_w": self._export_w,
+            "steps": self.steps,
+            "commands": self.commands,
+            "wakeup_in": (
+                None
+                if self._wakeup is None
+                else round(self._wakeup.when() - self.hass.loop.time(), 1)
+            ),
+            "stations": {
+                cp_id: {"limit_a": ss.limit_a, "busy": ss.busy}
+                for cp_id, ss in self._stations.items()
+            },
+        }
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import fields
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .ocpp_server import ElecqOcppManager, ElecqStation
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Seconds between a state change and the write that includes it. Every
+# change within the window (of every station) goes into the same write.
+SAVE_DELAY = 15
+
+# ElecqChargerState fields holding datetimes, stored as ISO strings
+_DATETIME_FIELDS = ("session_start", "last_update")
+
+# Readings that only hold while the charger reports them. Not restored: a
+# disconnected charger draws nothing, and the load balancer would count a
+# restored current as the charger's own load. The energy registers are kept.
+_LIVE_FIELDS = frozenset({"power_kw", "power_kw_smoothed"})
+_KEPT_METER_SLOTS = frozenset(
+    {"energy_active_import_kwh", "energy_active_export_kwh"}
+)
+
+
+def storage_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.state"
+
+
+class ElecqStateStore:
+    """Charger state of one entry in Home Assistant storage.
+
+    Restored before the platforms are set up, so the entities of every known
+    charger exist right after a restart and show the last known values;
+    the session energy keeps counting from the stored start reading.
+    Restored stations look like a charger that just disconnected, and the
+    messages it sends when it reconnects reconcile them as usual.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, storage_key(entry_id)
+        )
+        self._manager: ElecqOcppManager | None = None
+        self._save_scheduled = False
+        self._closed = False
+
+        self.saves = 0
+
+    async def async_restore(self, manager: ElecqOcppManager) -> int:
+        """Recreate the stations of the last snapshot; returns how many."""
+        self._manager = manager
+        data = await self._store.async_load()
+        if not data:
+            return 0
+        stations = data.get("stations", {})
+        for cp_id, snapshot in stations.items():
+            station = manager.async_get_or_create_station(cp_id)
+            try:
+                _restore_station(station, snapshot)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring unreadable stored state of %s", cp_id)
+        _LOGGER.debug("Restored the state of %d charge point(s)", len(stations))
+        return len(stations)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Include the current state in the next write."""
+        if self._save_scheduled or self._closed:
+            return
+        # One delayed write per window; re-arming on every change would
+        # postpone it for as long as chargers keep sending
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_scheduled = False
+        self.saves += 1
+        manager = self._manager
+        if manager is None:
+            return {"stations": {}}
+        return {
+            "stations": {
+                station.cp_id: _snapshot_station(station)
+                for station in manager.stations
+            }
+        }
+
+    async def async_close(self) -> None:
+        """Write the state as it is now; later changes are not saved.
+
+        Called before the connections are closed, so the disconnect does not
+        end up in the snapshot.
+        """
+        self._closed = True
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+
+
+def _snapshot_station(station: ElecqStation) -> dict[str, Any]:
+    st = station.state
+    state: dict[str, Any] = {}
+    for f in fields(st):
+        if f.name == "meter":
+            continue
+        value = getattr(st, f.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        state[f.name] = value
+    return {
+        "state": state,
+        "meter": st.meter.as_dict(),
+        "latest_applied": station.sequencer.latest_applied,
+    }
+
+
+def _restore_station(station: ElecqStation, snapshot: dict[str, Any]) -> None:
+    st = station.state
+    names = {f.name for f in fields(st)}
+    for name, value in snapshot["state"].items():
+        if name not in names or name == "meter" or name in _LIVE_FIELDS:
+            continue
+        if name in _DATETIME_FIELDS and value is not None:
+            value = dt_util.parse_datetime(value)
+        setattr(st, name, value)
+    meter = st.meter
+    for name, value in snapshot.get("meter", {}).items():
+        if name in _KEPT_METER_SLOTS:
+            setattr(meter, name, value)
+    station.sequencer.latest_applied = snapshot.get("latest_applied")
+    # Not connected (yet): same as right after a disconnect
+    station.async_mark_disconnected()
@@ -4,14 +4,15 @@ import logging
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.const import STATE_ON
 
-from .const import DOMAIN, SIGNAL_STATE_UPDATED
-from .ocpp_server import ElecqOcppManager
+from .const import DOMAIN, SIGNAL_STATION_ADDED, GROUP_CHARGING, GROUP_CONNECTION
+from .ocpp_server import ElecqOcppManager, ElecqStation
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,14 +25,21 @@ async def async_setup_entry(
     data = hass.data[DOMAIN][entry.entry_id]
     manager: ElecqOcppManager = data["manager"]
 
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, "elecq_au101")},
-        name="Elecq AU101 Charger",
-        manufacturer="Elecq",
-        model="AU101",
-    )
+    @callback
+    def _async_add_station(station: ElecqStation) -> None:
+        entities: list[SwitchEntity] = [ElecqChargingSwitch(station)]
+        if manager.solar is not None:
+            entities.append(ElecqSolarChargingSwitch(station))
+        async_add_entities(entities)
+
+    for station in manager.stations:
+        _async_add_station(station)
 
-    async_add_entities([ElecqChargingSwitch(manager, device_info)])
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, SIGNAL_STATION_ADDED.format(entry.entry_id), _async_add_station
+        )
+    )
 
 
 class ElecqChargingSwitch(SwitchEntity):
@@ -39,30 +47,37 @@ class ElecqChargingSwitch(SwitchEntity):
 
     _attr_has_entity_name = True
     _attr_name = "Remote Charging"
-    _attr_unique_id = "elecq_au101_remote_charging"
+    _groups = (GROUP_CHARGING, GROUP_CONNECTION)
 
-    def __init__(self, manager: ElecqOcppManager, device_info: DeviceInfo) -> None:
-        self._manager = manager
-        self._attr_device_info = device_info
+    def __init__(self, station: ElecqStation) -> None:
+        self._station = station
+        self._attr_device_info = station.device_info
+        self._attr_unique_id = f"{station.unique_id_prefix}_remote_charging"
         # Busy flag: while True, UI will show the entity as "unavailable" (greyed out)
         self._busy: bool = False
 
     async def async_added_to_hass(self) -> None:
         async def _handle_update() -> None:
-            # Whenever the manager state changes (from OCPP events),
-            # we re-sync the UI. ON/OFF comes only from charger state.
+            # Whenever the charging flag or the connection changes (from OCPP
+            # events), we re-sync the UI. ON/OFF comes only from charger state.
+            self._station.manager.dispatch_stats.state_writes += 1
             self.async_write_ha_state()
 
-        self.async_on_remove(
-            async_dispatcher_connect(self.hass, SIGNAL_STATE_UPDATED, _handle_update)
-        )
+        for group in self._groups:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    self._station.signal_state_updated(group),
+                    _handle_update,
+                )
+            )
 
     # ---- Core behavior ----
 
     @property
     def is_on(self) -> bool:
         """ON/OFF is derived ONLY from charger state."""
-        return self._manager.state.charging
+        return self._station.state.charging
 
     @property
     def available(self) -> bool:
@@ -71,7 +86,7 @@ class ElecqChargingSwitch(SwitchEntity):
 
         Otherwise, it's available whenever the charger is connected.
         """
-        return self._manager.is_available and not self._busy
+        return self._station.is_available and not self._busy
 
     async def async_turn_on(self, **kwargs) -> None:
         """
@@ -80,12 +95,14 @@ class ElecqChargingSwitch(SwitchEntity):
         - If EV is unplugged  -> show error "Please plug in..." and do nothing.
         - Else:
             * Grey out switch (busy=True)
-            * Send RequestStartTransaction
+            * Queue RequestStartTransaction and await its result; a second
+              click while it is in flight joins the same request
             * Ungrey after response
             * If charger accepts     -> state will flip to ON later via OCPP events.
             * If charger rejects     -> stay OFF; we only log a warning.
+            * If charger is offline or does not answer -> error shown in the UI.
         """
-        st = self._manager.state
+        st = self._station.state
 
         if not st.plugged_in:
             # Don't even try to talk to charger if EV is not connected.
@@ -98,7 +115,7 @@ class ElecqChargingSwitch(SwitchEntity):
         self.async_write_ha_state()
 
         try:
-            ok = await self._manager.async_request_start()
+            ok = await self._station.async_request_start()
         finally:
             # Always clear busy flag once we got a response / finished attempt
             self._busy = False
@@ -116,8 +133,8 @@ class ElecqChargingSwitch(SwitchEntity):
         """
         User toggles switch OFF:
 
-        - If no active transaction or CP -> we still call async_request_stop(); it
-          returns False and we just log a warning.
+        - If there is no active transaction, the charger is offline or does not
+          answer, async_request_stop() raises and the error is shown in the UI.
         - Grey out while request in flight, then ungrey.
         - ON/OFF still only changes when charger sends TransactionEvent(Ended) etc.
         """
@@ -126,10 +143,45 @@ class ElecqChargingSwitch(SwitchEntity):
         self.async_write_ha_state()
 
         try:
-            ok = await self._manager.async_request_stop()
+            ok = await self._station.async_request_stop()
         finally:
             self._busy = False
             self.async_write_ha_state()
 
         if not ok:
             _LOGGER.warning("Charger did not accept remote stop request.")
+
+
+class ElecqSolarChargingSwitch(SwitchEntity, RestoreEntity):
+    """Hand a station to the solar surplus controller.
+
+    While on, the controller starts, throttles and stops charging to follow
+    the PV surplus. The setting survives restarts.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Solar Charging"
+    _attr_icon = "mdi:solar-power"
+
+    def __init__(self, station: ElecqStation) -> None:
+        self._station = station
+        self._solar = station.manager.solar
+        self._attr_device_info = station.device_info
+        self._attr_unique_id = f"{station.unique_id_prefix}_solar_charging"
+
+    async def async_added_to_hass(self) -> None:
+        last = await self.async_get_last_state()
+        if last is not None and last.state == STATE_ON:
+            self._solar.async_set_enabled(self._station, True)
+
+    @property
+    def is_on(self) -> bool:
+        return self._solar.is_enabled(self._station)
+
+    async def async_turn_on(self, **kwargs) -> None:
+        self._solar.async_set_enabled(self._station, True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs) -> None:
+        self._solar.async_set_enabled(self._station, False)
+        self.async_write_ha_state()
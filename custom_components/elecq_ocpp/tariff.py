@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import re
+from bisect import bisect_right
+from datetime import datetime, tzinfo
+
+WEEK_SECONDS = 7 * 86400
+# Days searched ahead for the next change of the zone's UTC offset
+_OFFSET_SEARCH_DAYS = 366
+_DAY_MINUTES = 1440
+_WEEK_MINUTES = 7 * _DAY_MINUTES
+
+_DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# [days] [HH:MM-HH:MM]=price, or a bare price for the rest of the week
+_RULE = re.compile(
+    r"^(?:(?P<days>[a-z,\-]+)\s*)?"
+    r"(?:(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})\s*)?"
+    r"=\s*(?P<price>[0-9.]+)$"
+)
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = (int(part) for part in value.split(":"))
+    if minutes > 59 or hours > 24 or (hours == 24 and minutes):
+        raise ValueError(f"Invalid time {value}")
+    return hours * 60 + minutes
+
+
+def _days(value: str) -> list[int]:
+    days: list[int] = []
+    for part in value.split(","):
+        first, _, last = part.partition("-")
+        if first not in _DAYS or (last and last not in _DAYS):
+            raise ValueError(f"Invalid days {value}")
+        start = _DAYS.index(first)
+        end = _DAYS.index(last) if last else start
+        days.extend((start + n) % 7 for n in range((end - start) % 7 + 1))
+    return days
+
+
+class TariffSchedule:
+    """Weekly time-of-use prices, precomputed into sorted periods.
+
+    The schedule is a list of rules separated by ";", later rules winning:
+
+        0.25; mon-fri 07:00-21:00=0.35; 00:00-06:00=0.12; sat,sun=0.20
+
+    A bare number is the price of every minute no rule sets, `days` are
+    `mon`..`sun` ranges and lists (all days when left out), and a time range
+    ending before it starts runs past midnight. Prices are per kWh.
+
+    Parsing flattens the rules into the start (seconds into the week, local
+    time) and price of each period, merging neighbours with the same price,
+    so looking up a timestamp is one bisect.
+    """
+
+    __slots__ = ("tz", "_starts", "_ends", "_prices", "_span")
+
+    def __init__(self, periods: list[tuple[int, float]], tz: tzinfo) -> None:
+        """`periods`: (start second of the week, price), the first at 0."""
+        self.tz = tz
+        self._starts = [start for start, _ in periods]
+        self._ends = self._starts[1:] + [WEEK_SECONDS]
+        self._prices = [price for _, price in periods]
+        # Time span with one UTC offset, see _offset_span
+        self._span: tuple[float, float] = (0.0, 0.0)
+
+    @classmethod
+    def parse(cls, text: str, tz: tzinfo) -> TariffSchedule:
+        """Build a schedule from the rule syntax; raises ValueError."""
+        minutes: list[float | None] = [None] * _WEEK_MINUTES
+        for raw in text.replace("\n", ";").split(";"):
+            rule = raw.strip().lower()
+            if not rule:
+                continue
+            if "=" not in rule:
+                rule = "=" + rule
+            match = _RULE.match(rule)
+            if match is None:
+                raise ValueError(f"Invalid tariff rule {raw.strip()!r}")
+            price = float(match["price"])
+            if match["days"] is None and match["start"] is None:
+                minutes = [price if m is None else m for m in minutes]
+                continue
+            days = _days(match["days"]) if match["days"] else list(range(7))
+            start, length = 0, _DAY_MINUTES
+            if match["start"] is not None:
+                start = _minutes(match["start"])
+                length = (_minutes(match["end"]) - start) % _DAY_MINUTES
+                length = length or _DAY_MINUTES
+            for day in days:
+                first = day * _DAY_MINUTES + start
+                for minute in range(first, first + length):
+                    minutes[minute % _WEEK_MINUTES] = price
+
+        if None in minutes:
+            gap = minutes.index(None)
+            day, minute = divmod(gap, _DAY_MINUTES)
+            raise ValueError(
+                f"No price for {_DAYS[day]} {minute // 60:02d}:{minute % 60:02d}; "
+                "add a default price"
+            )
+        periods: list[tuple[int, float]] = []
+        for minute, price in enumerate(minutes):
+            if not periods or periods[-1][1] != price:
+                periods.append((minute * 60, price))
+        return cls(periods, tz)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def _local(self, ts: float) -> datetime:
+        return datetime.fromtimestamp(ts, self.tz)
+
+    @staticmethod
+    def _week_seconds(local: datetime) -> float:
+        return (
+            local.weekday() * 86400
+            + local.hour * 3600
+            + local.minute * 60
+            + local.second
+            + local.microsecond / 1e6
+        )
+
+    def price_at(self, ts: float) -> float:
+        second = self._week_seconds(self._local(ts))
+        return self._prices[bisect_right(self._starts, second) - 1]
+
+    def _offset_span(self, ts: float) -> tuple[float, float]:
+        """[start, end) around `ts` in which the zone's UTC offset is fixed.
+
+        The next offset change is searched a day at a time, up to a year
+        ahead, then bisected to the second; the span is kept until a time
+        outside it is asked for, so this runs about twice a year.
+        """
+        span = self._span
+        if span[0] <= ts < span[1]:
+            return span
+        low = math.floor(ts)
+        offset = self._local(low).utcoffset()
+        for days in range(1, _OFFSET_SEARCH_DAYS + 1):
+            high = low + days * 86400
+            if self._local(high).utcoffset() != offset:
+                break
+        else:
+            self._span = (low, high)
+            return self._span
+        start, low = low, high - 86400
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._local(middle).utcoffset() == offset:
+                low = middle
+            else:
+                high = middle
+        self._span = (start, high)
+        return self._span
+
+    def cost(self, start: float, end: float, kwh: float) -> float:
+        """Cost of `kwh` drawn evenly between two timestamps.
+
+        The energy is split over the price periods the interval spans, in
+        proportion to the time spent in each. One lookup per period crossed;
+        a sample interval usually stays within one. Periods are local wall
+        clock times in the schedule's zone: a period is also left when the
+        UTC offset changes, and the price is looked up again in the new
+        local time. A period spanning a daylight saving change lasts an hour
+        more or less, and the hour repeated in autumn is priced twice.
+        """
+        if end <= start:
+            return kwh * self.price_at(end)
+        rate = kwh / (end - start)
+        starts, ends, prices = self._starts, self._ends, self._prices
+        total = 0.0
+        t = start
+        while t < end:
+            local = self._local(t)
+            second = self._week_seconds(local)
+            i = bisect_right(starts, second) - 1
+            # At least a millisecond, so rounding can't stall the loop
+            until = min(
+                end, t + max(ends[i] - second, 1e-3), self._offset_span(t)[1]
+            )
+            total += (until - t) * rate * prices[i]
+            t = until
+        return total
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .ocpp_server import ElecqStation
+from .rollups import RESOLUTIONS
+
+WS_TYPE_ROLLUPS = f"{DOMAIN}/rollups"
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the dashboard websocket commands."""
+    websocket_api.async_register_command(hass, ws_get_rollups)
+
+
+def _find_station(hass: HomeAssistant, cp_id: str) -> Optional[ElecqStation]:
+    for data in hass.data.get(DOMAIN, {}).values():
+        station = data["manager"].get_station(cp_id)
+        if station is not None:
+            return station
+    return None
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_ROLLUPS,
+        vol.Required("charge_point_id"): str,
+        vol.Optional("resolution", default="1m"): vol.In(list(RESOLUTIONS)),
+        vol.Optional("since"): vol.Coerce(float),
+    }
+)
+@callback
+def ws_get_rollups(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Power and energy of a charger at one resolution, from memory.
+
+    Answered from the station's rollup rings without touching the recorder
+    or the history database; `since` is an epoch timestamp.
+    """
+    cp_id = msg["charge_point_id"]
+    station = _find_station(hass, cp_id)
+    if station is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"Unknown charge point {cp_id}"
+        )
+        return
+    if station.rollups is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_SUPPORTED,
+            "Power rollups are disabled in the integration options",
+        )
+        return
+    resolution = msg["resolution"]
+    connection.send_result(
+        msg["id"],
+        {
+            "charge_point_id": cp_id,
+            "resolution": resolution,
+            "bucket_seconds": RESOLUTIONS[resolution][0],
+            "points": station.rollups.points(resolution, msg.get("since")),
+        },
+    )
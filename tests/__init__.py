@@ -0,0 +1 @@
+"""Tests for the Elecq OCPP integration."""
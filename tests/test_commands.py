@@ -0,0 +1,88 @@
+"""Tests for the per-station outbound command queue."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.elecq_ocpp import commands
+from custom_components.elecq_ocpp.commands import CommandQueue, ElecqCommandError
+
+
+class FakeSend:
+    """Counts calls; answers after `delay` seconds, or never if it is None."""
+
+    def __init__(self, result="Accepted", delay: float | None = 0.0) -> None:
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+@pytest.fixture
+def fast_policy(monkeypatch):
+    monkeypatch.setitem(commands.COMMAND_POLICY, "TriggerMessage", (0.01, 2))
+    monkeypatch.setattr(commands, "RETRY_BACKOFF", 0.001)
+
+
+def test_identical_commands_share_one_call() -> None:
+    async def run():
+        queue = CommandQueue()
+        send = FakeSend(delay=0.01)
+        results = await asyncio.gather(
+            *(queue.async_run("TriggerMessage", send, key="meter") for _ in range(5))
+        )
+        return queue, send, results
+
+    queue, send, results = asyncio.run(run())
+    assert results == ["Accepted"] * 5
+    assert send.calls == 1
+    assert queue.stats.submitted == 1
+    assert queue.stats.deduplicated == 4
+    assert queue.pending == 0
+
+
+def test_timed_out_attempts_are_retried_and_counted_once(fast_policy) -> None:
+    timed_out: list[str] = []
+
+    async def run():
+        queue = CommandQueue(on_timeout=timed_out.append)
+        send = FakeSend(delay=None)
+        with pytest.raises(ElecqCommandError, match="after 3 attempt"):
+            await queue.async_run("TriggerMessage", send)
+        return queue, send
+
+    queue, send = asyncio.run(run())
+    # One attempt plus two retries, each timing out once
+    assert send.calls == 3
+    assert queue.stats.timeouts == 3
+    assert queue.stats.retries == 2
+    assert queue.stats.failed == 1
+    assert timed_out == ["TriggerMessage"] * 3
+
+
+def test_commands_past_max_queued_are_refused() -> None:
+    async def run():
+        queue = CommandQueue(max_queued=commands.MAX_QUEUED)
+        send = FakeSend(delay=None)
+        waiting = [
+            asyncio.ensure_future(queue.async_run("GetVariables", send, key=n))
+            for n in range(commands.MAX_QUEUED)
+        ]
+        await asyncio.sleep(0)
+        assert queue.pending == commands.MAX_QUEUED
+        with pytest.raises(ElecqCommandError, match="too many commands queued"):
+            await queue.async_run("GetVariables", send, key="one more")
+        for fut in waiting:
+            fut.cancel()
+        return queue
+
+    queue = asyncio.run(run())
+    assert queue.stats.rejected == 1
+    assert queue.stats.submitted == commands.MAX_QUEUED
@@ -0,0 +1,100 @@
+"""Tests for the meter value decoding table."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.elecq_ocpp.meter_values import (
+    SLOT_BITS,
+    MeterReading,
+    decode_meter_values,
+)
+
+
+def _sample(value, measurand=None, unit=None, multiplier=None, **extra):
+    sampled = {"value": value, **extra}
+    if measurand is not None:
+        sampled["measurand"] = measurand
+    if unit is not None or multiplier is not None:
+        sampled["unit_of_measure"] = {"unit": unit}
+        if multiplier is not None:
+            sampled["unit_of_measure"]["multiplier"] = multiplier
+    return [{"timestamp": "2025-03-03T10:00:00Z", "sampled_value": [sampled]}]
+
+
+def test_energy_in_wh_is_converted_to_kwh() -> None:
+    reading = MeterReading()
+    seen = decode_meter_values(
+        _sample(12345.0, "Energy.Active.Import.Register", "Wh"), reading
+    )
+    assert reading.energy_active_import_kwh == pytest.approx(12.345)
+    assert seen == SLOT_BITS["energy_active_import_kwh"]
+
+
+def test_power_in_w_is_converted_to_kw() -> None:
+    reading = MeterReading()
+    decode_meter_values(_sample(7200, "Power.Active.Import", "W"), reading)
+    assert reading.power_active_import_kw == pytest.approx(7.2)
+
+
+def test_multiplier_is_applied() -> None:
+    reading = MeterReading()
+    decode_meter_values(
+        _sample(12.345, "Energy.Active.Import.Register", "Wh", multiplier=3), reading
+    )
+    assert reading.energy_active_import_kwh == pytest.approx(12.345)
+
+
+def test_value_without_unit_is_kept_as_sent() -> None:
+    reading = MeterReading()
+    decode_meter_values(_sample(3.5, "Power.Active.Import"), reading)
+    assert reading.power_active_import_kw == 3.5
+
+
+def test_missing_measurand_is_the_energy_register() -> None:
+    """OCPP 2.0.1 defaults an omitted measurand to the import register."""
+    reading = MeterReading()
+    seen = decode_meter_values(_sample(5000, unit="Wh"), reading)
+    assert reading.energy_active_import_kwh == pytest.approx(5.0)
+    assert seen == SLOT_BITS["energy_active_import_kwh"]
+
+
+@pytest.mark.parametrize(
+    "meter_value",
+    [
+        _sample(1.0, "Current.Export"),
+        _sample(1.0, "Power.Active.Import", "MW"),
+        _sample("n/a", "Power.Active.Import", "kW"),
+        _sample(230.0, "Voltage", "V", location="EV"),
+        [{"timestamp": "2025-03-03T10:00:00Z"}],
+    ],
+    ids=["unknown measurand", "unknown unit", "not a number", "unknown location", "no samples"],
+)
+def test_unknown_samples_are_skipped(meter_value) -> None:
+    reading = MeterReading()
+    reading.power_active_import_kw = 1.5
+    assert decode_meter_values(meter_value, reading) == 0
+    assert reading.power_active_import_kw == 1.5
+    assert reading.voltage_v is None
+
+
+def test_phases_go_to_their_own_slots() -> None:
+    reading = MeterReading()
+    meter_value = [
+        {
+            "timestamp": "2025-03-03T10:00:00Z",
+            "sampled_value": [
+                {"value": 16.0, "measurand": "Current.Import", "phase": "L1"},
+                {"value": 15.5, "measurand": "Current.Import", "phase": "L2-N"},
+                {"value": 31.5, "measurand": "Current.Import"},
+            ],
+        }
+    ]
+    seen = decode_meter_values(meter_value, reading)
+    assert (reading.current_l1_a, reading.current_l2_a) == (16.0, 15.5)
+    assert reading.current_import_a == 31.5
+    assert reading.current_l3_a is None
+    assert seen == (
+        SLOT_BITS["current_l1_a"]
+        | SLOT_BITS["current_l2_a"]
+        | SLOT_BITS["current_import_a"]
+    )
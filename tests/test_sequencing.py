@@ -0,0 +1,98 @@
+"""Tests for TransactionEvent dedupe and ordering."""
+from __future__ import annotations
+
+from custom_components.elecq_ocpp.sequencing import (
+    APPLY,
+    DUPLICATE,
+    HELD,
+    MAX_PENDING_SEQ,
+    STALE,
+    TransactionSequencer,
+)
+
+TX = "5f1c2a9e"
+
+
+def _replay(seq: TransactionSequencer, seq_no: int, timestamp: float) -> str:
+    """Feed a replayed event the way the station does; return its verdict."""
+    verdict = seq.check(TX, seq_no, timestamp, offline=True)
+    if verdict == HELD:
+        seq.hold(TX, seq_no, seq_no)
+    return verdict
+
+
+def test_duplicate_seq_no_is_dropped() -> None:
+    seq = TransactionSequencer()
+    assert seq.check(TX, 0, 100.0) == APPLY
+    assert seq.check(TX, 1, 101.0) == APPLY
+    assert seq.check(TX, 1, 101.0) == DUPLICATE
+    assert seq.check(TX, 0, 100.0, offline=True) == DUPLICATE
+    assert seq.stats.duplicates == 2
+    assert seq.stats.applied == 2
+
+
+def test_replay_filling_a_gap_releases_held_events_in_order() -> None:
+    seq = TransactionSequencer()
+    assert seq.check(TX, 0, 100.0) == APPLY
+
+    assert _replay(seq, 3, 103.0) == HELD
+    assert _replay(seq, 2, 102.0) == HELD
+    assert seq.release(TX) == []
+
+    # seq_no 1 closes the gap and comes out first, ahead of 2 and 3
+    assert _replay(seq, 1, 101.0) == HELD
+    released = seq.release(TX)
+    assert released == [1, 2, 3]
+    assert [seq.check_order(100.0 + n, offline=True) for n in released] == [
+        APPLY,
+        APPLY,
+        APPLY,
+    ]
+    assert seq.stats.reordered == 2
+    assert seq.stats.gaps == 1
+    assert seq.stats.lost == 0
+    assert seq.release_all() == []
+
+
+def test_gap_is_abandoned_after_max_pending_seq() -> None:
+    seq = TransactionSequencer()
+    assert seq.check(TX, 0, 100.0) == APPLY
+
+    # seq_no 1 never arrives
+    last = MAX_PENDING_SEQ + 2
+    for seq_no in range(2, last):
+        assert _replay(seq, seq_no, 100.0 + seq_no) == HELD
+    assert seq.release(TX) == []
+
+    # One more pending seq_no than allowed gives up on the gap
+    assert _replay(seq, last, 100.0 + last) == HELD
+    released = seq.release(TX)
+    assert released == list(range(2, last + 1))
+    assert all(
+        seq.check_order(100.0 + n, offline=True) == APPLY for n in released
+    )
+    assert seq.stats.lost == 1
+    assert seq.stats.stale == 0
+
+    # The abandoned seq_no is a duplicate if it turns up after all
+    assert seq.check(TX, 1, 101.0, offline=True) == DUPLICATE
+
+
+def test_live_event_is_never_held() -> None:
+    seq = TransactionSequencer()
+    assert seq.check(TX, 0, 100.0) == APPLY
+    # A live event past a gap is applied right away
+    assert seq.check(TX, 5, 105.0) == APPLY
+    # Even with replayed events held for the same transaction
+    assert _replay(seq, 7, 107.0) == HELD
+    assert seq.check(TX, 8, 108.0) == APPLY
+    # And even when the charger clock stepped backwards
+    assert seq.check(TX, 9, 50.0) == APPLY
+    assert seq.stats.stale == 0
+
+
+def test_replayed_event_older_than_live_state_is_stale() -> None:
+    seq = TransactionSequencer()
+    assert seq.check(None, None, 200.0) == APPLY
+    assert seq.check(None, None, 150.0, offline=True) == STALE
+    assert seq.stats.stale == 1
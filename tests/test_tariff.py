@@ -0,0 +1,84 @@
+"""Tests for the time-of-use tariff schedule."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from custom_components.elecq_ocpp.tariff import TariffSchedule
+
+BERLIN = ZoneInfo("Europe/Berlin")
+NIGHT = "0.20; 02:30-04:00=0.10"
+
+
+def _ts(*args, tz=BERLIN) -> float:
+    return datetime(*args, tzinfo=tz).timestamp()
+
+
+def _brute_force(schedule: TariffSchedule, start: float, end: float, kwh: float):
+    """Minute by minute; exact for minute aligned intervals."""
+    total = 0.0
+    t = start
+    while t < end:
+        total += schedule.price_at(t + 30) * 60
+        t += 60
+    return total * kwh / (end - start)
+
+
+def test_parse_and_price_at() -> None:
+    schedule = TariffSchedule.parse(
+        "0.25; mon-fri 07:00-21:00=0.35; 00:00-06:00=0.12; sat,sun=0.20",
+        timezone.utc,
+    )
+    # 2025-03-03 is a Monday
+    assert schedule.price_at(_ts(2025, 3, 3, 5, 59, tz=timezone.utc)) == 0.12
+    assert schedule.price_at(_ts(2025, 3, 3, 6, 0, tz=timezone.utc)) == 0.25
+    assert schedule.price_at(_ts(2025, 3, 3, 7, 0, tz=timezone.utc)) == 0.35
+    assert schedule.price_at(_ts(2025, 3, 8, 3, 0, tz=timezone.utc)) == 0.20
+
+
+@pytest.mark.parametrize("rules", ["mon-fri=0.3", "0.25; mon 07:00-25:00=0.3", "x"])
+def test_parse_rejects_incomplete_or_invalid_rules(rules: str) -> None:
+    with pytest.raises(ValueError):
+        TariffSchedule.parse(rules, timezone.utc)
+
+
+def test_cost_across_a_period_boundary() -> None:
+    schedule = TariffSchedule.parse("0.20; 07:00-08:00=0.40", timezone.utc)
+    start = _ts(2025, 3, 3, 6, 30, tz=timezone.utc)
+    cost = schedule.cost(start, start + 3600, 1.0)
+    assert cost == pytest.approx(0.5 * 0.20 + 0.5 * 0.40)
+
+
+def test_cost_when_clocks_go_back() -> None:
+    """The hour from 02:00 to 03:00 happens twice and is priced both times."""
+    schedule = TariffSchedule.parse(NIGHT, BERLIN)
+    start, end = _ts(2025, 10, 26, 0, 0), _ts(2025, 10, 26, 6, 0)
+    assert end - start == 7 * 3600
+    # 1 kWh per hour: 5 h at 0.20, 02:30-03:00 twice and 03:00-04:00 at 0.10
+    assert schedule.cost(start, end, 7.0) == pytest.approx(5 * 0.20 + 2 * 0.10)
+
+
+def test_cost_when_clocks_go_forward() -> None:
+    """02:00 to 03:00 does not exist; 03:00-04:00 is the only cheap hour."""
+    schedule = TariffSchedule.parse(NIGHT, BERLIN)
+    start, end = _ts(2025, 3, 30, 0, 0), _ts(2025, 3, 30, 6, 0)
+    assert end - start == 5 * 3600
+    assert schedule.cost(start, end, 5.0) == pytest.approx(4 * 0.20 + 1 * 0.10)
+
+
+@pytest.mark.parametrize("day", [(2025, 3, 30), (2025, 10, 26)])
+@pytest.mark.parametrize(
+    "rules",
+    [NIGHT, "0.30; 00:00-02:30=0.10; 02:30-03:00=1.0", "0.25; sun 01:00-02:45=0.5"],
+)
+def test_cost_matches_minute_by_minute_prices_over_dst(day, rules: str) -> None:
+    schedule = TariffSchedule.parse(rules, BERLIN)
+    midnight = datetime(*day, tzinfo=BERLIN)
+    for first, last in ((0, 6), (1, 4), (2, 3), (-20, 30)):
+        start = (midnight + timedelta(hours=first, minutes=15)).timestamp()
+        end = (midnight + timedelta(hours=last, minutes=45)).timestamp()
+        assert schedule.cost(start, end, 1.0) == pytest.approx(
+            _brute_force(schedule, start, end, 1.0)
+        )